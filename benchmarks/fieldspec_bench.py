@@ -0,0 +1,51 @@
+"""Compiled field specs vs one `safe_get` walk per field, on a synthetic 500 item lcxiM page.
+
+Run with `python -m benchmarks.fieldspec_bench`
+"""
+
+import timeit
+
+from gpwc import parser
+from gpwc.fieldspec import Computed, FieldPath
+from gpwc.synthetic import ResponseGenerator
+from gpwc.utils import safe_get
+
+
+def _resolve(field_path: FieldPath, data):
+    value = safe_get(data, *field_path.keys, default=field_path.default)
+    return field_path.transform(value) if field_path.transform else value
+
+
+def safe_get_extract(spec, data) -> dict:
+    """What the parser did before specs were compiled: one walk from the root per path"""
+    values = {}
+    for name, field in spec.fields.items():
+        if isinstance(field, Computed):
+            values[name] = field.func(*(_resolve(field_path, data) for field_path in field.paths))
+        else:
+            values[name] = _resolve(field, data)
+    return values
+
+
+def main() -> None:
+    page = ResponseGenerator(0).data("lcxiM", 500, "next")
+    items = page[0]
+    spec = parser.LibraryItem._spec
+
+    compiled = [parser.LibraryItem(**spec(item)) for item in items]
+    interpreted = [parser.LibraryItem(**safe_get_extract(spec, item)) for item in items]
+    assert compiled == interpreted, "compiled extractor output differs from safe_get"
+
+    runs = 50
+    interpreted_time = min(timeit.repeat(lambda: [safe_get_extract(spec, item) for item in items], number=runs, repeat=5)) / runs
+    compiled_time = min(timeit.repeat(lambda: [spec(item) for item in items], number=runs, repeat=5)) / runs
+    page_time = min(timeit.repeat(lambda: parser.LibraryTimelinePage.from_data(page), number=runs, repeat=5)) / runs
+
+    print("LibraryItem extraction, 500 items")
+    print(f"  safe_get per field: {interpreted_time * 1000:8.3f} ms")
+    print(f"  compiled spec:      {compiled_time * 1000:8.3f} ms  ({interpreted_time / compiled_time:.1f}x)")
+    print(f"LibraryTimelinePage.from_data: {page_time * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
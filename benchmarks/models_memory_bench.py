@@ -0,0 +1,86 @@
+"""Retained memory of parsed items: slotted models with interned values vs plain dataclasses.
+
+Run with `python -m benchmarks.models_memory_bench`
+"""
+
+import dataclasses
+import gc
+import json
+import tracemalloc
+
+from gpwc import parser
+from gpwc.fieldspec import Computed
+from gpwc.synthetic import ResponseGenerator
+from gpwc.utils import safe_get
+
+ITEM_COUNT = 100_000
+
+
+def plain_dataclass(cls: type) -> type:
+    """Same fields as cls, without __slots__"""
+    fields = [(field.name, field.type, dataclasses.field(default=field.default)) for field in dataclasses.fields(cls)]
+    return dataclasses.make_dataclass(f"Plain{cls.__name__}", fields)
+
+
+PlainGeoLocation = plain_dataclass(parser.GeoLocation)
+PlainLibraryItem = plain_dataclass(parser.LibraryItem)
+PlainRemoteMatch = plain_dataclass(parser.RemoteMatch)
+
+
+def plain_values(spec, data) -> dict:
+    """Field values the way the parser produced them before: no interning"""
+    values = {}
+    for name, field in spec.fields.items():
+        paths = field.paths if isinstance(field, Computed) else [field]
+        resolved = [safe_get(data, *path.keys, default=path.default) for path in paths]
+        if isinstance(field, Computed):
+            values[name] = PlainGeoLocation(*resolved) if field.func is parser.GeoLocation else field.func(*resolved)
+        elif field.transform is not None and field.transform is not parser.intern_string:
+            values[name] = field.transform(resolved[0])
+        else:
+            values[name] = resolved[0]
+    return values
+
+
+def retained(body: str, parse) -> int:
+    """Bytes still allocated after decoding body, parsing it and dropping the raw data"""
+    gc.collect()
+    tracemalloc.start()
+    raw = json.loads(body)
+    items = parse(raw)
+    del raw
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return size
+
+
+def compare(title: str, body: str, parse_new, parse_plain) -> None:
+    plain = retained(body, parse_plain)
+    slotted = retained(body, parse_new)
+    print(title)
+    print(f"  plain dataclasses: {plain / 2**20:8.1f} MiB")
+    print(f"  slotted models:    {slotted / 2**20:8.1f} MiB  ({100 * (plain - slotted) / plain:.0f}% less)")
+
+
+def main() -> None:
+    generator = ResponseGenerator(0)
+    library_body = json.dumps([generator.library_item() for _ in range(ITEM_COUNT)])
+    compare(
+        f"{ITEM_COUNT} LibraryItem",
+        library_body,
+        lambda raw: [parser.LibraryItem.from_data(item) for item in raw],
+        lambda raw: [PlainLibraryItem(**plain_values(parser.LibraryItem._spec, item)) for item in raw],
+    )
+    matches_body = json.dumps([generator.remote_match() for _ in range(ITEM_COUNT)])
+    compare(
+        f"{ITEM_COUNT} RemoteMatch",
+        matches_body,
+        lambda raw: [parser.RemoteMatch.from_data(item) for item in raw],
+        lambda raw: [PlainRemoteMatch(**plain_values(parser.RemoteMatch._spec, item)) for item in raw],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Offline benchmarks of response parsing and request encoding, compared against a stored baseline.
+
+Times `parse_api_response`, every `parse_response_data` branch (eager and lazy), `prepare_payload` and
+`f.req` encoding on `gpwc.synthetic` bodies, and reports throughput and peak allocations. Cases allocating
+more than the baseline by over the memory threshold are flagged and make the run exit with 1. Peak
+allocations are stable across runs and machines with the same python version. Timings are compared as
+ratios to a fixed pure python workload timed in rounds alternating with every case, so machine speed
+cancels out, but load on a shared machine still moves them by tens of percent: slowdowns are only
+flagged with a time threshold.
+
+Run with `python -m benchmarks.suite [-k filter] [--save-baseline] [--time-threshold 0.5] [--json-backend stdlib]`
+"""
+
+import argparse
+import json
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+from gpwc import json_backend, payloads
+from gpwc.client import BaseClient
+from gpwc.parser import LAZY_VIEWS, parse_response_data
+from gpwc.synthetic import RPCIDS, ResponseGenerator, wire_response
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+GLOBAL_DATA = {"FdrFJe": "-1234567890123456789", "cfb2h": "boq_photosuiserver_20240101.00_p0", "SNlM0e": "AJpMio0000000000000000000000:1700000000000", "Im6cmf": "/_/PhotosUi"}
+PAGE_SIZE = 500
+BATCH_SIZE = 1000
+# item count of list responses per rpcid, others are single objects
+ITEM_COUNTS = {"lcxiM": PAGE_SIZE, "EzkLib": PAGE_SIZE, "swbisb": BATCH_SIZE, "zy0IHe": PAGE_SIZE, "EWgK9e": BATCH_SIZE, "Z5xsfc": PAGE_SIZE, "snAcKc": PAGE_SIZE, "F2A0H": 100, "e9T5je": PAGE_SIZE, "SusGud": BATCH_SIZE}
+
+
+class Case(NamedTuple):
+    name: str
+    func: Callable[[], object]
+    units: int
+    nbytes: Optional[int] = None
+
+
+def media_key(i: int) -> str:
+    return f"AF1Qip{i:038d}"
+
+
+def build_cases(client: BaseClient, seed: int = 0) -> list[Case]:
+    generator = ResponseGenerator(seed)
+    cases = []
+
+    for rpcid, count in [("lcxiM", PAGE_SIZE), ("EWgK9e", BATCH_SIZE)]:
+        payload = payloads.GetLibraryPageByTakenDate() if rpcid == "lcxiM" else payloads.GetBatchMediaInfo([media_key(i) for i in range(count)])
+        body = wire_response([(rpcid, generator.data(rpcid, count, "next_page"), payload.payload_id)]).encode()
+        cases.append(Case(f"parse_api_response/{rpcid}x{count}", lambda body=body, payload=payload: client.parse_api_response(body, [payload]), count, len(body)))
+
+    batch = [payloads.GetItemInfo(media_key(i)) for i in range(50)]
+    body = wire_response([(payload.rpcid, generator.data(payload.rpcid), payload.payload_id) for payload in batch]).encode()
+    cases.append(Case("parse_api_response/VrseUbx50 batch", lambda: client.parse_api_response(body, batch), len(batch), len(body)))
+
+    for rpcid in RPCIDS:
+        count = ITEM_COUNTS.get(rpcid, 1)
+        data = generator.data(rpcid, count, "next_page")
+        cases.append(Case(f"parse_response_data/{rpcid}", lambda rpcid=rpcid, data=data: parse_response_data(rpcid, data), count))
+        if rpcid in LAZY_VIEWS:
+            # a view costs nothing until read, time reading one field of every item
+            cases.append(Case(f"parse_response_data/{rpcid}/lazy", lambda rpcid=rpcid, data=data: [item.media_key for item in parse_response_data(rpcid, data, lazy=True).items], count))
+
+    keys = [media_key(i) for i in range(BATCH_SIZE)]
+    hashes = [f"hash{i:023d}" for i in range(BATCH_SIZE)]
+    batch_info = payloads.GetBatchMediaInfo(keys)
+    match_payload = payloads.GetRemoteMatchesByHash(hashes)
+    cases.append(Case(f"prepare_payload/EWgK9ex{BATCH_SIZE}", lambda: client.prepare_payload(batch_info), BATCH_SIZE))
+    cases.append(Case(f"prepare_payload/swbisbx{BATCH_SIZE}", lambda: client.prepare_payload(match_payload), BATCH_SIZE))
+
+    mixed = [payloads.GetItemInfo(media_key(i)) for i in range(50)]
+    cases.append(Case(f"f.req/EWgK9ex{BATCH_SIZE}", lambda: client.build_api_request([batch_info]), BATCH_SIZE))
+    cases.append(Case("f.req/VrseUbx50 batch", lambda: client.build_api_request(mixed), len(mixed)))
+    return cases
+
+
+def reference() -> int:
+    """Fixed interpreter bound workload case timings are relative to"""
+    return sum([i * i for i in range(20000)])
+
+
+def _timer(func: Callable[[], object], min_time: float) -> tuple[timeit.Timer, int]:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return timer, max(1, int(number * min_time / 0.2))
+
+
+def measure(case: Case, min_time: float = 0.2, repeat: int = 7) -> dict:
+    """Best time per call, best time relative to the reference timed in alternating rounds,
+    and peak memory allocated during one call"""
+    case.func()
+    timer, number = _timer(case.func, min_time)
+    reference_timer, reference_number = _timer(reference, min_time)
+    seconds = reference_seconds = float("inf")
+    for _ in range(repeat):
+        seconds = min(seconds, timer.timeit(number) / number)
+        reference_seconds = min(reference_seconds, reference_timer.timeit(reference_number) / reference_number)
+    tracemalloc.start()
+    case.func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": seconds, "relative_time": seconds / reference_seconds, "peak_bytes": peak}
+
+
+def compare(result: dict, baseline: Optional[dict], time_threshold: Optional[float], memory_threshold: float) -> tuple[str, bool]:
+    """Change against baseline as text, and whether it is a regression. Time is not checked without time_threshold."""
+    if not baseline or "relative_time" not in baseline:
+        return "", False
+    time_change = result["relative_time"] / baseline["relative_time"] - 1
+    memory_change = result["peak_bytes"] / baseline["peak_bytes"] - 1 if baseline["peak_bytes"] else 0.0
+    regression = (time_threshold is not None and time_change > time_threshold) or memory_change > memory_threshold
+    return f"{time_change:+7.1%} {memory_change:+7.1%}{'  REGRESSION' if regression else ''}", regression
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("-k", dest="filter", default="", help="only run cases containing this text")
+    arg_parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    arg_parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    arg_parser.add_argument("--time-threshold", type=float, help="relative slowdown reported as a regression, timings are not checked if not given")
+    arg_parser.add_argument("--memory-threshold", type=float, default=0.1, help="relative peak allocation growth reported as a regression")
+    arg_parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing round")
+    arg_parser.add_argument("--json-backend", choices=["orjson", "msgspec", "stdlib"], help="JSON library to use, the fastest installed by default")
+    args = arg_parser.parse_args(argv)
+    print(f"JSON backend: {json_backend.use_backend(args.json_backend)}")
+
+    client = BaseClient("cookies.txt", log_level="ERROR")
+    client.global_data = GLOBAL_DATA
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() and not args.save_baseline else {}
+
+    results = {}
+    regressions = 0
+    print(f"{'case':44} {'ms/call':>10} {'units/s':>12} {'MB/s':>8} {'peak KiB':>10} {'time':>7} {'memory':>7}")
+    for case in build_cases(client):
+        if args.filter not in case.name:
+            continue
+        result = results[case.name] = measure(case, args.min_time)
+        change, regression = compare(result, baseline.get(case.name), args.time_threshold, args.memory_threshold)
+        regressions += regression
+        throughput = f"{case.nbytes / result['seconds'] / 1e6:8.1f}" if case.nbytes else f"{'':8}"
+        print(f"{case.name:44} {result['seconds'] * 1000:10.3f} {case.units / result['seconds']:12,.0f} {throughput} {result['peak_bytes'] / 1024:10.1f} {change}")
+
+    if args.save_baseline:
+        stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        args.baseline.write_text(json.dumps({**stored, **results}, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"{regressions} regression(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,7 @@
 from gpwc.client import Client
+from gpwc.async_client import AsyncClient
+from gpwc.dispatcher import BatchDispatcher
+from gpwc.pool import ClientPool
 import gpwc.payloads as payloads
 
-ALL = [Client, payloads]
+ALL = [Client, AsyncClient, BatchDispatcher, ClientPool, payloads]
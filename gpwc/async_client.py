@@ -0,0 +1,218 @@
+import asyncio
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Literal, Iterable, Optional, overload
+from pathlib import Path
+
+import httpx
+
+from . import utils
+from .client import BaseClient
+from .demux import ResponseDemultiplexer
+from .framing import aiter_frames
+from .global_data_cache import GlobalDataCache
+from .metrics import MetricsCollector
+from .tracing import Tracer
+from .ratelimit import AdaptiveRateLimiter
+from .models import ApiResponse
+from .payloads import EncodedPayloads, Payload
+
+
+class AsyncClient(BaseClient):
+    """Asyncio flavour of `Client`, many rpc requests can be in flight on a single event loop.
+
+    Bootstrap is done on first use, either with `async with AsyncClient(...)` or on the first request.
+    """
+
+    is_async = True
+
+    def __init__(
+        self,
+        cookies_txt_path: str | Path,
+        log_level: Literal["INFO", "DEBUG", "WARNING", "ERROR", "CRITICAL"] = "INFO",
+        max_connections: int = 100,
+        global_data_cache: Optional[GlobalDataCache] = None,
+        cookies_flush_interval: float = 5.0,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        metrics: Optional[MetricsCollector] = None,
+        tracer: Optional[Tracer] = None,
+        base_url: str = "https://photos.google.com",
+    ) -> None:
+        """global_data_cache skips the main page request while the cached global_data is fresh.
+        cookies_flush_interval is the minimum time between cookie file writes done on exit.
+        rate_limiter paces api requests and adapts to throttling, requests are not paced if None.
+        metrics receives per rpcid sizes, timings and retry counts, nothing is measured if None.
+        tracer records spans of bootstrap, encoding, requests and parsing, nothing is traced if None.
+        base_url points the client at another server, like `gpwc.fake_server` for load tests."""
+        super().__init__(cookies_txt_path, log_level, global_data_cache, cookies_flush_interval, rate_limiter, metrics, tracer, base_url)
+        self.session = utils.new_async_session_with_retries(max_connections)
+        self.load_cookies_in_session()
+        self.global_data = None
+        self._bootstrap_lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def __aenter__(self):
+        """Bootstrap the client if it was not done yet"""
+        await self.bootstrap()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Save changed session cookies to file on exit, at most once per cookies_flush_interval"""
+        self.cookie_store.save(self.session.cookies.jar)
+
+    async def bootstrap(self) -> None:
+        """Load global_data from cache or fetch it once, concurrent callers wait for the first one"""
+        async with self._bootstrap_lock:
+            if self.global_data is not None:
+                return
+            global_data = self.load_cached_global_data()
+            if global_data is None:
+                global_data = await self.get_global_data()
+                self.store_global_data(global_data)
+                self.save_cookies_to_file()
+            self.global_data = global_data
+            self.logger.info(f"Account: {global_data['oPEP7c']}")
+
+    async def refresh_global_data(self) -> None:
+        """Fetch global_data again, bypassing the cache"""
+        async with self._bootstrap_lock:
+            self.global_data = await self.get_global_data()
+            self.store_global_data(self.global_data)
+
+    def is_stale_global_data(self, response: httpx.Response) -> bool:
+        """Whether a rejected request should be retried with fresh global_data"""
+        return response.status_code in self.STALE_GLOBAL_DATA_STATUSES and self.global_data_from_cache
+
+    async def aclose(self) -> None:
+        """Save cookies and close underlying connections"""
+        self.save_cookies_to_file()
+        await self.session.aclose()
+
+    def load_cookies_in_session(self) -> None:
+        """Load cookies from cookies.txt and upate session cookies with them"""
+        cookies = self.cookie_store.load()
+        for cookie in cookies:
+            self.session.cookies.jar.set_cookie(cookie)
+
+    async def get_global_data(self) -> dict:
+        """Get and parse global_data from photos.google.com page"""
+        with self.span("get_global_data") as span:
+            response = await utils.async_get_with_retries(self.session, f"{self.base_url}/")
+            span.set(bytes=len(response.content))
+            return self.parse_main_page(response.text)
+
+    def save_cookies_to_file(self) -> None:
+        """Save sesion cookies to file in netscape format, if they changed"""
+        self.cookie_store.flush(self.session.cookies.jar)
+
+    @overload
+    async def send_api_request(self, payloads: Payload, encoded: Optional[EncodedPayloads] = None) -> ApiResponse: ...
+
+    @overload
+    async def send_api_request(self, payloads: Iterable[Payload], encoded: Optional[EncodedPayloads] = None) -> list[ApiResponse]: ...
+
+    async def send_api_request(self, payloads: Iterable[Payload] | Payload, encoded: Optional[EncodedPayloads] = None) -> list[ApiResponse] | ApiResponse:
+        """Send an api request wiht rpc payloads, encoded holds payloads already encoded with encode_payload"""
+
+        if isinstance(payloads, Payload):
+            _payloads = [payloads]
+        else:
+            _payloads = list(payloads)
+
+        with self.span("send_api_request", payload_count=len(_payloads)):
+            response = await self.post_api_request(_payloads, encoded)
+            pared_responses = self.parse_api_response(response.content, _payloads)
+        if isinstance(payloads, Payload):
+            return pared_responses[0]
+        return pared_responses
+
+    async def post_api_request(self, payloads: list[Payload], encoded: Optional[EncodedPayloads] = None) -> httpx.Response:
+        """POST a batchexecute request, retried once with fresh global_data if cached one is rejected"""
+        await self.bootstrap()
+        response = await self._post(payloads, encoded=encoded)
+        if self.is_stale_global_data(response):
+            self.logger.info("Cached global data rejected, bootstrapping again")
+            await self.refresh_global_data()
+            if self.metrics is not None:
+                self.metrics.increment_batch("retries", [payload.rpcid for payload in payloads])
+            response = await self._post(payloads)
+        response.raise_for_status()
+        return response
+
+    async def _post(self, payloads: list[Payload], stream: bool = False, encoded: Optional[EncodedPayloads] = None) -> httpx.Response:
+        """POST paced by the rate limiter, throttled requests are sent again after backing off.
+        With stream the body is not read, the response must be closed by the caller."""
+        url, querystring, payload_encoded = self.build_api_request(payloads, encoded)
+        rpcids = [payload.rpcid for payload in payloads]
+        metrics = self.metrics
+        for attempt in range(self.THROTTLE_RETRIES + 1):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(rpcids)
+            request = self.session.build_request("POST", url, content=payload_encoded, params=querystring)
+            if metrics is not None:
+                started = time.perf_counter()
+            with self.span("post", rpcids=querystring["rpcids"], payload_count=len(payloads), bytes=len(payload_encoded)) as span:
+                response = await self.session.send(request, stream=stream)
+                span.set(status=response.status_code, response_bytes=self.response_size(response, stream))
+            if metrics is not None:
+                self.record_post(rpcids, time.perf_counter() - started, attempt)
+            if self.rate_limiter is None:
+                return response
+            retry = self.rate_limiter.feedback(rpcids, response.status_code, response.headers.get("Retry-After"))
+            if not retry or attempt == self.THROTTLE_RETRIES:
+                return response
+            await response.aclose()
+            self.logger.info(f"Throttled with status {response.status_code}, backing off")
+        return response
+
+    async def stream_frames(self, payloads: list[Payload]) -> AsyncIterator[list]:
+        """Send an api request and yield decoded frames as they are received"""
+        await self.bootstrap()
+        response = await self._post(payloads, stream=True)
+        try:
+            if self.is_stale_global_data(response):
+                await response.aclose()
+                self.logger.info("Cached global data rejected, bootstrapping again")
+                await self.refresh_global_data()
+                if self.metrics is not None:
+                    self.metrics.increment_batch("retries", [payload.rpcid for payload in payloads])
+                response = await self._post(payloads, stream=True)
+            response.raise_for_status()
+            async for frame in aiter_frames(response.aiter_bytes()):
+                yield frame
+        finally:
+            await response.aclose()
+
+    async def stream_api_request(self, payloads: Iterable[Payload]) -> AsyncIterator[ApiResponse]:
+        """Send an api request and yield each response as soon as its frame is received"""
+        _payloads = list(payloads)
+        demux = ResponseDemultiplexer(self, _payloads)
+        # closed right away when the caller stops early, not when the generator is collected
+        async with aclosing(self.stream_frames(_payloads)) as frames:
+            async for frame in frames:
+                for response in demux.feed(frame):
+                    yield response
+        for response in demux.close():
+            yield response
+
+    def submit_api_request(self, payloads: Iterable[Payload]) -> list[asyncio.Future]:
+        """Send an api request in a background task, returns one future per payload in input order.
+        Futures resolve as their frames arrive, use `asyncio.as_completed` to consume them in that order."""
+        _payloads = list(payloads)
+        demux = ResponseDemultiplexer(self, _payloads, future_factory=asyncio.get_running_loop().create_future)
+        task = asyncio.create_task(self._feed_demultiplexer(demux, _payloads))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return [demux.futures[payload.payload_id] for payload in _payloads]
+
+    async def _feed_demultiplexer(self, demux: ResponseDemultiplexer, payloads: list[Payload]) -> None:
+        try:
+            with self.span("submit_api_request", payload_count=len(payloads)):
+                async with aclosing(self.stream_frames(payloads)) as frames:
+                    async for frame in frames:
+                        demux.feed(frame)
+                demux.close()
+        except BaseException as e:
+            demux.fail(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
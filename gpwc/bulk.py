@@ -0,0 +1,151 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable, Optional
+
+from . import payloads
+from .exceptions import RpcError
+from .models import ApiResponse
+from .payloads import Payload
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .async_client import AsyncClient
+
+PayloadFactory = Callable[[list[str]], Payload]
+
+
+@dataclass(slots=True)
+class KeyOutcome:
+    key: str
+    success: bool = False
+    attempts: int = 0
+    error: Optional[BaseException] = None
+
+
+@dataclass(slots=True)
+class BulkReport:
+    outcomes: dict[str, KeyOutcome] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> list[str]:
+        return [key for key, outcome in self.outcomes.items() if outcome.success]
+
+    @property
+    def failed(self) -> list[str]:
+        return [key for key, outcome in self.outcomes.items() if not outcome.success]
+
+
+class BulkMutator:
+    """Apply a list based edit payload to any number of keys.
+
+    Keys are deduplicated and split into chunks of chunk_size, each chunk is its own request so a
+    failure only affects its keys. Up to max_concurrency chunks run at once, failed chunks are sent
+    again, up to max_attempts times with exponential backoff. Returns a `BulkReport` with the outcome of
+    every key, or an awaitable of it with an `AsyncClient`.
+    """
+
+    def __init__(
+        self,
+        client: "Client | AsyncClient",
+        chunk_size: int = 500,
+        max_concurrency: int = 4,
+        max_attempts: int = 3,
+        backoff_factor: float = 1.0,
+    ) -> None:
+        self.client = client
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+
+    def run(self, make_payload: PayloadFactory, keys: Iterable[str]) -> BulkReport | Awaitable[BulkReport]:
+        """Send make_payload(chunk) for every chunk of keys"""
+        report = BulkReport({key: KeyOutcome(key) for key in keys})
+        unique_keys = list(report.outcomes)
+        chunks = [unique_keys[i : i + self.chunk_size] for i in range(0, len(unique_keys), self.chunk_size)]
+        if self.client.is_async:
+            return self._run_async(make_payload, chunks, report)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for attempt in range(self.max_attempts):
+                if attempt:
+                    time.sleep(self.backoff_factor * 2 ** (attempt - 1))
+                results = executor.map(lambda chunk: self._send(make_payload, chunk), chunks)
+                chunks = self._record(report, chunks, list(results))
+                if not chunks:
+                    break
+        return report
+
+    async def _run_async(self, make_payload: PayloadFactory, chunks: list[list[str]], report: BulkReport) -> BulkReport:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def send_chunk(chunk: list[str]) -> Optional[BaseException]:
+            async with semaphore:
+                try:
+                    return self.response_error(await self.client.send_api_request(make_payload(chunk)))
+                except Exception as e:
+                    return e
+
+        for attempt in range(self.max_attempts):
+            if attempt:
+                await asyncio.sleep(self.backoff_factor * 2 ** (attempt - 1))
+            results = await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+            chunks = self._record(report, chunks, results)
+            if not chunks:
+                break
+        return report
+
+    @staticmethod
+    def response_error(response: ApiResponse) -> Optional[BaseException]:
+        """Error of a mutation response. Mutations may succeed without returning data, so a chunk
+        fails on error envelopes, `er` frames, missing or unparsable responses only."""
+        error = response.error
+        if type(error) is RpcError and error.code is None:
+            return None
+        return error
+
+    def _send(self, make_payload: PayloadFactory, chunk: list[str]) -> Optional[BaseException]:
+        """Error of a chunk request, None if it succeeded"""
+        try:
+            return self.response_error(self.client.send_api_request(make_payload(chunk)))
+        except Exception as e:
+            return e
+
+    @staticmethod
+    def _record(report: BulkReport, chunks: list[list[str]], errors: list[Optional[BaseException]]) -> list[list[str]]:
+        """Update key outcomes, returns the chunks to send again"""
+        failed = []
+        for chunk, error in zip(chunks, errors):
+            for key in chunk:
+                outcome = report.outcomes[key]
+                outcome.attempts += 1
+                outcome.success = error is None
+                outcome.error = error
+            if error is not None:
+                failed.append(chunk)
+        return failed
+
+    def move_to_trash(self, dedup_keys: Iterable[str]) -> BulkReport | Awaitable[BulkReport]:
+        return self.run(payloads.MoveToTrash, dedup_keys)
+
+    def restore_from_trash(self, dedup_keys: Iterable[str]) -> BulkReport | Awaitable[BulkReport]:
+        return self.run(payloads.RestoreFromTrash, dedup_keys)
+
+    def set_favorite(self, dedup_keys: Iterable[str]) -> BulkReport | Awaitable[BulkReport]:
+        return self.run(payloads.SetFavorite, dedup_keys)
+
+    def unfavorite(self, dedup_keys: Iterable[str]) -> BulkReport | Awaitable[BulkReport]:
+        return self.run(payloads.UnFavorite, dedup_keys)
+
+    def set_archive(self, dedup_keys: Iterable[str]) -> BulkReport | Awaitable[BulkReport]:
+        return self.run(payloads.SetArchive, dedup_keys)
+
+    def unarchive(self, dedup_keys: Iterable[str]) -> BulkReport | Awaitable[BulkReport]:
+        return self.run(payloads.UnArchive, dedup_keys)
+
+    def delete_geo_data(self, dedup_keys: Iterable[str]) -> BulkReport | Awaitable[BulkReport]:
+        return self.run(payloads.DeleteItemGeoData, dedup_keys)
+
+    def add_to_album(self, item_media_keys: Iterable[str], album_media_key: str) -> BulkReport | Awaitable[BulkReport]:
+        return self.run(lambda chunk: payloads.AddItemsToExistingAlbum(chunk, album_media_key), item_media_keys)
@@ -1,55 +1,87 @@
-import json
-from typing import Literal, Iterable, overload
+from typing import Literal, Iterable, Iterator, Optional, overload
 from pathlib import Path
 from http.cookiejar import MozillaCookieJar
 import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import time
+import contextvars
 
 import requests
 from lxml import html
 
-from . import utils
+from . import json_backend, utils
+from .demux import ResponseDemultiplexer
+from .cookies import CookieStore
+from .framing import iter_frames
+from .global_data_cache import GlobalDataCache
+from .metrics import MetricsCollector
+from .ratelimit import AdaptiveRateLimiter
+from .tracing import NOOP_SPAN, Tracer
 from .parser import parse_response_data
 from .models import ApiResponse
-from .payloads import Payload
+from .payloads import EncodedPayloads, Payload
 
 
-class Client:
-    """Reverse engineered Google Photos web API client."""
+class BaseClient:
+    """Transport independent part of the client: request building and response parsing."""
+
+    is_async: bool = False
+    global_data: dict
+    # statuses that may mean cached global_data went stale
+    STALE_GLOBAL_DATA_STATUSES = (400, 401, 403)
+    # times a throttled request is sent again when a rate_limiter is set
+    THROTTLE_RETRIES = 3
 
-    def __init__(self, cookies_txt_path: str | Path, log_level: Literal["INFO", "DEBUG", "WARNING", "ERROR", "CRITICAL"] = "INFO") -> None:
-        """ """
+    def __init__(
+        self,
+        cookies_txt_path: str | Path,
+        log_level: Literal["INFO", "DEBUG", "WARNING", "ERROR", "CRITICAL"] = "INFO",
+        global_data_cache: Optional[GlobalDataCache] = None,
+        cookies_flush_interval: float = 5.0,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        metrics: Optional[MetricsCollector] = None,
+        tracer: Optional[Tracer] = None,
+        base_url: str = "https://photos.google.com",
+    ) -> None:
         self.cookies_txt_path = cookies_txt_path
         self.logger = utils.create_logger(log_level)
-        self.session = utils.new_session_with_retries()
-        self.load_cookies_in_session()
-        self.global_data = self.get_global_data()
-        self.logger.info(f"Account: {self.global_data['oPEP7c']}")
-        self.save_cookies_to_file()
-
-    def __enter__(self):
-        """Enter"""
-        return self
+        self.cookie_store = CookieStore(cookies_txt_path, cookies_flush_interval)
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.tracer = tracer
+        self.base_url = base_url.rstrip("/")
+        self.global_data_cache = global_data_cache
+        self.global_data_from_cache = False
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Dump session cookies to file on exit"""
-        self.save_cookies_to_file()
+    def span(self, name: str, **attributes):
+        """Tracing span as a child of the current one, a no-op without a tracer"""
+        if self.tracer is None:
+            return NOOP_SPAN
+        return self.tracer.span(name, **attributes)
 
-    def load_cookies_in_session(self) -> None:
-        """Load cookies from cookies.txt and upate session cookies with them"""
-        cookies = self.load_cookies_from_file(self.cookies_txt_path)
-        self.session.cookies.update(cookies)
+    def load_cached_global_data(self) -> Optional[dict]:
+        """global_data from the cache if enabled and fresh"""
+        if self.global_data_cache is None:
+            return None
+        global_data = self.global_data_cache.load(self.cookies_txt_path)
+        self.global_data_from_cache = global_data is not None
+        return global_data
 
-    def get_global_data(self) -> dict:
-        """Get and parse global_data from photos.google.com page"""
-        page_body = self.session.get("https://photos.google.com/").text
-        return self.parse_main_page(page_body)
+    def store_global_data(self, global_data: dict) -> None:
+        """Put freshly fetched global_data in the cache if enabled"""
+        self.global_data_from_cache = False
+        if self.global_data_cache is not None:
+            self.global_data_cache.save(self.cookies_txt_path, global_data)
 
     def parse_main_page(self, page_body: str) -> dict:
         """Parse data from photos.google.com html body"""
-        xml_page = html.fromstring(page_body)
-        script_text: str = xml_page.xpath('//script[@data-id="_gd"]/text()')[0]
+        script_text = utils.scan_global_data_script(page_body)
+        if script_text is None:
+            xml_page = html.fromstring(page_body)
+            script_text = xml_page.xpath('//script[@data-id="_gd"]/text()')[0]
         script_json = script_text.replace("window.WIZ_global_data = ", "").replace(";", "")
-        return json.loads(script_json)
+        return json_backend.loads(script_json)
 
     def load_cookies_from_file(self, path: str | Path) -> MozillaCookieJar:
         """Load netscape cookies from file"""
@@ -57,72 +89,320 @@ class Client:
         cookie_jar.load(ignore_discard=True, ignore_expires=True)
         return cookie_jar
 
-    def save_cookies_to_file(self) -> None:
-        """Save sesion cookies to file in netscape format"""
-        cookie_jar = MozillaCookieJar(self.cookies_txt_path)
-        requests.utils.cookiejar_from_dict({c.name: c.value for c in self.session.cookies}, cookie_jar)
-        cookie_jar.save(ignore_discard=True, ignore_expires=True)
-
     def prepare_payload(self, payload: Payload) -> list:
         """Prepare payload for api request"""
-        return [payload.rpcid, json.dumps(payload.data, separators=(",", ":")), None, payload.payload_id]
+        return [payload.rpcid, json_backend.dumps(payload.data).decode(), None, payload.payload_id]
 
-    @overload
-    def send_api_request(self, payloads: Payload) -> ApiResponse: ...
+    def encode_payload(self, payload: Payload) -> tuple[list, bytes]:
+        """Prepared payload and its element of the f.req json"""
+        prepared = self.prepare_payload(payload)
+        return prepared, json_backend.dumps(prepared, floats=False)
 
-    @overload
-    def send_api_request(self, payloads: Iterable[Payload]) -> list[ApiResponse]: ...
+    def prepare_payloads(self, payloads: list[Payload], encoded: Optional[EncodedPayloads] = None) -> tuple[list[list], Optional[list[bytes]]]:
+        """prepare_payload of every payload, each in its own span when tracing, and their f.req elements
+        if every payload is in encoded. Entries of encoded are used once and removed."""
+        kept = [encoded.pop(payload, None) for payload in payloads] if encoded else [None] * len(payloads)
+        if all(kept):
+            return [prepared for prepared, _ in kept], [encoded for _, encoded in kept]
+        if self.tracer is None:
+            return [entry[0] if entry else self.prepare_payload(payload) for payload, entry in zip(payloads, kept)], None
+        prepared = []
+        for payload, entry in zip(payloads, kept):
+            with self.tracer.span("prepare_payload", rpcid=payload.rpcid) as span:
+                prepared.append(entry[0] if entry else self.prepare_payload(payload))
+                span.set(bytes=len(prepared[-1][1]))
+        return prepared, None
 
-    def send_api_request(self, payloads: Iterable[Payload] | Payload) -> list[ApiResponse] | ApiResponse:
-        """Send an api request wiht rpc payloads"""
-
-        if isinstance(payloads, Payload):
-            _payloads = [payloads]
-        else:
-            _payloads = payloads
+    def build_api_request(self, payloads: list[Payload], encoded: Optional[EncodedPayloads] = None) -> tuple[str, dict, str]:
+        """Build url, querystring and encoded body of a batchexecute request, reusing encode_payload
+        results found in encoded"""
+        with self.span("encode", payload_count=len(payloads)) as span:
+            url, querystring, payload_encoded = self._build_api_request(payloads, encoded)
+            span.set(rpcids=querystring["rpcids"], bytes=len(payload_encoded))
+        return url, querystring, payload_encoded
 
+    def _build_api_request(self, payloads: list[Payload], encoded: Optional[EncodedPayloads]) -> tuple[str, dict, str]:
+        metrics = self.metrics
+        if metrics is not None:
+            started = time.perf_counter()
+        prepared, elements = self.prepare_payloads(payloads, encoded)
         querystring = {
-            "rpcids": ",".join([payload.rpcid for payload in _payloads]),
+            "rpcids": ",".join([payload.rpcid for payload in payloads]),
             "source-path": "/",
             "f.sid": self.global_data["FdrFJe"],
             "bl": self.global_data["cfb2h"],
             "rt": "c",
         }
         payload = {
-            "f.req": json.dumps([[self.prepare_payload(payload) for payload in _payloads]], separators=(",", ":")),
+            # joined elements are what dumps([prepared]) writes
+            "f.req": b"[[" + b",".join(elements) + b"]]" if elements is not None else json_backend.dumps([prepared], floats=False),
             "at": self.global_data["SNlM0e"],
         }
         payload_encoded = "&".join(f"{key}={urllib.parse.quote(value, safe='')}" for key, value in payload.items())
 
-        url = f"https://photos.google.com{self.global_data['Im6cmf']}/data/batchexecute"
+        url = f"{self.base_url}{self.global_data['Im6cmf']}/data/batchexecute"
+        if metrics is not None:
+            rpcids = [payload.rpcid for payload in payloads]
+            metrics.observe_batch("encode_seconds", rpcids, time.perf_counter() - started)
+            metrics.observe_batch("batch_size", rpcids, len(payloads))
+            for rpcid, data, *_ in prepared:
+                metrics.observe("request_bytes", rpcid, len(data))
+        return url, querystring, payload_encoded
+
+    def record_post(self, rpcids: list[str], elapsed: float, attempt: int) -> None:
+        """Report a sent request to metrics"""
+        self.metrics.observe_batch("network_seconds", rpcids, elapsed)
+        self.metrics.increment_batch("requests", rpcids)
+        if attempt:
+            self.metrics.increment_batch("retries", rpcids)
+
+    @staticmethod
+    def response_size(response, stream: bool) -> Optional[int]:
+        """Body size of a response, from Content-Length when the body is streamed"""
+        if not stream:
+            return len(response.content)
+        content_length = response.headers.get("Content-Length")
+        return int(content_length) if content_length and content_length.isdigit() else None
+
+    def parse_envelope(self, envelope: list, payload: Payload) -> ApiResponse:
+        """Parse a single wrb.fr envelope into an ApiResponse"""
+        success = False
+        response_data = envelope[2]
+        response_id = envelope[6]
+        response_rpcid = envelope[1]
+        metrics = self.metrics
+        if response_data:
+            if metrics is not None:
+                metrics.observe("response_bytes", response_rpcid, len(response_data))
+                started = time.perf_counter()
+            with self.span("json.loads", rpcid=response_rpcid, bytes=len(response_data)):
+                response_data = json_backend.loads(response_data)
+            if metrics is not None:
+                metrics.observe("decode_seconds", response_rpcid, time.perf_counter() - started)
+            success = True
+        parse_response = payload.parse_response
+        if parse_response:
+            if metrics is not None:
+                started = time.perf_counter()
+            with self.span("parse_response_data", rpcid=response_rpcid):
+                response_data = parse_response_data(response_rpcid, response_data, lazy=parse_response == "lazy")
+            if metrics is not None:
+                metrics.observe("parse_seconds", response_rpcid, time.perf_counter() - started)
+        return ApiResponse(
+            rpcid=response_rpcid,
+            success=success,
+            response_id=response_id,
+            data=response_data,
+        )
+
+    def parse_frames(self, frames: Iterable[list], payloads: Iterable[Payload]) -> Iterator[ApiResponse]:
+        """Parse rpc responses out of decoded frames, as they come.
+        Every payload gets a response, failed ones carry an error."""
+        demux = ResponseDemultiplexer(self, payloads)
+        for frame in frames:
+            yield from demux.feed(frame)
+        yield from demux.close()
+
+    def parse_api_response(self, response_body: bytes | str, payloads: Iterable[Payload]) -> list[ApiResponse]:
+        """Parse api response, from the raw body bytes preferably"""
+        if isinstance(response_body, str):
+            response_body = response_body.encode()
+        with self.span("parse_api_response", bytes=len(response_body)):
+            with self.span("framing") as span:
+                frames = [json_backend.loads(line) for line in response_body.split(b"\n") if line.startswith(b"[")]
+                span.set(frame_count=len(frames))
+            return list(self.parse_frames(frames, payloads))
+
+
+class Client(BaseClient):
+    """Reverse engineered Google Photos web API client."""
+
+    def __init__(
+        self,
+        cookies_txt_path: str | Path,
+        log_level: Literal["INFO", "DEBUG", "WARNING", "ERROR", "CRITICAL"] = "INFO",
+        max_workers: int = 8,
+        global_data_cache: Optional[GlobalDataCache] = None,
+        lazy: bool = False,
+        cookies_flush_interval: float = 5.0,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        metrics: Optional[MetricsCollector] = None,
+        tracer: Optional[Tracer] = None,
+        base_url: str = "https://photos.google.com",
+    ) -> None:
+        """max_workers caps requests running in the background with `submit_api_request`.
+        global_data_cache skips the main page request while the cached global_data is fresh.
+        lazy defers the bootstrap until global_data is first needed.
+        cookies_flush_interval is the minimum time between cookie file writes done on exit.
+        rate_limiter paces api requests and adapts to throttling, requests are not paced if None.
+        metrics receives per rpcid sizes, timings and retry counts, nothing is measured if None.
+        tracer records spans of bootstrap, encoding, requests and parsing, nothing is traced if None.
+        base_url points the client at another server, like `gpwc.fake_server` for load tests."""
+        super().__init__(cookies_txt_path, log_level, global_data_cache, cookies_flush_interval, rate_limiter, metrics, tracer, base_url)
+        self.max_workers = max_workers
+        self._executor = None
+        self._global_data = None
+        self._bootstrap_lock = threading.Lock()
+        self.session = utils.new_session_with_retries()
+        self.load_cookies_in_session()
+        if not lazy:
+            self.bootstrap()
 
-        response = self.session.post(url, data=payload_encoded, params=querystring)
+    @property
+    def global_data(self) -> dict:
+        """global_data of the account, bootstrapped on first access"""
+        if self._global_data is None:
+            self.bootstrap()
+        return self._global_data
 
-        response.raise_for_status()
+    @global_data.setter
+    def global_data(self, global_data: dict) -> None:
+        self._global_data = global_data
+
+    def bootstrap(self) -> None:
+        """Load global_data from cache or from the main page, once"""
+        with self._bootstrap_lock:
+            if self._global_data is not None:
+                return
+            global_data = self.load_cached_global_data()
+            if global_data is None:
+                global_data = self.get_global_data()
+                self.store_global_data(global_data)
+                self.save_cookies_to_file()
+            self._global_data = global_data
+            self.logger.info(f"Account: {global_data['oPEP7c']}")
+
+    def refresh_global_data(self) -> None:
+        """Fetch global_data again, bypassing the cache"""
+        with self._bootstrap_lock:
+            self._global_data = self.get_global_data()
+            self.store_global_data(self._global_data)
+
+    def __enter__(self):
+        """Enter"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Save changed session cookies to file on exit, at most once per cookies_flush_interval"""
+        self.cookie_store.save(self.session.cookies)
+
+    def close(self) -> None:
+        """Save cookies, wait for submitted requests and close underlying connections"""
+        self.save_cookies_to_file()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.session.close()
+
+    def load_cookies_in_session(self) -> None:
+        """Load cookies from cookies.txt and upate session cookies with them"""
+        cookies = self.cookie_store.load()
+        self.session.cookies.update(cookies)
+
+    def get_global_data(self) -> dict:
+        """Get and parse global_data from photos.google.com page"""
+        with self.span("get_global_data") as span:
+            page_body = self.session.get(f"{self.base_url}/").text
+            span.set(bytes=len(page_body))
+            return self.parse_main_page(page_body)
+
+    def save_cookies_to_file(self) -> None:
+        """Save sesion cookies to file in netscape format, if they changed"""
+        self.cookie_store.flush(self.session.cookies)
+
+    @overload
+    def send_api_request(self, payloads: Payload, encoded: Optional[EncodedPayloads] = None) -> ApiResponse: ...
+
+    @overload
+    def send_api_request(self, payloads: Iterable[Payload], encoded: Optional[EncodedPayloads] = None) -> list[ApiResponse]: ...
+
+    def send_api_request(self, payloads: Iterable[Payload] | Payload, encoded: Optional[EncodedPayloads] = None) -> list[ApiResponse] | ApiResponse:
+        """Send an api request wiht rpc payloads, encoded holds payloads already encoded with encode_payload"""
 
-        pared_responses = self.parse_api_response(response.text, _payloads)
+        if isinstance(payloads, Payload):
+            _payloads = [payloads]
+        else:
+            _payloads = list(payloads)
+
+        with self.span("send_api_request", payload_count=len(_payloads)):
+            response = self.post_api_request(_payloads, encoded=encoded)
+            pared_responses = self.parse_api_response(response.content, _payloads)
         if isinstance(payloads, Payload):
             return pared_responses[0]
         return pared_responses
 
-    def parse_api_response(self, response_body: str, payloads: Iterable[Payload]) -> list[ApiResponse]:
-        """Parse api response"""
-        responses = [json.loads(line) for line in response_body.split("\n") if "wrb.fr" in line]
-        parsed_responses = []
-        for response in responses:
-            success = False
-            response_data = response[0][2]
-            if response_data:
-                response_data = json.loads(response_data)
-                success = True
-            response_id = response[0][6]
-            response_rpcid = response[0][1]
-            parse_response = next(payload.parse_response for payload in payloads if payload.payload_id == response_id)
-            api_response = ApiResponse(
-                rpcid=response_rpcid,
-                success=success,
-                response_id=response_id,
-                data=parse_response_data(response_rpcid, response_data) if parse_response else response_data,
-            )
-            parsed_responses.append(api_response)
-        return parsed_responses
+    def post_api_request(self, payloads: list[Payload], stream: bool = False, encoded: Optional[EncodedPayloads] = None) -> requests.Response:
+        """POST a batchexecute request, retried once with fresh global_data if cached one is rejected"""
+        response = self._post(payloads, stream, encoded)
+        if response.status_code in self.STALE_GLOBAL_DATA_STATUSES and self.global_data_from_cache:
+            response.close()
+            self.logger.info("Cached global data rejected, bootstrapping again")
+            self.refresh_global_data()
+            if self.metrics is not None:
+                self.metrics.increment_batch("retries", [payload.rpcid for payload in payloads])
+            response = self._post(payloads, stream)
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            # a streamed response holds its connection until closed
+            response.close()
+            raise
+        return response
+
+    def _post(self, payloads: list[Payload], stream: bool, encoded: Optional[EncodedPayloads] = None) -> requests.Response:
+        """POST paced by the rate limiter, throttled requests are sent again after backing off"""
+        url, querystring, payload_encoded = self.build_api_request(payloads, encoded)
+        rpcids = [payload.rpcid for payload in payloads]
+        metrics = self.metrics
+        for attempt in range(self.THROTTLE_RETRIES + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(rpcids)
+            if metrics is not None:
+                started = time.perf_counter()
+            with self.span("post", rpcids=querystring["rpcids"], payload_count=len(payloads), bytes=len(payload_encoded)) as span:
+                response = self.session.post(url, data=payload_encoded, params=querystring, stream=stream)
+                span.set(status=response.status_code, response_bytes=self.response_size(response, stream))
+            if metrics is not None:
+                self.record_post(rpcids, time.perf_counter() - started, attempt)
+            if self.rate_limiter is None:
+                return response
+            retry = self.rate_limiter.feedback(rpcids, response.status_code, response.headers.get("Retry-After"))
+            if not retry or attempt == self.THROTTLE_RETRIES:
+                return response
+            response.close()
+            self.logger.info(f"Throttled with status {response.status_code}, backing off")
+        return response
+
+    def stream_frames(self, payloads: list[Payload], chunk_size: int = 64 * 1024) -> Iterator[list]:
+        """Send an api request and yield decoded frames as they are received"""
+        with self.post_api_request(payloads, stream=True) as response:
+            yield from iter_frames(response.iter_content(chunk_size))
+
+    def stream_api_request(self, payloads: Iterable[Payload], chunk_size: int = 64 * 1024) -> Iterator[ApiResponse]:
+        """Send an api request and yield each response as soon as its frame is received"""
+        _payloads = list(payloads)
+        yield from self.parse_frames(self.stream_frames(_payloads, chunk_size), _payloads)
+
+    def submit_api_request(self, payloads: Iterable[Payload]) -> list[Future]:
+        """Send an api request in the background, returns one future per payload in input order.
+        Futures resolve as their frames arrive, use `concurrent.futures.as_completed` to consume them in that order."""
+        _payloads = list(payloads)
+        demux = ResponseDemultiplexer(self, _payloads, future_factory=Future)
+        self.executor.submit(contextvars.copy_context().run, self._feed_demultiplexer, demux, _payloads)
+        return [demux.futures[payload.payload_id] for payload in _payloads]
+
+    def _feed_demultiplexer(self, demux: ResponseDemultiplexer, payloads: list[Payload]) -> None:
+        try:
+            with self.span("submit_api_request", payload_count=len(payloads)):
+                for frame in self.stream_frames(payloads):
+                    demux.feed(frame)
+                demux.close()
+        except BaseException as e:
+            demux.fail(e)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool running submitted requests"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="gpwc")
+        return self._executor
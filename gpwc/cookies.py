@@ -0,0 +1,152 @@
+import atexit
+import os
+import tempfile
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from http.cookiejar import Cookie, CookieJar, MozillaCookieJar
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+    import msvcrt
+
+CookieKey = tuple[str, str, str]
+
+_STORES: "weakref.WeakSet[CookieStore]" = weakref.WeakSet()
+
+
+def _cookie_key(cookie: Cookie) -> CookieKey:
+    return (cookie.domain, cookie.path, cookie.name)
+
+
+def _cookie_state(cookie: Cookie) -> tuple:
+    return (cookie.value, cookie.expires, cookie.secure)
+
+
+def snapshot(jar: CookieJar) -> dict[CookieKey, tuple]:
+    """Comparable state of every cookie in a jar"""
+    return {_cookie_key(cookie): _cookie_state(cookie) for cookie in jar}
+
+
+@contextmanager
+def file_lock(lock_path: Path) -> Iterator[None]:
+    """Exclusive lock shared between processes, held while the block runs"""
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class CookieStore:
+    """Netscape cookies file kept in sync with a session cookie jar.
+
+    The file is only written when cookies changed since they were loaded or last written, at most once
+    per flush_interval seconds unless flushed explicitly. Writes go through a temporary file and an
+    atomic rename, under a lock file, and are merged with what other processes wrote in the meantime:
+    only cookies changed by this session override the ones on disk. Pending changes are flushed at exit.
+    """
+
+    def __init__(self, path: str | Path, flush_interval: float = 5.0) -> None:
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.flush_interval = flush_interval
+        self._snapshot: dict[CookieKey, tuple] = {}
+        self._last_write = 0.0
+        self._pending: Optional[CookieJar] = None
+        self._lock = threading.Lock()
+        _STORES.add(self)
+
+    def load(self) -> MozillaCookieJar:
+        """Read cookies from the file, they become the clean state"""
+        cookie_jar = MozillaCookieJar(self.path)
+        cookie_jar.load(ignore_discard=True, ignore_expires=True)
+        self._snapshot = snapshot(cookie_jar)
+        return cookie_jar
+
+    def is_dirty(self, jar: CookieJar) -> bool:
+        """Whether jar differs from what was last loaded or written"""
+        return snapshot(jar) != self._snapshot
+
+    def save(self, jar: CookieJar) -> bool:
+        """Write jar if it changed and flush_interval passed since the last write, returns whether it was written.
+        Skipped changes stay pending until the next save, `flush` or exit."""
+        with self._lock:
+            if not self.is_dirty(jar):
+                self._pending = None
+                return False
+            if time.monotonic() - self._last_write < self.flush_interval:
+                self._pending = jar
+                return False
+            self._write(jar)
+            return True
+
+    def flush(self, jar: Optional[CookieJar] = None) -> bool:
+        """Write jar, or the pending one, now if it changed, returns whether it was written"""
+        with self._lock:
+            jar = jar if jar is not None else self._pending
+            if jar is None or not self.is_dirty(jar):
+                self._pending = None
+                return False
+            self._write(jar)
+            return True
+
+    def _write(self, jar: CookieJar) -> None:
+        current = {_cookie_key(cookie): cookie for cookie in jar}
+        with file_lock(self.lock_path):
+            merged = MozillaCookieJar(self.path)
+            if self.path.exists():
+                merged.load(ignore_discard=True, ignore_expires=True)
+            for key in self._snapshot.keys() - current.keys():
+                domain, path, name = key
+                try:
+                    merged.clear(domain, path, name)
+                except KeyError:
+                    pass
+            for key, cookie in current.items():
+                if self._snapshot.get(key) != _cookie_state(cookie):
+                    merged.set_cookie(cookie)
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+            os.close(fd)
+            try:
+                merged.save(tmp_path, ignore_discard=True, ignore_expires=True)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        # adopt what other processes wrote for cookies this session did not change, so the jar ends up
+        # as written and the next write does not revert them
+        written = {_cookie_key(cookie): cookie for cookie in merged}
+        for key in current.keys() - written.keys():
+            jar.clear(*key)
+        for key, cookie in written.items():
+            if key not in current or _cookie_state(current[key]) != _cookie_state(cookie):
+                jar.set_cookie(cookie)
+        self._snapshot = snapshot(merged)
+        self._last_write = time.monotonic()
+        self._pending = None
+
+
+@atexit.register
+def _flush_pending() -> None:
+    for store in list(_STORES):
+        try:
+            store.flush()
+        except OSError:
+            pass
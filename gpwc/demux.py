@@ -0,0 +1,88 @@
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
+
+from .exceptions import BatchError, GpwcError, MissingResponseError, ResponseParseError, RpcError
+from .models import ApiResponse
+from .payloads import Payload
+from .utils import safe_get
+
+if TYPE_CHECKING:
+    from .client import BaseClient
+
+
+class ResponseDemultiplexer:
+    """Route frames of a batch response to their payloads by payload_id.
+
+    Every payload gets exactly one ApiResponse. Failed sub-responses carry a typed `error` instead of
+    breaking the batch: `RpcError` for rpcs without data, `BatchError` for `er` frames,
+    `ResponseParseError` when parsing fails and `MissingResponseError` for payloads left unanswered.
+    With a future_factory, each payload also gets a future resolved as soon as its response is known.
+    """
+
+    def __init__(self, client: "BaseClient", payloads: Iterable[Payload], future_factory: Optional[Callable[[], Any]] = None) -> None:
+        self.client = client
+        self.payloads = {payload.payload_id: payload for payload in payloads}
+        self.pending = dict(self.payloads)
+        self.futures = {payload_id: future_factory() for payload_id in self.payloads} if future_factory else {}
+
+    def feed(self, frame: list) -> list[ApiResponse]:
+        """Handle a decoded frame, return the responses it resolved"""
+        resolved = []
+        for envelope in frame:
+            match envelope[0]:
+                case "wrb.fr":
+                    payload = self.pending.get(envelope[6])
+                    if payload is None:
+                        self.client.logger.warning(f"Response for unknown payload {envelope[6]} of {envelope[1]}")
+                        continue
+                    response = self._parse(envelope, payload)
+                    if isinstance(response.error, RpcError) and self.client.rate_limiter is not None:
+                        if response.error.code in self.client.rate_limiter.THROTTLE_CODES:
+                            self.client.rate_limiter.on_rpc_error(payload.rpcid)
+                    resolved.append(self.resolve(payload, response))
+                case "er":
+                    code = safe_get(envelope, 5)
+                    failed_rpcids = set()
+                    for payload in list(self.pending.values()):
+                        error = BatchError(payload.rpcid, payload.payload_id, "batch failed", code=code)
+                        resolved.append(self.resolve(payload, self.failed(payload, error)))
+                        failed_rpcids.add(payload.rpcid)
+                    if self.client.rate_limiter is not None:
+                        for rpcid in failed_rpcids:
+                            self.client.rate_limiter.on_rpc_error(rpcid)
+        return resolved
+
+    def close(self) -> list[ApiResponse]:
+        """End of response, payloads still pending resolve with MissingResponseError"""
+        return [self.resolve(payload, self.failed(payload, MissingResponseError(payload.rpcid, payload.payload_id, "no response"))) for payload in list(self.pending.values())]
+
+    def fail(self, exception: BaseException) -> None:
+        """Request itself failed, pending futures get the exception"""
+        for payload_id in list(self.pending):
+            del self.pending[payload_id]
+            future = self.futures.get(payload_id)
+            if future is not None and not future.done():
+                future.set_exception(exception)
+
+    def resolve(self, payload: Payload, response: ApiResponse) -> ApiResponse:
+        del self.pending[payload.payload_id]
+        if response.error is not None and self.client.metrics is not None:
+            self.client.metrics.increment("rpc_errors", payload.rpcid)
+        future = self.futures.get(payload.payload_id)
+        if future is not None and not future.done():
+            future.set_result(response)
+        return response
+
+    @staticmethod
+    def failed(payload: Payload, error: GpwcError, data: Any = None) -> ApiResponse:
+        return ApiResponse(rpcid=payload.rpcid, data=data, success=False, response_id=payload.payload_id, error=error)
+
+    def _parse(self, envelope: list, payload: Payload) -> ApiResponse:
+        try:
+            response = self.client.parse_envelope(envelope, payload)
+        except Exception as e:
+            error = ResponseParseError(payload.rpcid, payload.payload_id, f"{type(e).__name__}: {e}")
+            error.__cause__ = e
+            return self.failed(payload, error, data=envelope[2])
+        if not response.success:
+            response.error = RpcError(payload.rpcid, payload.payload_id, code=safe_get(envelope, 5, 0))
+        return response
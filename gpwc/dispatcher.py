@@ -0,0 +1,115 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import TYPE_CHECKING, Awaitable, Iterable, Iterator, Optional
+
+from .models import ApiResponse
+from .payloads import EncodedPayloads, Payload
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .async_client import AsyncClient
+
+
+# bytes `urllib.parse.quote(value, safe="")` leaves as they are, any other one becomes %XX
+_UNRESERVED = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~"
+
+
+def quoted_size(value: bytes) -> int:
+    """Length of value once url-encoded in the request body"""
+    return len(value) + 2 * len(value.translate(None, _UNRESERVED))
+
+
+# url-encoded `,` between two payloads of f.req, and `[[`, `]]` around them
+SEPARATOR_SIZE = quoted_size(b",")
+WRAPPER_SIZE = quoted_size(b"[[]]")
+
+
+def payload_size(client: "Client | AsyncClient", payload: Payload, encoded: Optional[EncodedPayloads] = None) -> int:
+    """Size in bytes the payload takes in the url-encoded f.req of the request body, with the separator
+    before it. The encoding is kept in encoded if given, for the request to reuse."""
+    encoding = client.encode_payload(payload)
+    if encoded is not None:
+        encoded[payload] = encoding
+    return quoted_size(encoding[1]) + SEPARATOR_SIZE
+
+
+def chunk_payloads(
+    client: "Client | AsyncClient",
+    payloads: Iterable[Payload],
+    max_payloads: int = 50,
+    max_bytes: int = 512 * 1024,
+    encoded: Optional[EncodedPayloads] = None,
+) -> Iterator[list[Payload]]:
+    """Split payloads into batches capped by payload count and url-encoded f.req size.
+    A single payload bigger than max_bytes is sent in a batch of its own. Payload encodings are kept in
+    encoded if given, pass it to `send_api_request` so they are not encoded again."""
+    # the first payload of a chunk has no separator
+    empty_chunk_bytes = WRAPPER_SIZE - SEPARATOR_SIZE
+    chunk: list[Payload] = []
+    chunk_bytes = empty_chunk_bytes
+    for payload in payloads:
+        size = payload_size(client, payload, encoded)
+        if chunk and (len(chunk) >= max_payloads or chunk_bytes + size > max_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = empty_chunk_bytes
+        chunk.append(payload)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+class BatchDispatcher:
+    """Send any number of payloads as size bounded batchexecute requests running concurrently.
+
+    Responses are returned in input order, failed sub-responses carry an `error`.
+    """
+
+    def __init__(
+        self,
+        client: "Client | AsyncClient",
+        max_payloads: int = 50,
+        max_bytes: int = 512 * 1024,
+        max_workers: int = 8,
+    ) -> None:
+        self.client = client
+        self.max_payloads = max_payloads
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+
+    def chunks(self, payloads: Iterable[Payload], encoded: Optional[EncodedPayloads] = None) -> Iterator[list[Payload]]:
+        """Split payloads using this dispatcher limits"""
+        return chunk_payloads(self.client, payloads, self.max_payloads, self.max_bytes, encoded)
+
+    def send(self, payloads: Iterable[Payload]) -> list[ApiResponse] | Awaitable[list[ApiResponse]]:
+        """Send payloads, returns an awaitable if client is an `AsyncClient`"""
+        if self.client.is_async:
+            return self._send_async(payloads)
+        # encodings made to size the chunks, only ever seen by their requests
+        encoded: EncodedPayloads = {}
+        chunks = list(self.chunks(payloads, encoded))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self.client.send_api_request, chunks, repeat(encoded)))
+        return self._order(chunks, results)
+
+    async def _send_async(self, payloads: Iterable[Payload]) -> list[ApiResponse]:
+        encoded: EncodedPayloads = {}
+        chunks = list(self.chunks(payloads, encoded))
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def send_chunk(chunk: list[Payload]) -> list[ApiResponse]:
+            async with semaphore:
+                return await self.client.send_api_request(chunk, encoded)
+
+        results = await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+        return self._order(chunks, results)
+
+    @staticmethod
+    def _order(chunks: list[list[Payload]], results: list[list[ApiResponse]]) -> list[ApiResponse]:
+        """Flatten chunk results back into input order"""
+        ordered = []
+        for chunk, responses in zip(chunks, results):
+            by_id = {response.response_id: response for response in responses}
+            ordered.extend(by_id[payload.payload_id] for payload in chunk)
+        return ordered
@@ -0,0 +1,300 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import requests
+
+from . import payloads
+from .dispatcher import BatchDispatcher
+from .exceptions import DownloadError
+from .parser import Download
+from .ratelimit import TokenBucket
+from .unzip import ProgressCallback, StreamingUnzipper
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+@dataclass(slots=True)
+class DownloadResult:
+    media_key: Optional[str]
+    path: Optional[Path]
+    size: int = 0
+    resumed: bool = False
+    error: Optional[Exception] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def download_token(data: list) -> Optional[str]:
+    """Token out of a GetDownloadToken response"""
+    while isinstance(data, list) and data:
+        data = data[0]
+    return data if isinstance(data, str) else None
+
+
+def parse_content_range(value: Optional[str]) -> Optional[int]:
+    """Total size out of a `bytes start-end/total` Content-Range header"""
+    if not value or "/" not in value:
+        return None
+    total = value.rsplit("/", 1)[1]
+    return int(total) if total.isdigit() else None
+
+
+def safe_file_name(file_name: Optional[str], fallback: str) -> str:
+    """Last component of a server provided file name, so it cannot point outside the destination directory"""
+    name = Path(str(file_name or "").replace("\\", "/")).name
+    return name if name not in ("", ".", "..") else fallback
+
+
+def unique_file_names(file_names: list[str], media_keys: list[Optional[str]]) -> list[str]:
+    """Distinct names for files downloaded together, repeated ones get a `-<media_key>` suffix, or a counter.
+    Names are compared case insensitively, for case insensitive filesystems."""
+    used: set[str] = set()
+    unique = []
+    for file_name, media_key in zip(file_names, media_keys):
+        if not file_name:
+            unique.append(file_name)
+            continue
+        stem, suffix = os.path.splitext(file_name)
+        name = file_name
+        if name.casefold() in used and media_key:
+            name = f"{stem}-{media_key}{suffix}"
+        counter = 1
+        while name.casefold() in used:
+            counter += 1
+            name = f"{stem}-{counter}{suffix}"
+        used.add(name.casefold())
+        unique.append(name)
+    return unique
+
+
+class DownloadManager:
+    """Download library items to disk.
+
+    Download tokens are requested in batches and polled with exponential backoff until their urls are
+    ready. Files are streamed to disk in chunk_size pieces, into a `.part` file renamed once complete,
+    so nothing is ever held in memory whole. Interrupted downloads resume with range requests. Files of
+    at least parallel_threshold bytes are fetched as parallel ranges of part_size, progress of those is
+    kept in a `.part.json` sidecar. max_connections caps open http streams across all files and
+    max_bytes_per_second caps the combined bandwidth.
+    """
+
+    def __init__(
+        self,
+        client: "Client",
+        max_connections: int = 8,
+        max_bytes_per_second: Optional[float] = None,
+        chunk_size: int = 1024 * 1024,
+        part_size: int = 16 * 1024 * 1024,
+        parallel_threshold: int = 64 * 1024 * 1024,
+        parts_per_file: int = 4,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 30.0,
+        poll_timeout: float = 600.0,
+    ) -> None:
+        self.client = client
+        self.max_connections = max_connections
+        self.chunk_size = chunk_size
+        self.part_size = part_size
+        self.parallel_threshold = parallel_threshold
+        self.parts_per_file = parts_per_file
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.poll_timeout = poll_timeout
+        self.bandwidth = TokenBucket(max_bytes_per_second, burst=chunk_size) if max_bytes_per_second else None
+        self._connections = threading.BoundedSemaphore(max_connections)
+        self._sidecar_lock = threading.Lock()
+
+    def request_downloads(self, media_key_groups: Iterable[list[str]]) -> list[Download | DownloadError]:
+        """Request a download token for every group of media keys and poll until their urls are ready.
+        A group of several keys is downloaded as a single zip archive."""
+        dispatcher = BatchDispatcher(self.client, max_workers=self.max_connections)
+        groups = list(media_key_groups)
+        results: list[Download | DownloadError] = [DownloadError(f"No download token for {group}") for group in groups]
+        pending: dict[str, int] = {}
+        for index, response in enumerate(dispatcher.send(payloads.GetDownloadToken(group) for group in groups)):
+            token = download_token(response.data) if response.success else None
+            if token is not None:
+                pending[token] = index
+
+        delay = self.poll_interval
+        deadline = time.monotonic() + self.poll_timeout
+        while pending:
+            tokens = list(pending)
+            for token, response in zip(tokens, dispatcher.send(payloads.CheckDownloadToken(token) for token in tokens)):
+                if response.success and response.data.download_url:
+                    results[pending.pop(token)] = response.data
+            if not pending:
+                break
+            if time.monotonic() + delay > deadline:
+                for token, index in pending.items():
+                    results[index] = DownloadError(f"Download of {groups[index]} not ready after {self.poll_timeout}s")
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+        return results
+
+    def download(self, media_keys: Iterable[str], dest_dir: str | Path) -> list[DownloadResult]:
+        """Download original files of media keys into dest_dir, results are in input order"""
+        media_keys = list(media_keys)
+        downloads = self.request_downloads([media_key] for media_key in media_keys)
+        return self._download_all(media_keys, downloads, Path(dest_dir))
+
+    def download_archive(self, media_keys: Iterable[str], dest_dir: str | Path) -> DownloadResult:
+        """Download media keys as a single zip archive into dest_dir"""
+        (download,) = self.request_downloads([list(media_keys)])
+        (result,) = self._download_all([None], [download], Path(dest_dir))
+        return result
+
+    def extract_archive(self, media_keys: Iterable[str], dest_dir: str | Path, progress: Optional[ProgressCallback] = None) -> list[Path]:
+        """Download media keys as a zip archive and extract it into dest_dir while it is received,
+        the archive itself is never written to disk. progress is called with the unzipped bytes so far
+        and the `unzipped_size` of the download. Returns the extracted files."""
+        (download,) = self.request_downloads([list(media_keys)])
+        if isinstance(download, DownloadError):
+            raise download
+        with StreamingUnzipper(dest_dir, download.unzipped_size, progress) as unzipper:
+            with self._connections:
+                with self.client.session.get(download.download_url, stream=True) as response:
+                    response.raise_for_status()
+                    self._copy(response, unzipper)
+        return unzipper.extracted
+
+    def _download_all(self, media_keys: list[Optional[str]], downloads: list[Download | DownloadError], dest_dir: Path) -> list[DownloadResult]:
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        # items run concurrently, each needs its own file even when the server gives them the same name
+        file_names = [
+            safe_file_name(download.file_name, media_key or "download") if not isinstance(download, DownloadError) else ""
+            for media_key, download in zip(media_keys, downloads)
+        ]
+        file_names = unique_file_names(file_names, media_keys)
+
+        def run(media_key: Optional[str], download: Download | DownloadError, file_name: str) -> DownloadResult:
+            if isinstance(download, DownloadError):
+                return DownloadResult(media_key, None, error=download)
+            path = dest_dir / file_name
+            try:
+                size, resumed = self.download_url(download.download_url, path, download.download_size)
+            except (OSError, requests.RequestException, DownloadError) as e:
+                return DownloadResult(media_key, path, error=e)
+            return DownloadResult(media_key, path, size, resumed)
+
+        with ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix="gpwc-download") as executor:
+            return list(executor.map(run, media_keys, downloads, file_names))
+
+    def download_url(self, url: str, path: str | Path, size: Optional[int] = None) -> tuple[int, bool]:
+        """Stream url into path, resuming a previous attempt, returns the file size and whether it resumed.
+        Works for any url the session can fetch, like `ItemInfo.download_original_url`."""
+        path = Path(path)
+        part_path = path.with_name(path.name + ".part")
+        sidecar_path = path.with_name(path.name + ".part.json")
+        if path.exists() and (size is None or path.stat().st_size == size):
+            return path.stat().st_size, False
+
+        if size is None or size >= self.parallel_threshold:
+            probed_size, ranges = self._probe(url)
+            size = size or probed_size
+        else:
+            ranges = True
+
+        if ranges and size and size >= self.parallel_threshold:
+            resumed = self._download_parts(url, part_path, sidecar_path, size)
+        else:
+            resumed = self._download_stream(url, part_path, ranges, size)
+
+        written = part_path.stat().st_size
+        if size is not None and written != size:
+            raise DownloadError(f"{path.name}: got {written} bytes, expected {size}")
+        os.replace(part_path, path)
+        sidecar_path.unlink(missing_ok=True)
+        return written, resumed
+
+    def _probe(self, url: str) -> tuple[Optional[int], bool]:
+        """Total size and range support of url"""
+        with self._connections:
+            with self.client.session.get(url, headers={"Range": "bytes=0-0"}, stream=True) as response:
+                response.raise_for_status()
+                if response.status_code == 206:
+                    return parse_content_range(response.headers.get("Content-Range")), True
+                length = response.headers.get("Content-Length")
+                return (int(length) if length and length.isdigit() else None), False
+
+    def _download_stream(self, url: str, part_path: Path, ranges: bool, size: Optional[int] = None) -> bool:
+        """Single stream download, appending to an existing part file when ranges are supported"""
+        offset = part_path.stat().st_size if ranges and part_path.exists() else 0
+        if size is not None and offset > size:
+            offset = 0
+        if offset and offset == size:
+            # complete, the rename was interrupted
+            return True
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with self._connections:
+            with self.client.session.get(url, headers=headers, stream=True) as response:
+                if offset and response.status_code == 416 and parse_content_range(response.headers.get("Content-Range")) == offset:
+                    # range starts at the end of the file, the part file is complete
+                    return True
+                response.raise_for_status()
+                if offset and response.status_code != 206:
+                    offset = 0
+                with open(part_path, "ab" if offset else "wb") as f:
+                    self._copy(response, f)
+        return offset > 0
+
+    def _download_parts(self, url: str, part_path: Path, sidecar_path: Path, size: int) -> bool:
+        """Parallel range download into a preallocated part file, finished parts are kept in the sidecar"""
+        parts = [(start, min(start + self.part_size, size) - 1) for start in range(0, size, self.part_size)]
+        state = {"size": size, "part_size": self.part_size, "done": []}
+        if part_path.exists() and sidecar_path.exists():
+            try:
+                saved = json.loads(sidecar_path.read_text())
+                if saved.get("size") == size and saved.get("part_size") == self.part_size:
+                    state = saved
+            except ValueError:
+                pass
+        done = set(state["done"])
+        resumed = bool(done)
+        if not resumed:
+            with open(part_path, "wb") as f:
+                f.truncate(size)
+
+        def fetch(index: int) -> None:
+            start, end = parts[index]
+            with self._connections:
+                with self.client.session.get(url, headers={"Range": f"bytes={start}-{end}"}, stream=True) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise DownloadError(f"{part_path.name}: range request answered with {response.status_code}")
+                    with open(part_path, "r+b") as f:
+                        f.seek(start)
+                        copied = self._copy(response, f)
+            if copied != end - start + 1:
+                raise DownloadError(f"{part_path.name}: part {index} got {copied} bytes, expected {end - start + 1}")
+            with self._sidecar_lock:
+                state["done"].append(index)
+                tmp_path = sidecar_path.with_name(sidecar_path.name + ".tmp")
+                tmp_path.write_text(json.dumps(state))
+                os.replace(tmp_path, sidecar_path)
+
+        todo = [index for index in range(len(parts)) if index not in done]
+        with ThreadPoolExecutor(max_workers=self.parts_per_file, thread_name_prefix="gpwc-part") as executor:
+            for future in [executor.submit(fetch, index) for index in todo]:
+                future.result()
+        return resumed
+
+    def _copy(self, response: requests.Response, f) -> int:
+        """Write the response body to f chunk by chunk, paced by the bandwidth cap"""
+        copied = 0
+        for chunk in response.iter_content(self.chunk_size):
+            if self.bandwidth is not None:
+                self.bandwidth.acquire(len(chunk))
+            f.write(chunk)
+            copied += len(chunk)
+        return copied
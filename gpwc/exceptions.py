@@ -0,0 +1,50 @@
+from typing import Optional
+
+
+class GpwcError(Exception):
+    """Base class of gpwc errors"""
+
+
+class RpcError(GpwcError):
+    """An rpc sub-response came back without data, code is the status the server attached to it"""
+
+    def __init__(self, rpcid: str, payload_id: Optional[str], message: str = "rpc returned no data", code: Optional[int] = None) -> None:
+        self.rpcid = rpcid
+        self.payload_id = payload_id
+        self.code = code
+        details = f"{message} (code {code})" if code is not None else message
+        super().__init__(f"{rpcid} ({payload_id}): {details}")
+
+
+class BatchError(RpcError):
+    """The server answered the whole batch with an `er` frame"""
+
+
+class MissingResponseError(RpcError):
+    """The response ended without a frame for this payload"""
+
+
+class ResponseParseError(RpcError):
+    """The rpc returned data that could not be parsed"""
+
+
+class RequestError(RpcError):
+    """The request carrying this payload failed, the exception raised is the cause"""
+
+
+class RemoteMatchError(GpwcError):
+    """Some hashes could not be looked up, matches holds the ones found for the others"""
+
+    def __init__(self, hashes: list[str], matches: dict, errors: list[GpwcError]) -> None:
+        self.hashes = hashes
+        self.matches = matches
+        self.errors = errors
+        super().__init__(f"{len(hashes)} hashes could not be looked up: {errors[0] if errors else 'unknown error'}")
+
+
+class DownloadError(GpwcError):
+    """A download could not be prepared or completed"""
+
+
+class ArchiveError(GpwcError):
+    """A zip archive could not be extracted"""
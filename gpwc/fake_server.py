@@ -0,0 +1,277 @@
+"""Local stand-in for photos.google.com, for load testing clients without touching Google.
+
+Run with `python -m gpwc.fake_server --port 8080 --latency 0.05` and point a client at it with
+`Client("cookies.txt", base_url="http://127.0.0.1:8080")`.
+"""
+
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterable, Optional
+
+from .synthetic import PAGED_RPCIDS, RPCIDS, ResponseGenerator, dumps, error_frame, wire_body
+
+# index of the page id, and of the requested page size, in the data of paged payloads
+PAGE_ID_INDEX = {"lcxiM": 0, "EzkLib": 2, "zy0IHe": 0, "Z5xsfc": 0, "snAcKc": 1, "F2A0H": 0, "e9T5je": 0}
+PAGE_SIZE_INDEX = {"lcxiM": 2, "Z5xsfc": 7}
+# requested keys of rpcids answering one item per key
+REQUEST_KEYS: dict[str, Callable[[list], list]] = {
+    "swbisb": lambda data: list(data[0]),
+    "EWgK9e": lambda data: [key[0] for key in data[0][0][0]],
+    "SusGud": lambda data: [item[0] for item in data[0]],
+}
+# responses of rpcids the parser does not handle, anything else answers []
+DEFAULT_HANDLERS: dict[str, Callable[[list], Any]] = {
+    "yCLA7": lambda data: [f"token-{zlib.crc32(dumps(data).encode()):08x}"],
+}
+
+
+class FakeServer:
+    """Threaded HTTP server answering like photos.google.com.
+
+    GET serves a main page with a `_gd` WIZ_global_data script, POST to `{Im6cmf}/data/batchexecute`
+    answers every payload of the batch with a `wrb.fr` envelope: `gpwc.synthetic` data for rpcids the
+    parser handles, handlers (rpcid -> function of request data) or [] for others. Paged rpcids walk a
+    chain of total_items items. Faults are injected at random: error_rate of requests get one of
+    error_statuses (with Retry-After if retry_after), er_frame_rate of batches fail with an `er` frame,
+    rpc_error_rate of payloads get an error envelope with rpc_error_code. Requests with a wrong `at`
+    token get 400, `rotate_token` makes the token clients hold stale.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: Iterable[int] = (429, 503),
+        retry_after: Optional[float] = None,
+        er_frame_rate: float = 0.0,
+        rpc_error_rate: float = 0.0,
+        rpc_error_code: int = 8,
+        total_items: int = 2000,
+        page_size: int = 500,
+        frame_size: int = 1,
+        seed: int = 0,
+        account: str = "fake@example.com",
+        handlers: Optional[dict[str, Callable[[list], Any]]] = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.retry_after = retry_after
+        self.er_frame_rate = er_frame_rate
+        self.rpc_error_rate = rpc_error_rate
+        self.rpc_error_code = rpc_error_code
+        self.total_items = total_items
+        self.page_size = page_size
+        self.frame_size = frame_size
+        self.seed = seed
+        self.handlers = {**DEFAULT_HANDLERS, **(handlers or {})}
+        self.global_data = {
+            "FdrFJe": str(random.Random(seed).randint(-(2**63), 2**63)),
+            "cfb2h": "boq_photosuiserver_fake",
+            "SNlM0e": f"fake_at_{secrets.token_hex(8)}",
+            "Im6cmf": "/_/PhotosUi",
+            "oPEP7c": account,
+        }
+        self.stats = {"requests": 0, "rpcs": 0, "http_errors": 0, "er_frames": 0, "rpc_errors": 0, "rejected": 0}
+        self.rng = random.Random(seed)
+        self._pages: dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = _Server((host, port), _Handler)
+        self.httpd.fake = self
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self) -> None:
+        """Serve in a background thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.1}, name="gpwc-fake-server", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket"""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def rotate_token(self) -> None:
+        """Issue a new `at` token, requests with the old one are rejected"""
+        self.global_data["SNlM0e"] = f"fake_at_{secrets.token_hex(8)}"
+
+    def main_page(self) -> str:
+        script = f"window.WIZ_global_data = {json.dumps(self.global_data)};"
+        return f'<!doctype html><html><head><script data-id="_gd" nonce="fake">{script}</script></head><body></body></html>'
+
+    def _chance(self, probability: float) -> bool:
+        if not probability:
+            return False
+        with self._lock:
+            return self.rng.random() < probability
+
+    def _count(self, **counters: int) -> None:
+        with self._lock:
+            for name, value in counters.items():
+                self.stats[name] += value
+
+    def delay(self) -> float:
+        """Seconds to wait before answering"""
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self.rng.uniform(0, self.jitter)
+
+    def handle_batch(self, form: dict[str, str]) -> tuple[int, dict[str, str], str]:
+        """(status, headers, body) answering a batchexecute form"""
+        if form.get("at") != self.global_data["SNlM0e"]:
+            self._count(requests=1, rejected=1)
+            return 400, {}, "bad at token"
+        if self._chance(self.error_rate):
+            self._count(requests=1, http_errors=1)
+            with self._lock:
+                status = self.rng.choice(self.error_statuses)
+            return status, {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}, ""
+        requests = json.loads(form["f.req"])[0]
+        self._count(requests=1, rpcs=len(requests))
+        if self._chance(self.er_frame_rate):
+            self._count(er_frames=1)
+            return 200, {}, wire_body([error_frame()])
+        envelopes = []
+        for rpcid, data_json, _, payload_id in requests:
+            if self._chance(self.rpc_error_rate):
+                self._count(rpc_errors=1)
+                envelopes.append(["wrb.fr", rpcid, None, None, None, [self.rpc_error_code], payload_id])
+                continue
+            envelopes.append(["wrb.fr", rpcid, self.response_json(rpcid, json.loads(data_json)), None, None, None, payload_id])
+        frames = [envelopes[i : i + self.frame_size] for i in range(0, len(envelopes), self.frame_size)]
+        frames.append([["di", 42], ["af.httprm", 41, "-1234567890", 1]])
+        return 200, {}, wire_body(frames)
+
+    def response_json(self, rpcid: str, data: list) -> str:
+        """Encoded response data of a payload"""
+        if rpcid in self.handlers:
+            return dumps(self.handlers[rpcid](data))
+        if rpcid not in RPCIDS:
+            return "[]"
+        if rpcid in PAGED_RPCIDS:
+            return self.page_json(rpcid, data)
+        generator = ResponseGenerator(self.seed ^ zlib.crc32(f"{rpcid}:{dumps(data)}".encode()))
+        if rpcid in REQUEST_KEYS:
+            return dumps(generator.data(rpcid, keys=REQUEST_KEYS[rpcid](data)))
+        return dumps(generator.data(rpcid))
+
+    def page_json(self, rpcid: str, data: list) -> str:
+        """Encoded page of the pagination chain, page ids are `page:<offset>`"""
+        page_id = data[PAGE_ID_INDEX[rpcid]] if len(data) > PAGE_ID_INDEX[rpcid] else None
+        offset = int(page_id.split(":", 1)[1]) if isinstance(page_id, str) and page_id.startswith("page:") else 0
+        page_size = self.page_size
+        if rpcid in PAGE_SIZE_INDEX and len(data) > PAGE_SIZE_INDEX[rpcid] and isinstance(data[PAGE_SIZE_INDEX[rpcid]], int):
+            page_size = data[PAGE_SIZE_INDEX[rpcid]]
+        count = max(0, min(page_size, self.total_items - offset))
+        key = (rpcid, offset, count)
+        page = self._pages.get(key)
+        if page is None:
+            next_page_id = f"page:{offset + count}" if offset + count < self.total_items else None
+            generator = ResponseGenerator(self.seed ^ zlib.crc32(f"{rpcid}:{offset}".encode()))
+            page = self._pages[key] = dumps(generator.data(rpcid, count, next_page_id))
+        return page
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+    fake: FakeServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "gpwc-fake"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        fake: FakeServer = self.server.fake
+        time.sleep(fake.delay())
+        self._send(200, {"Content-Type": "text/html; charset=utf-8"}, fake.main_page())
+
+    def do_POST(self) -> None:
+        fake: FakeServer = self.server.fake
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        path = urllib.parse.urlsplit(self.path).path
+        time.sleep(fake.delay())
+        if path != f"{fake.global_data['Im6cmf']}/data/batchexecute":
+            self._send(404, {}, "not found")
+            return
+        form = {key: values[0] for key, values in urllib.parse.parse_qs(body).items()}
+        status, headers, text = fake.handle_batch(form)
+        self._send(status, {"Content-Type": "application/json; charset=utf-8", **headers}, text)
+
+    def _send(self, status: int, headers: dict[str, str], text: str) -> None:
+        content = text.encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Local stand-in for photos.google.com")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8080)
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="seconds before every response")
+    arg_parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency, up to this many seconds")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429/503")
+    arg_parser.add_argument("--retry-after", type=float, default=None)
+    arg_parser.add_argument("--er-frame-rate", type=float, default=0.0, help="share of batches failed with an er frame")
+    arg_parser.add_argument("--rpc-error-rate", type=float, default=0.0, help="share of payloads answered with an error envelope")
+    arg_parser.add_argument("--total-items", type=int, default=2000, help="items in every pagination chain")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+    server = FakeServer(
+        args.host,
+        args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        er_frame_rate=args.er_frame_rate,
+        rpc_error_rate=args.rpc_error_rate,
+        total_items=args.total_items,
+        seed=args.seed,
+    )
+    print(f"Serving on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
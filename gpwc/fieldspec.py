@@ -0,0 +1,146 @@
+from typing import Any, Callable, Optional
+
+_MISSING = object()
+
+
+class FieldPath:
+    """Path of keys/indices into nested lists and dicts, resolved with the same rules as `utils.safe_get`.
+
+    :param keys: Keys/indices to walk, an empty path resolves to the data itself.
+    :param default: Value used when the path is not found.
+    :param transform: Callable applied to the resolved value (or the default).
+    """
+
+    __slots__ = ("keys", "default", "transform")
+
+    def __init__(self, *keys: Any, default: Any = None, transform: Optional[Callable[[Any], Any]] = None) -> None:
+        self.keys = keys
+        self.default = default
+        self.transform = transform
+
+
+class Computed:
+    """Field built by calling func with the values resolved at several paths."""
+
+    __slots__ = ("func", "paths")
+
+    def __init__(self, func: Callable[..., Any], *paths: FieldPath) -> None:
+        self.func = func
+        self.paths = paths
+
+
+class _Node:
+    __slots__ = ("var", "children")
+
+    def __init__(self, var: str) -> None:
+        self.var = var
+        self.children: dict[Any, _Node] = {}
+
+
+def _emit_children(node: _Node, lines: list[str], new_var: Callable[[], str]) -> None:
+    """Emit code resolving every child of node, then recurse into them"""
+    if not node.children:
+        return
+    for key, child in node.children.items():
+        child.var = child.var or new_var()
+    p = node.var
+    lines.append(f"if isinstance({p}, list):")
+    int_children = [(key, child) for key, child in node.children.items() if isinstance(key, int)]
+    if int_children:
+        lines.append(f"    l = len({p})")
+    for key, child in node.children.items():
+        if not isinstance(key, int):
+            lines.append(f"    {child.var} = M")
+        elif key >= 0:
+            lines.append(f"    {child.var} = {p}[{key}] if l > {key} else M")
+        else:
+            lines.append(f"    {child.var} = {p}[{key}] if l >= {-key} else M")
+    lines.append(f"elif isinstance({p}, dict):")
+    for key, child in node.children.items():
+        lines.append(f"    {child.var} = {p}.get({key!r}, M)")
+    lines.append("else:")
+    lines.append(f"    {' = '.join(child.var for child in node.children.values())} = M")
+    for child in node.children.values():
+        _emit_children(child, lines, new_var)
+
+
+def compile_fields(fields: dict[str, FieldPath | Computed], name: str = "extract", as_dict: bool = True) -> Callable[[Any], Any]:
+    """Compile field specs into one function returning a dict of field values,
+    or the bare value of a single field when as_dict is False.
+
+    All paths are merged into a trie, so a shared prefix is walked once per call
+    instead of once per field.
+    """
+    counter = iter(range(1, 1_000_000))
+    root = _Node("n0")
+    namespace: dict[str, Any] = {"M": _MISSING}
+
+    def new_var() -> str:
+        return f"n{next(counter)}"
+
+    def leaf_expr(field_path: FieldPath) -> str:
+        node = root
+        for key in field_path.keys:
+            node = node.children.setdefault(key, _Node(""))
+        index = len(namespace)
+        if field_path.default is None:
+            default = "None"
+        else:
+            default = f"d{index}"
+            namespace[default] = field_path.default
+        expr = f"(VAR if VAR is not M else {default})"
+        if field_path.transform is not None:
+            namespace[f"t{index}"] = field_path.transform
+            expr = f"t{index}({expr})"
+        return expr, node
+
+    values = []
+    for field_name, spec in fields.items():
+        if isinstance(spec, Computed):
+            leaves = [leaf_expr(field_path) for field_path in spec.paths]
+            index = len(namespace)
+            namespace[f"c{index}"] = spec.func
+            values.append((field_name, f"c{index}", leaves))
+        else:
+            values.append((field_name, None, [leaf_expr(spec)]))
+
+    lines: list[str] = []
+    _emit_children(root, lines, new_var)
+    returns = []
+    for field_name, func, leaves in values:
+        exprs = [expr.replace("VAR", node.var) for expr, node in leaves]
+        returns.append((field_name, f"{func}({', '.join(exprs)})" if func else exprs[0]))
+
+    if as_dict:
+        body = ["    return {", *(f"        {field_name!r}: {value}," for field_name, value in returns), "    }"]
+    else:
+        ((_, value),) = returns
+        body = [f"    return {value}"]
+    source = "\n".join([f"def {name}(n0):", *("    " + line for line in lines), *body])
+    exec(compile(source, f"<fieldspec {name}>", "exec"), namespace)
+    function = namespace[name]
+    function.source = source
+    return function
+
+
+class FieldSpec:
+    """Declarative description of where every field of a parsed model lives in the raw data.
+
+    Calling the spec returns the field values as a dict, ready to be passed to the model constructor.
+    """
+
+    def __init__(self, **fields: FieldPath | Computed) -> None:
+        self.fields = fields
+        self.extract = compile_fields(fields)
+        self._getters: dict[str, Callable[[Any], Any]] = {}
+
+    def __call__(self, data: Any) -> dict[str, Any]:
+        return self.extract(data)
+
+    def getter(self, field_name: str) -> Callable[[Any], Any]:
+        """Compiled function resolving a single field"""
+        getter = self._getters.get(field_name)
+        if getter is None:
+            getter = compile_fields({field_name: self.fields[field_name]}, name=f"get_{field_name}", as_dict=False)
+            self._getters[field_name] = getter
+        return getter
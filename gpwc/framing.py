@@ -0,0 +1,66 @@
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from . import json_backend
+
+
+class FrameDecoder:
+    """Incremental decoder of `rt=c` batchexecute bodies.
+
+    The body is an anti-XSSI prefix line followed by frames, each one a length line and a json line.
+    Length prefixes count UTF-16 code units of the decoded text, so they can not be used to slice the
+    UTF-8 byte stream. A frame never contains a raw newline though, so frames are cut at newlines
+    and the length lines are skipped.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.scanned = 0
+
+    def feed(self, chunk: bytes) -> list[list]:
+        """Add received bytes, return the frames completed by them"""
+        self.buffer += chunk
+        frames = []
+        start = 0
+        while True:
+            end = self.buffer.find(b"\n", max(start, self.scanned))
+            if end == -1:
+                break
+            frame = self._decode_line(self.buffer[start:end])
+            if frame is not None:
+                frames.append(frame)
+            start = end + 1
+        del self.buffer[:start]
+        self.scanned = len(self.buffer)
+        return frames
+
+    def close(self) -> list[list]:
+        """Decode whatever is left after the last newline"""
+        frame = self._decode_line(self.buffer)
+        self.buffer = bytearray()
+        self.scanned = 0
+        return [frame] if frame is not None else []
+
+    @staticmethod
+    def _decode_line(line: bytes | bytearray) -> list | None:
+        line = line.strip()
+        if not line.startswith(b"["):
+            return None
+        return json_backend.loads(line)
+
+
+def iter_frames(chunks: Iterable[bytes]) -> Iterator[list]:
+    """Decode frames from an iterable of body chunks as they arrive"""
+    decoder = FrameDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
+
+
+async def aiter_frames(chunks: AsyncIterable[bytes]) -> AsyncIterator[list]:
+    """Async version of `iter_frames`"""
+    decoder = FrameDecoder()
+    async for chunk in chunks:
+        for frame in decoder.feed(chunk):
+            yield frame
+    for frame in decoder.close():
+        yield frame
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+# fields requests are built from, oPEP7c is the account name shown on bootstrap
+GLOBAL_DATA_FIELDS = ("FdrFJe", "cfb2h", "SNlM0e", "Im6cmf", "oPEP7c")
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "gpwc"
+
+
+class GlobalDataCache:
+    """On-disk cache of the global_data fields a client needs, one entry per cookies file, valid for ttl seconds"""
+
+    def __init__(self, cache_dir: Optional[str | Path] = None, ttl: float = 3600) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.ttl = ttl
+
+    def path_for(self, cookies_txt_path: str | Path) -> Path:
+        """Cache file of a cookies file"""
+        key = hashlib.sha256(str(Path(cookies_txt_path).resolve()).encode()).hexdigest()[:32]
+        return self.cache_dir / f"global_data_{key}.json"
+
+    def load(self, cookies_txt_path: str | Path) -> Optional[dict]:
+        """Cached fields, None if missing, expired or unreadable"""
+        try:
+            entry = json.loads(self.path_for(cookies_txt_path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("saved_at", 0) > self.ttl:
+            return None
+        global_data = entry.get("global_data") or {}
+        if not all(field in global_data for field in GLOBAL_DATA_FIELDS):
+            return None
+        return global_data
+
+    def save(self, cookies_txt_path: str | Path, global_data: dict) -> None:
+        """Store the needed global_data fields, written atomically"""
+        entry = {"saved_at": time.time(), "global_data": {field: global_data.get(field) for field in GLOBAL_DATA_FIELDS}}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self.path_for(cookies_txt_path))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def invalidate(self, cookies_txt_path: str | Path) -> None:
+        """Drop the entry of a cookies file"""
+        self.path_for(cookies_txt_path).unlink(missing_ok=True)
@@ -0,0 +1,177 @@
+import base64
+import hashlib
+import mmap
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from . import payloads
+from .dispatcher import BatchDispatcher
+from .exceptions import RemoteMatchError
+from .parser import RemoteMatch
+
+if TYPE_CHECKING:
+    from .client import Client
+
+# files up to this size are read into a buffer, bigger ones are mapped
+MMAP_THRESHOLD = 8 * 1024 * 1024
+MMAP_WINDOW = 64 * 1024 * 1024
+
+
+def encode_hash(digest: bytes) -> str:
+    """Hash format used by the api (and by dedup keys): urlsafe base64 of the SHA-1 digest without padding"""
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def hash_file(path: str | Path, buffer_size: int = 1024 * 1024) -> str:
+    """Api hash of a file, large files are mapped instead of read"""
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, size, MMAP_WINDOW):
+                        sha1.update(view[offset : offset + MMAP_WINDOW])
+                finally:
+                    view.release()
+        else:
+            buffer = bytearray(buffer_size)
+            view = memoryview(buffer)
+            while read := f.readinto(buffer):
+                sha1.update(view[:read])
+    return encode_hash(sha1.digest())
+
+
+def _hash_file_safe(path: str) -> Optional[str]:
+    try:
+        return hash_file(path)
+    except OSError:
+        return None
+
+
+def iter_files(root: str | Path, extensions: Optional[Iterable[str]] = None) -> Iterator[str]:
+    """Paths of regular files under root, optionally only with the given extensions"""
+    extensions = {extension.lower() for extension in extensions} if extensions is not None else None
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if extensions is None or os.path.splitext(entry.name)[1].lower() in extensions:
+                            yield entry.path
+        except OSError:
+            continue
+
+
+class HashCache:
+    """Persistent (path, size, mtime) -> hash cache, so unchanged files are never hashed twice"""
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS hashes (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT)")
+
+    def close(self) -> None:
+        """Close database connection"""
+        self.db.close()
+
+    def get_many(self, stats: dict[str, tuple[int, int]]) -> dict[str, str]:
+        """Cached hashes of paths whose (size, mtime_ns) did not change"""
+        found = {}
+        paths = list(stats)
+        for i in range(0, len(paths), 500):
+            chunk = paths[i : i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            for path, size, mtime_ns, file_hash in self.db.execute(f"SELECT path, size, mtime_ns, hash FROM hashes WHERE path IN ({placeholders})", chunk):
+                if stats[path] == (size, mtime_ns):
+                    found[path] = file_hash
+        return found
+
+    def put_many(self, rows: Iterable[tuple[str, int, int, str]]) -> None:
+        """Store (path, size, mtime_ns, hash) rows"""
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO hashes (path, size, mtime_ns, hash) VALUES (?, ?, ?, ?)", rows)
+
+
+class FileHasher:
+    """Hash many local files across a process pool, skipping files unchanged since they were cached.
+
+    Being process based, scripts using it on platforms that spawn workers (Windows, macOS) need the
+    usual `if __name__ == "__main__":` guard.
+    """
+
+    def __init__(self, cache: Optional[HashCache] = None, max_workers: Optional[int] = None, batch_size: int = 256) -> None:
+        self.cache = cache
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+
+    def hash_files(self, paths: Iterable[str | Path]) -> dict[str, str]:
+        """Hash of every readable file, files that vanished or could not be read are left out"""
+        stats = {}
+        for path in map(str, paths):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (stat.st_size, stat.st_mtime_ns)
+
+        hashes = self.cache.get_many(stats) if self.cache is not None else {}
+        todo = [path for path in stats if path not in hashes]
+        if not todo:
+            return hashes
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            rows = []
+            for path, file_hash in zip(todo, executor.map(_hash_file_safe, todo, chunksize=16)):
+                if file_hash is None:
+                    continue
+                hashes[path] = file_hash
+                rows.append((path, *stats[path], file_hash))
+                if self.cache is not None and len(rows) >= self.batch_size:
+                    self.cache.put_many(rows)
+                    rows = []
+            if self.cache is not None and rows:
+                self.cache.put_many(rows)
+        return hashes
+
+
+def find_remote_matches(
+    client: "Client",
+    hashes: Iterable[str],
+    hashes_per_payload: int = 1000,
+    max_payloads: int = 4,
+    max_workers: int = 8,
+) -> dict[str, RemoteMatch]:
+    """Library items matching hashes, queried as concurrent `GetRemoteMatchesByHash` batches.
+    Raises RemoteMatchError listing the hashes of failed requests, absent from the result is only ever
+    "not in the library"."""
+    hashes = list(dict.fromkeys(hashes))
+    chunks = [hashes[i : i + hashes_per_payload] for i in range(0, len(hashes), hashes_per_payload)]
+    dispatcher = BatchDispatcher(client, max_payloads=max_payloads, max_workers=max_workers)
+    matches = {}
+    unresolved, errors = [], []
+    for chunk, response in zip(chunks, dispatcher.send(payloads.GetRemoteMatchesByHash(chunk) for chunk in chunks)):
+        if response.success:
+            matches.update((match.hash, match) for match in response.data)
+        else:
+            unresolved.extend(chunk)
+            errors.append(response.error)
+    if unresolved:
+        raise RemoteMatchError(unresolved, matches, errors)
+    return matches
+
+
+def match_local_files(client: "Client", paths: Iterable[str | Path], hasher: Optional[FileHasher] = None) -> dict[str, Optional[RemoteMatch]]:
+    """Library item of every local file, None for files not in the library.
+    Raises RemoteMatchError when some hashes could not be looked up."""
+    hashes = (hasher or FileHasher()).hash_files(paths)
+    matches = find_remote_matches(client, hashes.values())
+    return {path: matches.get(file_hash) for path, file_hash in hashes.items()}
@@ -0,0 +1,224 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from .payloads import Payload
+from .utils import safe_get
+
+if TYPE_CHECKING:
+    from .client import Client
+
+PENDING, INFLIGHT, COMMITTED, FAILED, SUPERSEDED = "pending", "inflight", "committed", "failed", "superseded"
+
+# rpcid -> item an edit applies to, a newer pending edit of the same item replaces the older one
+COALESCE_KEYS: dict[str, Callable[[list], Any]] = {
+    "AQNOFd": lambda data: safe_get(data, 2),  # SetItemDescription
+    "DaSgWe": lambda data: safe_get(data, 0, 0, 0),  # SetItemTimestamp
+}
+
+
+class JournaledPayload(Payload):
+    """Payload rebuilt from a journal entry"""
+
+    def __init__(self, rpcid: str, data: list, mutation_id: int, attempts: int = 0) -> None:
+        super().__init__()
+        self.rpcid = rpcid
+        self.data = data
+        self.mutation_id = mutation_id
+        self.attempts = attempts
+
+
+class MutationJournal:
+    """Durable write-behind queue of edit payloads.
+
+    `enqueue` only writes the payload to an SQLite (WAL) journal, a flusher sends pending entries in
+    batched batchexecute requests and marks each one committed or failed. A newer pending edit of the
+    same item (per `COALESCE_KEYS`, or an explicit coalesce_key) supersedes the older one, so is a failed
+    one. Failed entries are retried after retry_delay, doubling up to max_retry_delay, until max_attempts.
+    After a crash, entries left in flight are sent again on the next flush unless a newer edit of the same
+    item is pending, edits set absolute values so applying one twice is harmless. Use as a context manager
+    to run the flusher in a background thread, pending entries are drained on exit.
+    """
+
+    def __init__(
+        self,
+        client: "Client",
+        db_path: str | Path,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        flush_interval: float = 1.0,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 300.0,
+    ) -> None:
+        self.client = client
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.flush_interval = flush_interval
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        with self._lock, self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS mutations ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, rpcid TEXT, data TEXT, coalesce_key TEXT, status TEXT, "
+                "attempts INTEGER DEFAULT 0, error TEXT, created_at REAL, updated_at REAL, next_attempt_at REAL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self.db.execute("PRAGMA table_info(mutations)")}
+            if "next_attempt_at" not in columns:
+                self.db.execute("ALTER TABLE mutations ADD COLUMN next_attempt_at REAL DEFAULT 0")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_mutations_status ON mutations (status, id)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_mutations_coalesce_key ON mutations (coalesce_key, status)")
+            # entries sent when the process stopped are not known to be applied
+            self.db.execute("UPDATE mutations SET status = ? WHERE status = ?", (PENDING, INFLIGHT))
+            self._supersede_older()
+
+    def __enter__(self):
+        """Start the background flusher"""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Drain pending entries and stop the flusher"""
+        self.stop()
+
+    def enqueue(self, payload: Payload, coalesce_key: Optional[str] = None) -> int:
+        """Journal a payload for sending, returns its entry id"""
+        if coalesce_key is None and payload.rpcid in COALESCE_KEYS:
+            item = COALESCE_KEYS[payload.rpcid](payload.data)
+            coalesce_key = f"{payload.rpcid}:{item}" if item is not None else None
+        now = time.time()
+        with self._lock, self.db:
+            if coalesce_key is not None:
+                self.db.execute(
+                    "UPDATE mutations SET status = ?, updated_at = ? WHERE coalesce_key = ? AND status = ?",
+                    (SUPERSEDED, now, coalesce_key, PENDING),
+                )
+            cursor = self.db.execute(
+                "INSERT INTO mutations (rpcid, data, coalesce_key, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (payload.rpcid, json.dumps(payload.data, separators=(",", ":")), coalesce_key, PENDING, now, now),
+            )
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def flush(self) -> int:
+        """Send pending entries due for an attempt, returns the number committed.
+        Entries failing during the flush wait for their retry delay, stops early when a whole batch fails."""
+        started = time.time()
+        committed = 0
+        while batch := self._claim(started):
+            sent = self._send(batch)
+            committed += sent
+            if not sent:
+                break
+        return committed
+
+    def _claim(self, due: float) -> list[JournaledPayload]:
+        """Mark the next batch of pending entries due at that time in flight"""
+        with self._lock, self.db:
+            rows = self.db.execute(
+                "SELECT id, rpcid, data, attempts FROM mutations WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (PENDING, due, self.batch_size),
+            ).fetchall()
+            self.db.executemany("UPDATE mutations SET status = ?, updated_at = ? WHERE id = ?", [(INFLIGHT, time.time(), row[0]) for row in rows])
+        return [JournaledPayload(rpcid, json.loads(data), mutation_id, attempts) for mutation_id, rpcid, data, attempts in rows]
+
+    def _supersede_older(self) -> None:
+        """Supersede pending entries with a newer entry of the same item pending, in flight or committed,
+        so an older edit is never applied after a newer one. Runs under the caller's lock and transaction."""
+        self.db.execute(
+            "UPDATE mutations SET status = ?, updated_at = ? WHERE status = ? AND coalesce_key IS NOT NULL AND EXISTS ("
+            "SELECT 1 FROM mutations AS newer WHERE newer.coalesce_key = mutations.coalesce_key AND newer.id > mutations.id "
+            "AND newer.status IN (?, ?, ?))",
+            (SUPERSEDED, time.time(), PENDING, PENDING, INFLIGHT, COMMITTED),
+        )
+
+    def retry_delay_of(self, attempts: int) -> float:
+        """Seconds before the next attempt of an entry that failed attempts times"""
+        return min(self.retry_delay * 2 ** max(attempts - 1, 0), self.max_retry_delay)
+
+    def _send(self, batch: list[JournaledPayload]) -> int:
+        """Send a claimed batch and record the outcome of every entry, returns the number committed"""
+        try:
+            responses = self.client.send_api_request(batch)
+            errors = {response.response_id: response.error for response in responses}
+        except Exception as e:
+            self.client.logger.warning(f"Journal flush failed: {e}")
+            errors = {payload.payload_id: e for payload in batch}
+        now = time.time()
+        committed = [(COMMITTED, now, payload.mutation_id) for payload in batch if errors.get(payload.payload_id) is None]
+        failed = [
+            (self.max_attempts, FAILED, PENDING, str(errors[payload.payload_id]), now, now + self.retry_delay_of(payload.attempts + 1), payload.mutation_id)
+            for payload in batch
+            if errors.get(payload.payload_id) is not None
+        ]
+        with self._lock, self.db:
+            self.db.executemany("UPDATE mutations SET status = ?, attempts = attempts + 1, error = NULL, updated_at = ? WHERE id = ?", committed)
+            self.db.executemany(
+                "UPDATE mutations SET status = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END, attempts = attempts + 1, error = ?, updated_at = ?, "
+                "next_attempt_at = ? WHERE id = ?",
+                failed,
+            )
+            if failed:
+                self._supersede_older()
+        return len(committed)
+
+    def counts(self) -> dict[str, int]:
+        """Number of entries per status"""
+        with self._lock:
+            return dict(self.db.execute("SELECT status, COUNT(*) FROM mutations GROUP BY status").fetchall())
+
+    def failed(self) -> list[tuple[int, str, list, str]]:
+        """(id, rpcid, data, error) of entries that ran out of attempts"""
+        with self._lock:
+            rows = self.db.execute("SELECT id, rpcid, data, error FROM mutations WHERE status = ? ORDER BY id", (FAILED,)).fetchall()
+        return [(mutation_id, rpcid, json.loads(data), error) for mutation_id, rpcid, data, error in rows]
+
+    def retry_failed(self) -> None:
+        """Give failed entries a new round of attempts"""
+        with self._lock, self.db:
+            self.db.execute("UPDATE mutations SET status = ?, attempts = 0, next_attempt_at = 0 WHERE status = ?", (PENDING, FAILED))
+            self._supersede_older()
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """Flush in a background thread, woken by `enqueue` or every flush_interval"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gpwc-journal", daemon=True)
+        self._thread.start()
+
+    def stop(self, drain: bool = True) -> None:
+        """Stop the background flusher, sending what is pending first if drain"""
+        if self._thread is not None:
+            self._stop.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        if drain:
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the flusher without draining and close the journal"""
+        self.stop(drain=False)
+        self.db.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                self.client.logger.error(f"Journal flusher error: {e}")
@@ -0,0 +1,147 @@
+"""JSON encoding and decoding of request and response bodies, with the fastest available library.
+
+orjson or msgspec are used when installed, the standard library otherwise. Set GPWC_JSON_BACKEND to
+`orjson`, `msgspec` or `stdlib` to choose one. Encoded output is always what
+`json.dumps(obj, separators=(",", ":"))` writes: fast backends do not escape non-ASCII characters and
+format floats differently, output where that would show is encoded again with the standard library.
+Decoded values are always what `json.loads` returns: documents fast backends reject (NaN, lone
+surrogates...) or would decode differently (integers beyond 64 bits, read as floats) are decoded by
+the standard library.
+"""
+
+import json
+import math
+import os
+from typing import Any, Callable, Optional
+
+# output mapped to the characters telling numbers apart: digits to 0, delimiters to `,`, signs to `-`,
+# `e` and `.` kept, anything else to x. Fast backends write floats in 1e-4 <= abs(x) < 1e16 as repr does,
+# others they write with an exponent or as 0.0000..., so only numbers with `0e` or `0.0000` can differ.
+_SHAPE = bytearray(b"x" * 256)
+for _chars, _mapped in ((b"0123456789", b"0"), (b"[,:", b","), (b"+-", b"-"), (b"eE", b"e"), (b".", b".")):
+    for _char in _chars:
+        _SHAPE[_char] = _mapped[0]
+_SHAPE = bytes(_SHAPE)
+_FLOAT_MARKERS = ((b"e", b"0e"), (b".", b"0.0000"))
+
+# integers beyond 64 bits, below -2**63 or above 2**64 - 1, have at least 19 digits and fast backends
+# decode them as floats. Documents are mapped digits to 0, anything else to x, to look for 19 in a row.
+_DIGITS = bytes(ord("0") if 48 <= i <= 57 else ord("x") for i in range(256))
+_DIGIT_RUN = b"0" * 19
+
+name: str = "stdlib"
+_dumps: Optional[Callable[[Any], bytes]] = None
+_loads: Optional[Callable[[bytes | bytearray | str], Any]] = None
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _in_number(shape: bytes, index: int) -> bool:
+    """Whether the digit at index is in a number, rather than in a string"""
+    start = index
+    while start and shape[start - 1] in b"0.":
+        start -= 1
+    if start and shape[start - 1] == ord("-"):
+        start -= 1
+    return start == 0 or shape[start - 1] == ord(",")
+
+
+def _compatible(output: bytes, floats: bool = True) -> bool:
+    """Whether a fast backend wrote what json.dumps would: ASCII only, and no floats formatted differently"""
+    if not output.isascii() or b"\x7f" in output:
+        return False
+    if not floats:
+        return True
+    shape = output.translate(_SHAPE)
+    for guard, marker in _FLOAT_MARKERS:
+        # single byte searches are much faster, most output has no candidate at all
+        if guard not in shape:
+            continue
+        index = shape.find(marker)
+        while index != -1:
+            if _in_number(shape, index):
+                return False
+            index = shape.find(marker, index + 1)
+    return True
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """Whether obj holds a NaN or infinite float, fast backends write those as null"""
+    stack = [obj]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        value = pop()
+        kind = type(value)
+        if kind is str or kind is int or value is None:
+            continue
+        if kind is list or kind is tuple:
+            extend(value)
+        elif kind is dict:
+            extend(value.values())
+        elif isinstance(value, float) and not math.isfinite(value):
+            return True
+    return False
+
+
+def _has_digit_run(data: bytes | bytearray | str) -> bool:
+    """Whether data holds 19 digits in a row"""
+    if isinstance(data, str):
+        data = data.encode("utf-8", "surrogatepass")
+    return _DIGIT_RUN in data.translate(_DIGITS)
+
+
+def dumps(obj: Any, floats: bool = True) -> bytes:
+    """Compact JSON of obj, byte for byte the same as the standard library's.
+    floats=False skips looking for floats in the output, for objects known to hold none."""
+    if _dumps is not None:
+        try:
+            output = _dumps(obj)
+        except (TypeError, ValueError, OverflowError):
+            # types the backend does not handle the standard library way (big ints, non str keys...)
+            return _stdlib_dumps(obj)
+        if _compatible(output, floats) and not (floats and b"null" in output and _has_non_finite(obj)):
+            return output
+    return _stdlib_dumps(obj)
+
+
+def loads(data: bytes | bytearray | str) -> Any:
+    """Decode JSON, documents a fast backend rejects (NaN, lone surrogates) or reads differently
+    (integers beyond 64 bits) go to the standard library"""
+    if _loads is not None and not _has_digit_run(data):
+        try:
+            return _loads(data)
+        except ValueError:
+            pass
+    return json.loads(data)
+
+
+def use_backend(backend: Optional[str] = None) -> str:
+    """Select orjson, msgspec or stdlib, the first installed one if None. Returns the name selected."""
+    global name, _dumps, _loads
+    candidates = [backend] if backend else ["orjson", "msgspec"]
+    for candidate in candidates:
+        if candidate == "orjson":
+            try:
+                import orjson
+            except ImportError:
+                continue
+            options = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS
+            name, _dumps, _loads = "orjson", lambda obj: orjson.dumps(obj, option=options), orjson.loads
+            return name
+        if candidate == "msgspec":
+            try:
+                import msgspec
+            except ImportError:
+                continue
+            encoder, decoder = msgspec.json.Encoder(), msgspec.json.Decoder()
+            name, _dumps, _loads = "msgspec", encoder.encode, decoder.decode
+            return name
+        if candidate != "stdlib":
+            raise ValueError(f"Unknown JSON backend {candidate!r}, use orjson, msgspec or stdlib")
+    name, _dumps, _loads = "stdlib", None, None
+    return name
+
+
+use_backend(os.environ.get("GPWC_JSON_BACKEND") or None)
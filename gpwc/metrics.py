@@ -0,0 +1,148 @@
+import bisect
+import threading
+from typing import Iterable, Optional
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = tuple(2**exponent for exponent in range(6, 27, 2))  # 64 B .. 64 MiB
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# histogram name -> buckets, anything else observed is bucketed as a count
+BUCKETS = {
+    "encode_seconds": SECONDS_BUCKETS,
+    "network_seconds": SECONDS_BUCKETS,
+    "decode_seconds": SECONDS_BUCKETS,
+    "parse_seconds": SECONDS_BUCKETS,
+    "request_bytes": BYTES_BUCKETS,
+    "response_bytes": BYTES_BUCKETS,
+    "batch_size": COUNT_BUCKETS,
+}
+
+
+class MetricsCollector:
+    """Receives client measurements, labelled by rpcid. Subclass it to forward them elsewhere.
+
+    Histograms: encode_seconds, network_seconds, decode_seconds, parse_seconds, request_bytes,
+    response_bytes and batch_size. Counters: requests, retries and rpc_errors. Batch level values
+    (encoding, network, retries, batch size) are recorded for every rpcid in the batch.
+    """
+
+    def observe(self, name: str, rpcid: str, value: float) -> None:
+        """Record a histogram value"""
+
+    def increment(self, name: str, rpcid: str, amount: int = 1) -> None:
+        """Add to a counter"""
+
+    def observe_batch(self, name: str, rpcids: Iterable[str], value: float) -> None:
+        for rpcid in set(rpcids):
+            self.observe(name, rpcid, value)
+
+    def increment_batch(self, name: str, rpcids: Iterable[str], amount: int = 1) -> None:
+        for rpcid in set(rpcids):
+            self.increment(name, rpcid, amount)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q quantile, None without observations"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class HistogramCollector(MetricsCollector):
+    """In-memory histograms and counters per metric name and rpcid"""
+
+    def __init__(self) -> None:
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.counters: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, rpcid: str, value: float) -> None:
+        key = (name, rpcid)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(BUCKETS.get(name, COUNT_BUCKETS))
+            histogram.observe(value)
+
+    def increment(self, name: str, rpcid: str, amount: int = 1) -> None:
+        key = (name, rpcid)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def summary(self) -> dict[str, dict[str, dict]]:
+        """rpcid -> metric -> count, sum, mean and p50/p90/p99 (bucket upper bounds) or counter value"""
+        result: dict[str, dict[str, dict]] = {}
+        with self._lock:
+            for (name, rpcid), histogram in self.histograms.items():
+                result.setdefault(rpcid, {})[name] = {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "mean": histogram.sum / histogram.count,
+                    "p50": histogram.quantile(0.5),
+                    "p90": histogram.quantile(0.9),
+                    "p99": histogram.quantile(0.99),
+                }
+            for (name, rpcid), value in self.counters.items():
+                result.setdefault(rpcid, {})[name] = value
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def prometheus_text(collector: HistogramCollector, prefix: str = "gpwc") -> str:
+    """Prometheus text exposition of a collector"""
+    lines = []
+    with collector._lock:
+        histograms = sorted(collector.histograms.items())
+        counters = sorted(collector.counters.items())
+    by_name: dict[str, list] = {}
+    for (name, rpcid), histogram in histograms:
+        by_name.setdefault(name, []).append((rpcid, histogram))
+    for name, series in by_name.items():
+        metric = f"{prefix}_{name}"
+        lines.append(f"# TYPE {metric} histogram")
+        for rpcid, histogram in series:
+            cumulative = 0
+            for bound, count in zip((*histogram.buckets, float("inf")), histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{rpcid="{rpcid}",le="{_format_value(bound)}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{rpcid="{rpcid}"}} {_format_value(histogram.sum)}')
+            lines.append(f'{metric}_count{{rpcid="{rpcid}"}} {histogram.count}')
+    counter_names: dict[str, list] = {}
+    for (name, rpcid), value in counters:
+        counter_names.setdefault(name, []).append((rpcid, value))
+    for name, series in counter_names.items():
+        metric = f"{prefix}_{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        for rpcid, value in series:
+            lines.append(f'{metric}{{rpcid="{rpcid}"}} {value}')
+    return "\n".join(lines) + "\n"
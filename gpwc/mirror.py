@@ -0,0 +1,206 @@
+"""Local SQLite copy of the library, kept up to date by syncs.
+
+Incremental syncs only see new uploads: they walk the uploaded date feed down to the newest upload time
+already stored, and the api has no feed of changes. Edits of items already stored (dates, descriptions,
+locations, favorites...) and items deleted for good are not seen by them. `sync_trash` drops trashed
+items, running `full_crawl` again refreshes every stored item, items deleted for good stay stored.
+"""
+
+import dataclasses
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from . import parser, payloads
+from .dispatcher import BatchDispatcher
+from .pagination import iter_pages
+
+if TYPE_CHECKING:
+    from .client import Client
+
+# table name, model, indexed columns
+TABLES = {
+    "library_items": (parser.LibraryItem, ["dedup_key", "timestamp", "creation_timestamp"]),
+    "albums": (parser.Album, ["modified_timestamp", "title"]),
+    "trash_items": (parser.TrashItem, ["dedup_key", "timestamp"]),
+    "item_info_ext": (parser.ItemInfoExt, ["dedup_key", "file_name", "timestamp"]),
+}
+
+FULL_CRAWL_PAGE_ID = "library.full_crawl.page_id"
+FULL_CRAWL_DONE = "library.full_crawl.done"
+INCREMENTAL_PAGE_ID = "library.incremental.page_id"
+INCREMENTAL_RUN_HIGH_WATER = "library.incremental.run_high_water"
+INCREMENTAL_HIGH_WATER = "library.incremental.high_water"
+LAST_SYNC = "library.last_sync"
+
+
+def _columns(model: type) -> list[str]:
+    return [field.name for field in dataclasses.fields(model)]
+
+
+def _to_column(value: Any) -> Any:
+    """Nested values are stored as json text"""
+    if isinstance(value, (list, dict)) or dataclasses.is_dataclass(value):
+        return json.dumps(value, default=dataclasses.asdict)
+    return value
+
+
+class LibraryMirror:
+    """Local SQLite copy of the library.
+
+    The first `sync` crawls the whole library by taken date, checkpointing after every page so an
+    interrupted crawl resumes where it stopped. Later syncs walk the uploaded date feed, newest first,
+    down to the high water mark: the newest upload time seen by the last completed sync. They checkpoint
+    every page too, an interrupted sync resumes at its next page and only moves the mark once complete.
+    Changes to items already stored are not seen by later syncs, see the module docstring.
+    """
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.db_path = db_path
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.create_schema()
+
+    def __enter__(self):
+        """Enter"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Close database on exit"""
+        self.close()
+
+    def close(self) -> None:
+        """Close database connection"""
+        self.db.close()
+
+    def create_schema(self) -> None:
+        """Create tables and indexes if missing"""
+        with self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+            for table, (model, indexes) in TABLES.items():
+                columns = ", ".join(column for column in _columns(model) if column != "media_key")
+                self.db.execute(f"CREATE TABLE IF NOT EXISTS {table} (media_key TEXT PRIMARY KEY, {columns}, synced_at INTEGER)")
+                for column in indexes:
+                    self.db.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+
+    def get_state(self, key: str) -> Optional[str]:
+        """Read a sync checkpoint value"""
+        row = self.db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: Optional[Any]) -> None:
+        """Write a sync checkpoint value, commit is left to the caller"""
+        if value is None:
+            self.db.execute("DELETE FROM sync_state WHERE key = ?", (key,))
+        else:
+            self.db.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def upsert(self, table: str, records: Iterable[Any]) -> int:
+        """Insert or replace parsed records, commit is left to the caller"""
+        model, _ = TABLES[table]
+        columns = _columns(model) + ["synced_at"]
+        synced_at = int(time.time())
+        rows = [[_to_column(getattr(record, column)) for column in columns[:-1]] + [synced_at] for record in records]
+        placeholders = ", ".join("?" for _ in columns)
+        self.db.executemany(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+        return len(rows)
+
+    def known_media_keys(self, media_keys: list[str]) -> set[str]:
+        """Subset of media_keys already stored in library_items"""
+        known = set()
+        for i in range(0, len(media_keys), 500):
+            chunk = media_keys[i : i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.db.execute(f"SELECT media_key FROM library_items WHERE media_key IN ({placeholders})", chunk)
+            known.update(row[0] for row in rows)
+        return known
+
+    def sync(self, client: "Client", prefetch: int = 2) -> int:
+        """Full crawl until it is complete once, incremental sync afterwards. Returns stored item count."""
+        if self.get_state(FULL_CRAWL_DONE):
+            return self.incremental_sync(client, prefetch)
+        return self.full_crawl(client, prefetch)
+
+    def full_crawl(self, client: "Client", prefetch: int = 2) -> int:
+        """Crawl the library by taken date, resuming from the last checkpoint. Once complete, crawling
+        again starts over and refreshes every stored item."""
+        page_id = self.get_state(FULL_CRAWL_PAGE_ID)
+        stored = 0
+        for page in iter_pages(client, payloads.GetLibraryPageByTakenDate(page_id=page_id), prefetch):
+            with self.db:
+                stored += self.upsert("library_items", page.items)
+                self.set_state(FULL_CRAWL_PAGE_ID, page.next_page_id)
+                if not page.next_page_id:
+                    self.set_state(FULL_CRAWL_DONE, 1)
+                    self.set_state(LAST_SYNC, int(time.time()))
+        client.logger.info(f"Full crawl stored {stored} items")
+        return stored
+
+    def high_water(self) -> int:
+        """Upload time items are synced up to, the newest one stored by the full crawl at first"""
+        value = self.get_state(INCREMENTAL_HIGH_WATER)
+        if value is not None:
+            return int(value)
+        # stored before the first walk, pages it stores must not move the mark before it completes
+        row = self.db.execute("SELECT MAX(creation_timestamp) FROM library_items").fetchone()
+        with self.db:
+            self.set_state(INCREMENTAL_HIGH_WATER, row[0] or 0)
+        return row[0] or 0
+
+    def incremental_sync(self, client: "Client", prefetch: int = 1) -> int:
+        """Walk the uploaded date feed, newest first, until items older than the high water mark,
+        resuming an interrupted walk at its checkpointed page"""
+        high_water = self.high_water()
+        page_id = self.get_state(INCREMENTAL_PAGE_ID)
+        run_high_water = int(self.get_state(INCREMENTAL_RUN_HIGH_WATER) or 0)
+        stored = 0
+        for page in iter_pages(client, payloads.GetLibarayPageByUploadedDate(page_id=page_id), prefetch):
+            timestamps = [item.creation_timestamp or 0 for item in page.items]
+            run_high_water = max([run_high_water, *timestamps])
+            done = not page.next_page_id or any(timestamp < high_water for timestamp in timestamps)
+            with self.db:
+                stored += self.upsert("library_items", page.items)
+                self.set_state(INCREMENTAL_PAGE_ID, None if done else page.next_page_id)
+                self.set_state(INCREMENTAL_RUN_HIGH_WATER, None if done else run_high_water)
+                if done:
+                    self.set_state(INCREMENTAL_HIGH_WATER, max(run_high_water, high_water))
+                    self.set_state(LAST_SYNC, int(time.time()))
+            if done:
+                break
+        client.logger.info(f"Incremental sync stored {stored} items")
+        return stored
+
+    def sync_albums(self, client: "Client", prefetch: int = 1) -> int:
+        """Replace stored albums with the current album list"""
+        albums = [album for page in iter_pages(client, payloads.GetAlbumsPage(), prefetch) for album in page.items]
+        with self.db:
+            self.db.execute("DELETE FROM albums")
+            return self.upsert("albums", albums)
+
+    def sync_trash(self, client: "Client", prefetch: int = 1) -> int:
+        """Replace stored trash items and drop trashed items from library_items"""
+        items = [item for page in iter_pages(client, payloads.GetTrashPage(), prefetch) for item in page.items]
+        with self.db:
+            self.db.execute("DELETE FROM trash_items")
+            stored = self.upsert("trash_items", items)
+            self.db.execute("DELETE FROM library_items WHERE media_key IN (SELECT media_key FROM trash_items)")
+        return stored
+
+    def sync_item_info_ext(self, client: "Client", limit: Optional[int] = None, max_workers: int = 8, chunk_size: int = 500) -> int:
+        """Fetch extended info for library items that do not have it stored yet.
+        Every chunk_size items are committed as they come, a failure only loses the current chunk."""
+        query = "SELECT media_key FROM library_items WHERE media_key NOT IN (SELECT media_key FROM item_info_ext)"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        media_keys = [row[0] for row in self.db.execute(query)]
+        dispatcher = BatchDispatcher(client, max_workers=max_workers)
+        stored = 0
+        for i in range(0, len(media_keys), chunk_size):
+            responses = dispatcher.send(payloads.GetItemInfoExt(media_key) for media_key in media_keys[i : i + chunk_size])
+            infos = [response.data for response in responses if response.success and response.data.media_key]
+            with self.db:
+                stored += self.upsert("item_info_ext", infos)
+        return stored
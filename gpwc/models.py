@@ -1,5 +1,7 @@
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
+
+from .exceptions import GpwcError
 
 
 @dataclass
@@ -8,6 +10,7 @@ class ApiResponse:
     data: Any
     success: bool
     response_id: str
+    error: Optional[GpwcError] = None
 
 
 @dataclass
@@ -0,0 +1,134 @@
+import asyncio
+import queue
+import threading
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterator
+
+from .exceptions import RpcError
+from .payloads import PagedPayload
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .async_client import AsyncClient
+
+_DONE = object()
+
+
+def _check_payload(payload: PagedPayload) -> None:
+    if not payload.parse_response:
+        raise ValueError(f"{type(payload).__name__} must be created with parse_response enabled to be paginated")
+
+
+def _page_data(response: Any, payload: PagedPayload) -> Any:
+    """Page of a response, a failed page must not end pagination silently"""
+    if not response.success:
+        raise RpcError(payload.rpcid, payload.payload_id, "page request failed")
+    return response.data
+
+
+def _fetch_pages(client: "Client", payload: PagedPayload) -> Iterator[Any]:
+    """Fetch pages one after another following next_page_id"""
+    while True:
+        page = _page_data(client.send_api_request(payload), payload)
+        yield page
+        if not page.next_page_id:
+            return
+        payload = payload.next_page(page.next_page_id)
+
+
+def iter_pages(client: "Client", payload: PagedPayload, prefetch: int = 1) -> Iterator[Any]:
+    """Iterate over parsed pages starting at payload.
+    Up to `prefetch` pages are fetched in a background thread while the caller works on the current one."""
+    _check_payload(payload)
+    if prefetch < 1:
+        yield from _fetch_pages(client, payload)
+        return
+
+    pages: queue.Queue = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for page in _fetch_pages(client, payload):
+                if not put(page):
+                    return
+        except BaseException as e:
+            put(e)
+            return
+        put(_DONE)
+
+    producer = threading.Thread(target=produce, name="gpwc-page-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            page = pages.get()
+            if page is _DONE:
+                return
+            if isinstance(page, BaseException):
+                raise page
+            yield page
+    finally:
+        stop.set()
+
+
+def iter_items(client: "Client", payload: PagedPayload, prefetch: int = 1) -> Iterator[Any]:
+    """Iterate over items of every page starting at payload"""
+    for page in iter_pages(client, payload, prefetch):
+        yield from page.items
+
+
+async def _afetch_pages(client: "AsyncClient", payload: PagedPayload) -> AsyncIterator[Any]:
+    """Async version of `_fetch_pages`"""
+    while True:
+        page = _page_data(await client.send_api_request(payload), payload)
+        yield page
+        if not page.next_page_id:
+            return
+        payload = payload.next_page(page.next_page_id)
+
+
+async def aiter_pages(client: "AsyncClient", payload: PagedPayload, prefetch: int = 1) -> AsyncIterator[Any]:
+    """Async version of `iter_pages`, prefetching is done by a background task"""
+    _check_payload(payload)
+    if prefetch < 1:
+        async for page in _afetch_pages(client, payload):
+            yield page
+        return
+
+    pages: asyncio.Queue = asyncio.Queue(maxsize=prefetch)
+
+    async def produce() -> None:
+        try:
+            async for page in _afetch_pages(client, payload):
+                await pages.put(page)
+        except Exception as e:
+            await pages.put(e)
+            return
+        await pages.put(_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            page = await pages.get()
+            if page is _DONE:
+                return
+            if isinstance(page, BaseException):
+                raise page
+            yield page
+    finally:
+        producer.cancel()
+
+
+async def aiter_items(client: "AsyncClient", payload: PagedPayload, prefetch: int = 1) -> AsyncIterator[Any]:
+    """Async version of `iter_items`"""
+    async for page in aiter_pages(client, payload, prefetch):
+        for item in page.items:
+            yield item
@@ -1,24 +1,34 @@
+import reprlib
+import sys
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
+from .fieldspec import Computed, FieldPath, FieldSpec
 from .utils import safe_get
 
 
-@dataclass
+def intern_string(value: Any) -> Any:
+    """Intern strings that repeat across many items (actor ids, names, camera models)"""
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True)
 class GeoLocation:
     coordinates: Optional[list[float]] = None
     name: Optional[str] = None
     map_thumb: Optional[str] = None
 
+    _spec = FieldSpec(
+        coordinates=Computed(lambda point, place_point: point or place_point, FieldPath(0, 9, 0), FieldPath(0, 13, 0)),
+        name=FieldPath(0, 13, 2, 0, 1, 0, 0),
+        map_thumb=FieldPath(1),
+    )
+
     @classmethod
     def from_data(cls, item_data):
-        return cls(
-            coordinates=safe_get(item_data, 0, 9, 0) or safe_get(item_data, 0, 13, 0),
-            name=safe_get(item_data, 0, 13, 2, 0, 1, 0, 0),
-            map_thumb=safe_get(item_data, 1),
-        )
+        return cls(**cls._spec(item_data))
 
 
-@dataclass
+@dataclass(slots=True)
 class LibraryItem:
     media_key: str
     timestamp: int
@@ -37,63 +47,67 @@ class LibraryItem:
     is_owned: bool
     geo_location: GeoLocation
 
+    _spec = FieldSpec(
+        media_key=FieldPath(0),
+        timestamp=FieldPath(2),
+        timezone_offset=FieldPath(4),
+        creation_timestamp=FieldPath(5),
+        dedup_key=FieldPath(3),
+        thumbnail_url=FieldPath(1, 0),
+        res_width=FieldPath(1, 1),
+        res_height=FieldPath(1, 2),
+        is_partial_upload=FieldPath(12, 0, transform=lambda status: status == 20),
+        is_archived=FieldPath(13),
+        is_favorite=FieldPath(-1, "163238866", 0),
+        video_duration=FieldPath(-1, "76647426", 0),
+        description_short=FieldPath(-1, "396644657", 0),
+        live_photo_duration=FieldPath(-1, "146008172", 1),
+        is_owned=FieldPath(7, default=[], transform=lambda flags: not any(27 in sub_array for sub_array in flags)),
+        geo_location=Computed(
+            GeoLocation,
+            FieldPath(-1, "129168200", 1, 0),
+            FieldPath(-1, "129168200", 1, 4, 0, 1, 0, 0),
+        ),
+    )
+
     @classmethod
     def from_data(cls, item_data):
-        # Parse geo_location if present
-        geo_location = GeoLocation(
-            coordinates=safe_get(item_data, -1, "129168200", 1, 0),
-            name=safe_get(item_data, -1, "129168200", 1, 4, 0, 1, 0, 0),
-        )
-
-        return cls(
-            media_key=safe_get(item_data, 0),
-            timestamp=safe_get(item_data, 2),
-            timezone_offset=safe_get(item_data, 4),
-            creation_timestamp=safe_get(item_data, 5),
-            dedup_key=safe_get(item_data, 3),
-            thumbnail_url=safe_get(item_data, 1, 0),
-            res_width=safe_get(item_data, 1, 1),
-            res_height=safe_get(item_data, 1, 2),
-            is_partial_upload=safe_get(item_data, 12, 0) == 20,
-            is_archived=safe_get(item_data, 13),
-            is_favorite=safe_get(item_data, -1, "163238866", 0),
-            video_duration=safe_get(item_data, -1, "76647426", 0),
-            description_short=safe_get(item_data, -1, "396644657", 0),
-            live_photo_duration=safe_get(item_data, -1, "146008172", 1),
-            is_owned=not any(27 in sub_array for sub_array in safe_get(item_data, 7, default=[])),
-            geo_location=geo_location,
-        )
-
-
-@dataclass
+        return cls(**cls._spec(item_data))
+
+
+@dataclass(slots=True)
 class LibraryTimelinePage:
     items: list[LibraryItem]
     next_page_id: Optional[str]
     last_item_timestamp: Optional[int]
 
+    _spec = FieldSpec(
+        items=FieldPath(0, default=[], transform=lambda items: [LibraryItem.from_data(item) for item in items]),
+        next_page_id=FieldPath(1),
+        last_item_timestamp=FieldPath(2, transform=lambda timestamp: timestamp and int(timestamp)),
+    )
+
     @classmethod
     def from_data(cls, data):
-        return cls(
-            items=[LibraryItem.from_data(item) for item in safe_get(data, 0, default=[])],
-            next_page_id=safe_get(data, 1),
-            last_item_timestamp=safe_get(data, 2) and int(safe_get(data, 2)),
-        )
+        return cls(**cls._spec(data))
 
 
-@dataclass
+@dataclass(slots=True)
 class LibraryGenericPage:
     items: list[LibraryItem]
     next_page_id: Optional[str]
 
+    _spec = FieldSpec(
+        items=FieldPath(0, transform=lambda items: [LibraryItem.from_data(item) for item in items or []]),
+        next_page_id=FieldPath(1),
+    )
+
     @classmethod
     def from_data(cls, data):
-        return cls(
-            items=[LibraryItem.from_data(item) for item in safe_get(data, 0) or []],
-            next_page_id=safe_get(data, 1),
-        )
+        return cls(**cls._spec(data))
 
 
-@dataclass
+@dataclass(slots=True)
 class TrashItem:
     media_key: str
     thumbnail_url: str
@@ -105,35 +119,39 @@ class TrashItem:
     creation_timestamp: int
     video_duration: Optional[int]
 
+    _spec = FieldSpec(
+        media_key=FieldPath(0),
+        thumbnail_url=FieldPath(1, 0),
+        res_width=FieldPath(1, 1),
+        res_height=FieldPath(1, 2),
+        timestamp=FieldPath(2),
+        dedup_key=FieldPath(3),
+        timezone_offset=FieldPath(4),
+        creation_timestamp=FieldPath(5),
+        video_duration=FieldPath(-1, "76647426", 0),
+    )
+
     @classmethod
     def from_data(cls, item_data):
-        return cls(
-            media_key=safe_get(item_data, 0),
-            thumbnail_url=safe_get(item_data, 1, 0),
-            res_width=safe_get(item_data, 1, 1),
-            res_height=safe_get(item_data, 1, 2),
-            timestamp=safe_get(item_data, 2),
-            dedup_key=safe_get(item_data, 3),
-            timezone_offset=safe_get(item_data, 4),
-            creation_timestamp=safe_get(item_data, 5),
-            video_duration=safe_get(item_data, -1, "76647426", 0),
-        )
-
-
-@dataclass
+        return cls(**cls._spec(item_data))
+
+
+@dataclass(slots=True)
 class TrashPage:
     items: list[TrashItem]
     next_page_id: Optional[str]
 
+    _spec = FieldSpec(
+        items=FieldPath(0, transform=lambda items: [TrashItem.from_data(item) for item in items or []]),
+        next_page_id=FieldPath(1),
+    )
+
     @classmethod
     def from_data(cls, data):
-        return cls(
-            items=[TrashItem.from_data(item) for item in safe_get(data, 0) or []],
-            next_page_id=safe_get(data, 1),
-        )
+        return cls(**cls._spec(data))
 
 
-@dataclass
+@dataclass(slots=True)
 class RemoteMatch:
     hash: str
     media_key: str
@@ -147,24 +165,26 @@ class RemoteMatch:
     video_duration: Optional[int]
     camera_info: Optional[str]
 
+    _spec = FieldSpec(
+        hash=FieldPath(0),
+        media_key=FieldPath(1, 0),
+        thumb=FieldPath(1, 1, 0),
+        res_width=FieldPath(1, 1, 1),
+        res_height=FieldPath(1, 1, 2),
+        timestamp=FieldPath(1, 2),
+        dedup_key=FieldPath(1, 3),
+        timezone_offset=FieldPath(1, 4),
+        creation_timestamp=FieldPath(1, 5),
+        video_duration=FieldPath(1, -1, "76647426", 0),
+        camera_info=FieldPath(1, 1, 8, transform=intern_string),
+    )
+
     @classmethod
     def from_data(cls, item_data):
-        return cls(
-            hash=safe_get(item_data, 0),
-            media_key=safe_get(item_data, 1, 0),
-            thumb=safe_get(item_data, 1, 1, 0),
-            res_width=safe_get(item_data, 1, 1, 1),
-            res_height=safe_get(item_data, 1, 1, 2),
-            timestamp=safe_get(item_data, 1, 2),
-            dedup_key=safe_get(item_data, 1, 3),
-            timezone_offset=safe_get(item_data, 1, 4),
-            creation_timestamp=safe_get(item_data, 1, 5),
-            video_duration=safe_get(item_data, 1, -1, "76647426", 0),
-            camera_info=safe_get(item_data, 1, 1, 8),
-        )
-
-
-@dataclass
+        return cls(**cls._spec(item_data))
+
+
+@dataclass(slots=True)
 class ItemInfo:
     media_key: str
     dedup_key: str
@@ -188,38 +208,40 @@ class ItemInfo:
     live_photo_video_download_url: Optional[str]
     trash_timestamp: Optional[int]
 
+    _spec = FieldSpec(
+        media_key=FieldPath(0, 0),
+        dedup_key=FieldPath(0, 3),
+        res_width=FieldPath(0, 1, 1),
+        res_height=FieldPath(0, 1, 2),
+        is_partial_upload=FieldPath(0, 12, 0, transform=lambda status: status == 20),
+        timestamp=FieldPath(0, 2),
+        timezone_offset=FieldPath(0, 4),
+        creation_timestamp=FieldPath(0, 5),
+        download_url=FieldPath(1),
+        download_original_url=FieldPath(7),
+        saved_to_your_photos=FieldPath(0, 15, "163238866", default=[], transform=lambda favorite: len(favorite) > 0),
+        is_archived=FieldPath(0, 13),
+        space_taken=FieldPath(0, 15, "318563170", 0, 1),
+        is_original_quality=FieldPath(0, 15, "318563170", 0, 2, transform=lambda quality: quality == 2),
+        is_favorite=FieldPath(0, 15, "163238866", 0),
+        video_duration=FieldPath(0, 15, "76647426", 0),
+        live_photo_duration=FieldPath(0, 15, "146008172", 1),
+        live_photo_video_download_url=FieldPath(0, 15, "146008172", 3),
+        trash_timestamp=FieldPath(0, 15, "225032867", 0),
+        description_full=FieldPath(10),
+        thumbnail_url=FieldPath(12),
+    )
+
     @classmethod
     def from_data(cls, item_data):
         """
         Constructs an ItemInfo instance from the given nested item_data structure.
-        Uses safe_get to safely access nested values.
+        Missing values resolve to None, the same way safe_get does.
         """
-        return cls(
-            media_key=safe_get(item_data, 0, 0),
-            dedup_key=safe_get(item_data, 0, 3),
-            res_width=safe_get(item_data, 0, 1, 1),
-            res_height=safe_get(item_data, 0, 1, 2),
-            is_partial_upload=safe_get(item_data, 0, 12, 0) == 20,
-            timestamp=safe_get(item_data, 0, 2),
-            timezone_offset=safe_get(item_data, 0, 4),
-            creation_timestamp=safe_get(item_data, 0, 5),
-            download_url=safe_get(item_data, 1),
-            download_original_url=safe_get(item_data, 7),
-            saved_to_your_photos=len(safe_get(item_data, 0, 15, "163238866", default=[])) > 0,
-            is_archived=safe_get(item_data, 0, 13),
-            space_taken=safe_get(item_data, 0, 15, "318563170", 0, 1),
-            is_original_quality=safe_get(item_data, 0, 15, "318563170", 0, 2) == 2,
-            is_favorite=safe_get(item_data, 0, 15, "163238866", 0),
-            video_duration=safe_get(item_data, 0, 15, "76647426", 0),
-            live_photo_duration=safe_get(item_data, 0, 15, "146008172", 1),
-            live_photo_video_download_url=safe_get(item_data, 0, 15, "146008172", 3),
-            trash_timestamp=safe_get(item_data, 0, 15, "225032867", 0),
-            description_full=safe_get(item_data, 10),
-            thumbnail_url=safe_get(item_data, 12),
-        )
-
-
-@dataclass
+        return cls(**cls._spec(item_data))
+
+
+@dataclass(slots=True)
 class Actor:
     actor_id: Optional[str]
     gaia_id: Optional[str]
@@ -227,18 +249,20 @@ class Actor:
     gender: Optional[str]
     profile_photo_url: Optional[str]
 
+    _spec = FieldSpec(
+        actor_id=FieldPath(0, transform=intern_string),
+        gaia_id=FieldPath(1, transform=intern_string),
+        name=FieldPath(11, 0, transform=intern_string),
+        gender=FieldPath(11, 2, transform=intern_string),
+        profile_photo_url=FieldPath(12, 0, transform=intern_string),
+    )
+
     @classmethod
     def from_data(cls, data):
-        return cls(
-            actor_id=safe_get(data, 0),
-            gaia_id=safe_get(data, 1),
-            name=safe_get(data, 11, 0),
-            gender=safe_get(data, 11, 2),
-            profile_photo_url=safe_get(data, 12, 0),
-        )
+        return cls(**cls._spec(data))
 
 
-@dataclass
+@dataclass(slots=True)
 class Album:
     media_key: str
     owner_actor_id: Optional[str]
@@ -250,38 +274,43 @@ class Album:
     modified_timestamp: int
     timestamp_range: Optional[list[Optional[int]]]
 
+    _spec = FieldSpec(
+        media_key=FieldPath(0),
+        owner_actor_id=FieldPath(6, 0, transform=intern_string),
+        title=FieldPath(-1, "72930366", 1),
+        thumbnail_url=FieldPath(1, 0),
+        item_count=FieldPath(-1, "72930366", 3),
+        creation_timestamp=FieldPath(-1, "72930366", 2, 4),
+        modified_timestamp=FieldPath(-1, "72930366", 2, 9),
+        timestamp_range=Computed(
+            lambda start, end: [start, end],
+            FieldPath(-1, "72930366", 2, 5),
+            FieldPath(-1, "72930366", 2, 6),
+        ),
+        is_shared=FieldPath(-1, "72930366", 4, transform=lambda shared: shared or False),
+    )
+
     @classmethod
     def from_data(cls, item_data):
-        return cls(
-            media_key=safe_get(item_data, 0),
-            owner_actor_id=safe_get(item_data, 6, 0),
-            title=safe_get(item_data, -1, "72930366", 1),
-            thumbnail_url=safe_get(item_data, 1, 0),
-            item_count=safe_get(item_data, -1, "72930366", 3),
-            creation_timestamp=safe_get(item_data, -1, "72930366", 2, 4),
-            modified_timestamp=safe_get(item_data, -1, "72930366", 2, 9),
-            timestamp_range=[
-                safe_get(item_data, -1, "72930366", 2, 5),
-                safe_get(item_data, -1, "72930366", 2, 6),
-            ],
-            is_shared=safe_get(item_data, -1, "72930366", 4) or False,
-        )
-
-
-@dataclass
+        return cls(**cls._spec(item_data))
+
+
+@dataclass(slots=True)
 class AlbumsPage:
     items: list[Album]
     next_page_id: Optional[str]
 
+    _spec = FieldSpec(
+        items=FieldPath(0, transform=lambda items: [Album.from_data(item) for item in items or []]),
+        next_page_id=FieldPath(1),
+    )
+
     @classmethod
     def from_data(cls, data):
-        return cls(
-            items=[Album.from_data(item) for item in safe_get(data, 0) or []],
-            next_page_id=safe_get(data, 1),
-        )
+        return cls(**cls._spec(data))
 
 
-@dataclass
+@dataclass(slots=True)
 class SharedLink:
     thumbnail_url: str
     item_count: int
@@ -292,34 +321,63 @@ class SharedLink:
     members: list[Actor]
     owner: Actor
 
+    _spec = FieldSpec(
+        thumbnail_url=FieldPath(2, 0),
+        item_count=FieldPath(3),
+        creation_timestamp=FieldPath(4),
+        media_key=FieldPath(6),
+        auth_key=FieldPath(7),
+        link_id=FieldPath(17),
+        members=FieldPath(9, transform=lambda members: [Actor.from_data(actor_data) for actor_data in members]),
+        owner=FieldPath(10, 0, transform=lambda owner: Actor.from_data(owner)),
+    )
+
     @classmethod
     def from_data(cls, data):
-        return cls(
-            thumbnail_url=safe_get(data, 2, 0),
-            item_count=safe_get(data, 3),
-            creation_timestamp=safe_get(data, 4),
-            media_key=safe_get(data, 6),
-            auth_key=safe_get(data, 7),
-            link_id=safe_get(data, 17),
-            members=[Actor.from_data(actor_data) for actor_data in safe_get(data, 9)],
-            owner=Actor.from_data(safe_get(data, 10, 0)),
-        )
-
-
-@dataclass
+        return cls(**cls._spec(data))
+
+
+@dataclass(slots=True)
 class SharedLinksPage:
     items: list[SharedLink]
     next_page_id: Optional[str]
 
+    _spec = FieldSpec(
+        items=FieldPath(0, transform=lambda items: [SharedLink.from_data(item) for item in items or []]),
+        next_page_id=FieldPath(1),
+    )
+
     @classmethod
     def from_data(cls, data):
-        return cls(
-            items=[SharedLink.from_data(item) for item in safe_get(data, 0) or []],
-            next_page_id=safe_get(data, 1),
-        )
+        return cls(**cls._spec(data))
 
 
-@dataclass
+SOURCE_MAP = {
+    1: "mobile",
+    2: "web",
+    3: "shared",
+    4: "partnerShared",
+    7: "drive",
+    8: "pc",
+    11: "gmail",
+}
+
+SOURCE_SECONDARY_MAP = {
+    1: "android",
+    3: "ios",
+}
+
+
+def _item_owner(source_info, shared_by, partner, uploader) -> "Actor":
+    owner = None
+    if source_info:
+        owner = Actor.from_data(shared_by or partner)
+    if not owner or not owner.actor_id:
+        owner = Actor.from_data(uploader)
+    return owner
+
+
+@dataclass(slots=True)
 class ItemInfoExt:
     media_key: Optional[str]
     dedup_key: Optional[str]
@@ -340,57 +398,39 @@ class ItemInfoExt:
     geo_location: Optional[GeoLocation]
     other: Optional[str]
 
+    _spec = FieldSpec(
+        media_key=FieldPath(0, 0),
+        dedup_key=FieldPath(0, 11),
+        description_full=FieldPath(0, 1),
+        file_name=FieldPath(0, 2),
+        timestamp=FieldPath(0, 3),
+        timezone_offset=FieldPath(0, 4),
+        size=FieldPath(0, 5),
+        res_width=FieldPath(0, 6),
+        res_height=FieldPath(0, 7),
+        camera_info=FieldPath(0, 23, transform=intern_string),
+        albums=FieldPath(0, 19, transform=lambda albums: [Album.from_data(album_data) for album_data in albums or []]),
+        source=Computed(
+            lambda source, secondary: [SOURCE_MAP.get(source), SOURCE_SECONDARY_MAP.get(secondary)],
+            FieldPath(0, 27, 0),
+            FieldPath(0, 27, 1, 2),
+        ),
+        space_taken=FieldPath(0, 30, 1),
+        is_original_quality=FieldPath(0, 30, 2, transform=lambda quality: quality == 2),
+        saved_to_your_photos=FieldPath(
+            0, 12, default=[], transform=lambda flags: len([sub_array for sub_array in flags if 20 in sub_array]) == 0
+        ),
+        owner=Computed(_item_owner, FieldPath(0, 27), FieldPath(0, 27, 3, 0), FieldPath(0, 27, 4, 0), FieldPath(0, 28)),
+        geo_location=FieldPath(transform=lambda item_data: GeoLocation.from_data(item_data)),
+        other=FieldPath(0, 31),
+    )
+
     @classmethod
     def from_data(cls, item_data):
-        source = []
-
-        source_map = {
-            1: "mobile",
-            2: "web",
-            3: "shared",
-            4: "partnerShared",
-            7: "drive",
-            8: "pc",
-            11: "gmail",
-        }
-
-        source_secondary_map = {
-            1: "android",
-            3: "ios",
-        }
-
-        source.append(source_map.get(safe_get(item_data, 0, 27, 0)))
-        source.append(source_secondary_map.get(safe_get(item_data, 0, 27, 1, 2)))
-
-        owner = None
-        if safe_get(item_data, 0, 27):
-            owner = Actor.from_data(safe_get(item_data, 0, 27, 3, 0) or safe_get(item_data, 0, 27, 4, 0))
-        if not owner or not owner.actor_id:
-            owner = Actor.from_data(safe_get(item_data, 0, 28))
-
-        return cls(
-            media_key=safe_get(item_data, 0, 0),
-            dedup_key=safe_get(item_data, 0, 11),
-            description_full=safe_get(item_data, 0, 1),
-            file_name=safe_get(item_data, 0, 2),
-            timestamp=safe_get(item_data, 0, 3),
-            timezone_offset=safe_get(item_data, 0, 4),
-            size=safe_get(item_data, 0, 5),
-            res_width=safe_get(item_data, 0, 6),
-            res_height=safe_get(item_data, 0, 7),
-            camera_info=safe_get(item_data, 0, 23),
-            albums=[Album.from_data(album_data) for album_data in safe_get(item_data, 0, 19) or []],
-            source=source,
-            space_taken=safe_get(item_data, 0, 30, 1),
-            is_original_quality=safe_get(item_data, 0, 30, 2) == 2,
-            saved_to_your_photos=len([sub_array for sub_array in safe_get(item_data, 0, 12, default=[]) if 20 in sub_array]) == 0,
-            owner=owner,
-            geo_location=GeoLocation.from_data(item_data),
-            other=safe_get(item_data, 0, 31),
-        )
-
-
-@dataclass
+        return cls(**cls._spec(item_data))
+
+
+@dataclass(slots=True)
 class AlbumItem:
     media_key: str
     thumbnail_url: str
@@ -403,23 +443,25 @@ class AlbumItem:
     live_photo_duration: Optional[int]
     video_duration: Optional[int]
 
+    _spec = FieldSpec(
+        media_key=FieldPath(0),
+        thumbnail_url=FieldPath(1, 0),
+        res_width=FieldPath(1, 1),
+        res_height=FieldPath(1, 2),
+        timestamp=FieldPath(2),
+        dedup_key=FieldPath(3),
+        timezone_offset=FieldPath(4),
+        creation_timestamp=FieldPath(5),
+        live_photo_duration=FieldPath(-1, "146008172", 1),
+        video_duration=FieldPath(-1, "76647426", 0),
+    )
+
     @classmethod
     def from_data(cls, data):
-        return cls(
-            media_key=safe_get(data, 0),
-            thumbnail_url=safe_get(data, 1, 0),
-            res_width=safe_get(data, 1, 1),
-            res_height=safe_get(data, 1, 2),
-            timestamp=safe_get(data, 2),
-            dedup_key=safe_get(data, 3),
-            timezone_offset=safe_get(data, 4),
-            creation_timestamp=safe_get(data, 5),
-            live_photo_duration=safe_get(data, -1, "146008172", 1),
-            video_duration=safe_get(data, -1, "76647426", 0),
-        )
-
-
-@dataclass
+        return cls(**cls._spec(data))
+
+
+@dataclass(slots=True)
 class AlbumPage:
     items: list[AlbumItem]
     next_page_id: str
@@ -433,29 +475,26 @@ class AlbumPage:
     members: list[Actor]
     timestamp_range: Optional[list[Optional[int]]]
 
+    _spec = FieldSpec(
+        items=FieldPath(1, transform=lambda items: list(map(lambda x: AlbumItem.from_data(x), items)) if items else []),
+        next_page_id=FieldPath(2),
+        media_key=FieldPath(3, 0),
+        thumbnail_url=FieldPath(3, 4, 0),
+        title=FieldPath(3, 1),
+        owner=FieldPath(3, 5, transform=lambda owner: Actor.from_data(owner)),
+        timestamp_range=Computed(lambda start, end: [start, end], FieldPath(3, 2, 5), FieldPath(3, 2, 6)),
+        item_count=FieldPath(3, 21),
+        last_activity_timestamp=FieldPath(3, 2, 9),
+        auth_key=FieldPath(3, 19),
+        members=FieldPath(3, 9, transform=lambda members: [Actor.from_data(actor_data) for actor_data in members]),
+    )
+
     @classmethod
     def from_data(cls, data):
-        album_item_data = safe_get(data, 1)
-        if album_item_data:
-            album_items = list(map(lambda x: AlbumItem.from_data(x), album_item_data))
-        else:
-            album_items = []
-        return cls(
-            items=album_items,
-            next_page_id=safe_get(data, 2),
-            media_key=safe_get(data, 3, 0),
-            thumbnail_url=safe_get(data, 3, 4, 0),
-            title=safe_get(data, 3, 1),
-            owner=Actor.from_data(safe_get(data, 3, 5)),
-            timestamp_range=[safe_get(data, 3, 2, 5), safe_get(data, 3, 2, 6)],
-            item_count=safe_get(data, 3, 21),
-            last_activity_timestamp=safe_get(data, 3, 2, 9),
-            auth_key=safe_get(data, 3, 19),
-            members=[Actor.from_data(actor_data) for actor_data in safe_get(data, 3, 9)],
-        )
-
-
-@dataclass
+        return cls(**cls._spec(data))
+
+
+@dataclass(slots=True)
 class PartnerSharedItem:
     media_key: str
     thumbnail_url: str
@@ -469,24 +508,26 @@ class PartnerSharedItem:
     live_photo_duration: int
     video_duration: int
 
+    _spec = FieldSpec(
+        media_key=FieldPath(0),
+        thumbnail_url=FieldPath(1, 0),
+        res_width=FieldPath(1, 1),
+        res_height=FieldPath(1, 2),
+        timestamp=FieldPath(2),
+        dedup_key=FieldPath(3),
+        timezone_offset=FieldPath(4),
+        creation_timestamp=FieldPath(5),
+        is_saved=FieldPath(-1, "146008172", 1),
+        live_photo_duration=FieldPath(0),
+        video_duration=FieldPath(-1, "76647426", 0),
+    )
+
     @classmethod
     def from_data(cls, data):
-        return cls(
-            media_key=safe_get(data, 0),
-            thumbnail_url=safe_get(data, 1, 0),
-            res_width=safe_get(data, 1, 1),
-            res_height=safe_get(data, 1, 2),
-            timestamp=safe_get(data, 2),
-            dedup_key=safe_get(data, 3),
-            timezone_offset=safe_get(data, 4),
-            creation_timestamp=safe_get(data, 5),
-            is_saved=safe_get(data, -1, "146008172", 1),
-            live_photo_duration=safe_get(data, 0),
-            video_duration=safe_get(data, -1, "76647426", 0),
-        )
-
-
-@dataclass
+        return cls(**cls._spec(data))
+
+
+@dataclass(slots=True)
 class PartnerSharedMediaPage:
     items: list[PartnerSharedItem]
     next_page_id: str
@@ -494,34 +535,38 @@ class PartnerSharedMediaPage:
     parnter_actor_id: str
     gaia_id: str
 
+    _spec = FieldSpec(
+        next_page_id=FieldPath(0),
+        items=FieldPath(1, transform=lambda items: [PartnerSharedItem.from_data(item) for item in items]),
+        members=FieldPath(2, transform=lambda members: [Actor.from_data(item) for item in members]),
+        parnter_actor_id=FieldPath(4, transform=intern_string),
+        gaia_id=FieldPath(5, transform=intern_string),
+    )
+
     @classmethod
     def from_data(cls, data):
-        return cls(
-            next_page_id=safe_get(data, 0),
-            items=[PartnerSharedItem.from_data(item) for item in safe_get(data, 1)],
-            members=[Actor.from_data(item) for item in safe_get(data, 2)],
-            parnter_actor_id=safe_get(data, 4),
-            gaia_id=safe_get(data, 5),
-        )
+        return cls(**cls._spec(data))
 
 
-@dataclass
+@dataclass(slots=True)
 class ImportedDriveMedia:
     drive_key: str
     media_key: str
     dedup_key: str
     # TODO: parse more data field
 
+    _spec = FieldSpec(
+        drive_key=FieldPath(0),
+        media_key=FieldPath(1, 0),
+        dedup_key=FieldPath(1, 3),
+    )
+
     @classmethod
     def from_data(cls, data):
-        return cls(
-            drive_key=safe_get(data, 0),
-            media_key=safe_get(data, 1, 0),
-            dedup_key=safe_get(data, 1, 3),
-        )
+        return cls(**cls._spec(data))
 
 
-@dataclass
+@dataclass(slots=True)
 class ItemInfoBatch:
     media_key: str
     description_full: str
@@ -533,54 +578,136 @@ class ItemInfoBatch:
     space_taken: int
     is_original_quality: bool
 
+    _spec = FieldSpec(
+        media_key=FieldPath(0),
+        description_full=FieldPath(1, 2),
+        file_name=FieldPath(1, 3),
+        timestamp=FieldPath(1, 6),
+        timezone_offset=FieldPath(1, 7),
+        creation_timestamp=FieldPath(1, 8),
+        size=FieldPath(1, 9),
+        space_taken=FieldPath(1, -1, 1),
+        is_original_quality=FieldPath(1, -1, 2, transform=lambda quality: quality == 2),
+    )
+
     @classmethod
     def from_data(cls, item_data):
-        return cls(
-            media_key=safe_get(item_data, 0),
-            description_full=safe_get(item_data, 1, 2),
-            file_name=safe_get(item_data, 1, 3),
-            timestamp=safe_get(item_data, 1, 6),
-            timezone_offset=safe_get(item_data, 1, 7),
-            creation_timestamp=safe_get(item_data, 1, 8),
-            size=safe_get(item_data, 1, 9),
-            space_taken=safe_get(item_data, 1, -1, 1),
-            is_original_quality=safe_get(item_data, 1, -1, 2) == 2,
-        )
-
-
-@dataclass
+        return cls(**cls._spec(item_data))
+
+
+@dataclass(slots=True)
 class StorageQuota:
     total_used: int
     total_available: int
     used_by_gphotos: int
 
+    _spec = FieldSpec(
+        total_used=FieldPath(6, 0),
+        total_available=FieldPath(6, 1),
+        used_by_gphotos=FieldPath(6, 3),
+    )
+
     @classmethod
     def from_data(cls, item_data):
-        return cls(
-            total_used=safe_get(item_data, 6, 0),
-            total_available=safe_get(item_data, 6, 1),
-            used_by_gphotos=safe_get(item_data, 6, 3),
-        )
+        return cls(**cls._spec(item_data))
 
 
-@dataclass
+@dataclass(slots=True)
 class Download:
     file_name: str
     download_url: int
     download_size: int
     unzipped_size: int
 
+    _spec = FieldSpec(
+        file_name=FieldPath(0, 0, 0, 2, 0, 0),
+        download_url=FieldPath(0, 0, 0, 2, 0, 1),
+        download_size=FieldPath(0, 0, 0, 2, 0, 2),
+        unzipped_size=FieldPath(0, 0, 0, 2, 0, 3),
+    )
+
     @classmethod
     def from_data(cls, item_data):
-        return cls(
-            file_name=safe_get(item_data, 0, 0, 0, 2, 0, 0),
-            download_url=safe_get(item_data, 0, 0, 0, 2, 0, 1),
-            download_size=safe_get(item_data, 0, 0, 0, 2, 0, 2),
-            unzipped_size=safe_get(item_data, 0, 0, 0, 2, 0, 3),
-        )
-
-
-def parse_response_data(rpc_id: str, data: dict):
+        return cls(**cls._spec(item_data))
+
+
+class LazyView:
+    """Read only view over the raw data of a parsed model, a field is decoded on first access.
+
+    `to_model()` builds the eager dataclass from the same raw data.
+    """
+
+    __slots__ = ("raw", "_values")
+    model: type
+
+    def __init__(self, raw) -> None:
+        self.raw = raw
+        self._values = {}
+
+    def to_model(self):
+        return self.model.from_data(self.raw)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({reprlib.repr(self.raw)})"
+
+
+def _lazy_field(name: str, spec: FieldSpec) -> property:
+    def get(self):
+        values = self._values
+        if name in values:
+            return values[name]
+        value = values[name] = spec.getter(name)(self.raw)
+        return value
+
+    return property(get)
+
+
+def make_view(model: type, **overrides: FieldPath | Computed) -> type[LazyView]:
+    """Lazy view class of model, overrides replace field specs (e.g. to keep page items lazy)"""
+    spec = FieldSpec(**{**model._spec.fields, **overrides}) if overrides else model._spec
+    namespace = {"__slots__": (), "model": model}
+    for name in spec.fields:
+        namespace[name] = _lazy_field(name, spec)
+    return type(f"{model.__name__}View", (LazyView,), namespace)
+
+
+LibraryItemView = make_view(LibraryItem)
+LibraryTimelinePageView = make_view(
+    LibraryTimelinePage,
+    items=FieldPath(0, default=[], transform=lambda items: [LibraryItemView(item) for item in items]),
+)
+LibraryGenericPageView = make_view(
+    LibraryGenericPage,
+    items=FieldPath(0, transform=lambda items: [LibraryItemView(item) for item in items or []]),
+)
+TrashItemView = make_view(TrashItem)
+TrashPageView = make_view(TrashPage, items=FieldPath(0, transform=lambda items: [TrashItemView(item) for item in items or []]))
+AlbumView = make_view(Album)
+AlbumsPageView = make_view(AlbumsPage, items=FieldPath(0, transform=lambda items: [AlbumView(item) for item in items or []]))
+AlbumItemView = make_view(AlbumItem)
+AlbumPageView = make_view(AlbumPage, items=FieldPath(1, transform=lambda items: [AlbumItemView(item) for item in items] if items else []))
+SharedLinkView = make_view(SharedLink)
+SharedLinksPageView = make_view(SharedLinksPage, items=FieldPath(0, transform=lambda items: [SharedLinkView(item) for item in items or []]))
+PartnerSharedItemView = make_view(PartnerSharedItem)
+PartnerSharedMediaPageView = make_view(
+    PartnerSharedMediaPage,
+    items=FieldPath(1, transform=lambda items: [PartnerSharedItemView(item) for item in items]),
+)
+
+LAZY_VIEWS = {
+    "lcxiM": LibraryTimelinePageView,
+    "EzkLib": LibraryGenericPageView,
+    "zy0IHe": TrashPageView,
+    "Z5xsfc": AlbumsPageView,
+    "snAcKc": AlbumPageView,
+    "F2A0H": SharedLinksPageView,
+    "e9T5je": PartnerSharedMediaPageView,
+}
+
+
+def parse_response_data(rpc_id: str, data: dict, lazy: bool = False):
+    if lazy and rpc_id in LAZY_VIEWS:
+        return LAZY_VIEWS[rpc_id](data)
     match rpc_id:
         case "lcxiM":
             return LibraryTimelinePage.from_data(data)
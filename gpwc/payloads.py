@@ -1,5 +1,6 @@
-from typing import Literal, Optional, TYPE_CHECKING, overload, Any
+from typing import Literal, Optional, TYPE_CHECKING, overload, Any, Awaitable
 from abc import ABC
+import copy
 
 
 from . import parser
@@ -8,30 +9,59 @@ from .models import ApiResponse, DriveMedia
 
 if TYPE_CHECKING:
     from .client import Client
+    from .async_client import AsyncClient
 
 
 class Payload(ABC):
     rpcid: str
     data: list[Any]
     payload_id: str
-    parse_response: bool = False
+    parse_response: bool | Literal["lazy"] = False
 
     def __init__(self):
         self.payload_id: str = generate_id()
 
-    def execute(self, client: "Client") -> ApiResponse:
+    def execute(self, client: "Client | AsyncClient") -> ApiResponse | Awaitable[ApiResponse]:
+        """Send this payload alone, returns an awaitable if client is an `AsyncClient`"""
+        if client.is_async:
+            return self._execute_async(client)
         with client:
             return client.send_api_request([self])[0]
 
+    async def _execute_async(self, client: "AsyncClient") -> ApiResponse:
+        async with client:
+            return (await client.send_api_request([self]))[0]
+
+
+# payloads already encoded, to their prepared form and f.req element (`BaseClient.encode_payload`)
+EncodedPayloads = dict[Payload, tuple[list, bytes]]
+
+
+class PagedPayload(Payload):
+    """Payload of a paginated rpc, page_id sits at `page_id_index` of data.
+    parse_response="lazy" returns views decoding each field on first access."""
+
+    page_id_index: int
+
+    def next_page(self, page_id: str) -> "PagedPayload":
+        """Copy of this payload requesting page_id"""
+        payload = copy.copy(self)
+        payload.payload_id = generate_id()
+        payload.data = list(self.data)
+        payload.data[self.page_id_index] = page_id
+        return payload
+
+
+class GetLibraryPageByTakenDate(PagedPayload):
+    page_id_index = 0
 
-class GetLibraryPageByTakenDate(Payload):
     def __init__(
         self,
         timestamp: Optional[int] = None,
         page_id: Optional[str] = None,
         source: Literal["library", "archive", "both"] = "both",
         page_size: int = 500,
-        parse_response: bool = True,
+        parse_response: bool | Literal["lazy"] = True,
     ):
         super().__init__()
         source_map = {"library": 1, "archive": 2, "both": 3}
@@ -46,11 +76,13 @@ class GetLibraryPageByTakenDate(Payload):
         return super().execute(client)
 
 
-class GetLibarayPageByUploadedDate(Payload):
+class GetLibarayPageByUploadedDate(PagedPayload):
+    page_id_index = 2
+
     def __init__(
         self,
         page_id: Optional[str] = None,
-        parse_response: bool = True,
+        parse_response: bool | Literal["lazy"] = True,
     ):
         super().__init__()
         self.parse_response = parse_response
@@ -64,12 +96,14 @@ class GetLibarayPageByUploadedDate(Payload):
         return super().execute(client)
 
 
-class GetSearchPage(Payload):
+class GetSearchPage(PagedPayload):
+    page_id_index = 2
+
     def __init__(
         self,
         query: str,
         page_id: Optional[str] = None,
-        parse_response: bool = True,
+        parse_response: bool | Literal["lazy"] = True,
     ):
         super().__init__()
         self.parse_response = parse_response
@@ -285,11 +319,13 @@ class DeleteItemGeoData(Payload):
         self.data = [dedup_key_list, [1]]
 
 
-class GetFavoritesPage(Payload):
+class GetFavoritesPage(PagedPayload):
+    page_id_index = 2
+
     def __init__(
         self,
         page_id: Optional[str] = None,
-        parse_response: bool = True,
+        parse_response: bool | Literal["lazy"] = True,
     ):
         super().__init__()
         self.parse_response = parse_response
@@ -303,11 +339,13 @@ class GetFavoritesPage(Payload):
         return super().execute(client)
 
 
-class GetTrashPage(Payload):
+class GetTrashPage(PagedPayload):
+    page_id_index = 0
+
     def __init__(
         self,
         page_id: Optional[str] = None,
-        parse_response: bool = True,
+        parse_response: bool | Literal["lazy"] = True,
     ):
         super().__init__()
         self.parse_response = parse_response
@@ -321,12 +359,14 @@ class GetTrashPage(Payload):
         return super().execute(client)
 
 
-class GetAlbumsPage(Payload):
+class GetAlbumsPage(PagedPayload):
+    page_id_index = 0
+
     def __init__(
         self,
         page_id: Optional[str] = None,
         page_size: Optional[int] = 100,
-        parse_response: bool = True,
+        parse_response: bool | Literal["lazy"] = True,
     ):
         super().__init__()
         self.parse_response = parse_response
@@ -340,13 +380,15 @@ class GetAlbumsPage(Payload):
         return super().execute(client)
 
 
-class GetAlbumPage(Payload):
+class GetAlbumPage(PagedPayload):
+    page_id_index = 1
+
     def __init__(
         self,
         media_key: str,
         page_id: Optional[str] = None,
         authKey: Optional[str] = None,
-        parse_response: bool = True,
+        parse_response: bool | Literal["lazy"] = True,
     ):
         super().__init__()
         self.parse_response = parse_response
@@ -360,11 +402,13 @@ class GetAlbumPage(Payload):
         return super().execute(client)
 
 
-class GetSharedLinksPage(Payload):
+class GetSharedLinksPage(PagedPayload):
+    page_id_index = 0
+
     def __init__(
         self,
         page_id: Optional[str] = None,
-        parse_response: bool = True,
+        parse_response: bool | Literal["lazy"] = True,
     ):
         super().__init__()
         self.parse_response = parse_response
@@ -481,13 +525,15 @@ class SaveSharedMediaToLibrary(Payload):
         self.data = [item_media_keys, auth_key, album_media_key]
 
 
-class GetPartnerSharedMedia(Payload):
+class GetPartnerSharedMedia(PagedPayload):
+    page_id_index = 0
+
     def __init__(
         self,
         partner_actor_id: str,
         gaia_id: str,
         page_id: Optional[str] = None,
-        parse_response: bool = True,
+        parse_response: bool | Literal["lazy"] = True,
     ):
         """Partner's actor_id, your account's gaia_id"""
         super().__init__()
@@ -0,0 +1,206 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Iterable, Literal, Optional
+
+from . import utils
+from .client import Client
+from .dispatcher import chunk_payloads
+from .exceptions import RequestError
+from .models import ApiResponse
+from .payloads import EncodedPayloads, Payload
+from .ratelimit import TokenBucket
+
+
+@dataclass(slots=True)
+class AccountStats:
+    requests: int = 0
+    payloads: int = 0
+    failed_payloads: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    throttled_seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class PoolStats:
+    uptime: float
+    requests: int
+    payloads: int
+    failed_payloads: int
+    errors: int
+    requests_per_second: float
+    payloads_per_second: float
+    accounts: dict[str, AccountStats]
+
+
+class ClientPool:
+    """Many accounts driven from one process, one `Client` per cookies file.
+
+    Clients are bootstrapped concurrently. Every account runs at most max_concurrency requests at once,
+    whether sent directly or submitted to its own thread pool, behind its own request rate budget, so a
+    busy account queues behind itself instead of starving the others. Accounts are addressed by account
+    name (as logged on bootstrap) or by cookies file path, each account is loaded once.
+    """
+
+    def __init__(
+        self,
+        cookies_txt_paths: Iterable[str | Path],
+        max_concurrency: int = 4,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_bootstrap_workers: int = 16,
+        log_level: Literal["INFO", "DEBUG", "WARNING", "ERROR", "CRITICAL"] = "INFO",
+        **client_kwargs: Any,
+    ) -> None:
+        """requests_per_second and burst set the rate budget of every account, unlimited if None.
+        Extra keyword arguments are passed to each `Client`."""
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.logger = utils.create_logger(log_level)
+        self.clients: dict[str, Client] = {}
+        self.buckets: dict[str, TokenBucket] = {}
+        self.load_errors: dict[str, BaseException] = {}
+        self._paths: dict[str, str] = {}
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._stats: dict[str, AccountStats] = {}
+        self._stats_lock = threading.Lock()
+        self._started = time.monotonic()
+        self.load(cookies_txt_paths, max_bootstrap_workers, log_level, client_kwargs)
+
+    def load(self, cookies_txt_paths: Iterable[str | Path], max_workers: int, log_level: str, client_kwargs: dict) -> None:
+        """Bootstrap a client per cookies file concurrently, failed ones are logged and kept in `load_errors`"""
+        paths = [str(path) for path in cookies_txt_paths]
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gpwc-bootstrap") as executor:
+            futures = {executor.submit(Client, path, log_level, max_workers=self.max_concurrency, **client_kwargs): path for path in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    self.add_client(future.result(), path)
+                except Exception as e:
+                    self.logger.error(f"Could not load {path}: {e}")
+                    self.load_errors[path] = e
+
+    def add_client(self, client: Client, cookies_txt_path: Optional[str | Path] = None) -> str:
+        """Add a bootstrapped client to the pool, returns its account name.
+        A client of an account already in the pool is closed and ValueError is raised."""
+        account = client.global_data["oPEP7c"]
+        existing = self.clients.get(account)
+        if existing is not None and existing is not client:
+            client.close()
+            raise ValueError(f"Account {account} is already loaded from {existing.cookies_txt_path}")
+        self.clients[account] = client
+        self._slots.setdefault(account, threading.BoundedSemaphore(self.max_concurrency))
+        self._paths[str(cookies_txt_path or client.cookies_txt_path)] = account
+        if self.requests_per_second is not None and account not in self.buckets:
+            self.buckets[account] = TokenBucket(self.requests_per_second, self.burst)
+        self._stats.setdefault(account, AccountStats())
+        return account
+
+    @property
+    def accounts(self) -> list[str]:
+        """Names of loaded accounts"""
+        return list(self.clients)
+
+    def account(self, key: str | Path) -> str:
+        """Account name from an account name or cookies file path"""
+        if key in self.clients:
+            return key
+        account = self._paths.get(str(key))
+        if account is None:
+            raise KeyError(f"Unknown account {key}")
+        return account
+
+    def client(self, key: str | Path) -> Client:
+        """Client of an account"""
+        return self.clients[self.account(key)]
+
+    def send(self, key: str | Path, payloads: Iterable[Payload], encoded: Optional[EncodedPayloads] = None) -> list[ApiResponse]:
+        """Send one batch with an account, waiting for one of its max_concurrency slots and its rate budget"""
+        account = self.account(key)
+        _payloads = list(payloads)
+        bucket = self.buckets.get(account)
+        with self._slots[account]:
+            throttled = bucket.acquire() if bucket is not None else 0.0
+            start = time.perf_counter()
+            try:
+                responses = self.clients[account].send_api_request(_payloads, encoded)
+            except Exception:
+                self._record(account, throttled, time.perf_counter() - start, len(_payloads), len(_payloads), error=True)
+                raise
+        failed = sum(not response.success for response in responses)
+        self._record(account, throttled, time.perf_counter() - start, len(_payloads), failed)
+        return responses
+
+    def submit(self, key: str | Path, payloads: Iterable[Payload], encoded: Optional[EncodedPayloads] = None) -> Future:
+        """Send one batch in the background on the account's own workers"""
+        account = self.account(key)
+        return self.clients[account].executor.submit(self.send, account, list(payloads), encoded)
+
+    def map(self, routed: Iterable[tuple[str | Path, Payload]], max_payloads: int = 50) -> list[ApiResponse]:
+        """Send (account, payload) pairs, batched per account, returns responses in input order.
+        Payloads of a batch whose request failed come back unsuccessful with a `RequestError`."""
+        routed = [(self.account(key), payload) for key, payload in routed]
+        by_account: dict[str, list[Payload]] = {}
+        for account, payload in routed:
+            by_account.setdefault(account, []).append(payload)
+        encoded: EncodedPayloads = {}
+        chunks = [
+            (chunk, self.submit(account, chunk, encoded))
+            for account, account_payloads in by_account.items()
+            for chunk in chunk_payloads(self.clients[account], account_payloads, max_payloads, encoded=encoded)
+        ]
+        by_id: dict[str, ApiResponse] = {}
+        for chunk, future in chunks:
+            try:
+                by_id.update((response.response_id, response) for response in future.result())
+            except Exception as e:
+                for payload in chunk:
+                    error = RequestError(payload.rpcid, payload.payload_id, f"{type(e).__name__}: {e}")
+                    error.__cause__ = e
+                    by_id[payload.payload_id] = ApiResponse(payload.rpcid, None, False, payload.payload_id, error)
+        return [by_id[payload.payload_id] for _, payload in routed]
+
+    def _record(self, account: str, throttled: float, busy: float, payloads: int, failed: int, error: bool = False) -> None:
+        with self._stats_lock:
+            stats = self._stats[account]
+            stats.requests += 1
+            stats.payloads += payloads
+            stats.failed_payloads += failed
+            stats.errors += error
+            stats.busy_seconds += busy
+            stats.throttled_seconds += throttled
+
+    def stats(self) -> PoolStats:
+        """Per account counters and aggregate throughput since the pool was created"""
+        with self._stats_lock:
+            accounts = {account: replace(stats) for account, stats in self._stats.items()}
+        uptime = time.monotonic() - self._started
+        requests = sum(stats.requests for stats in accounts.values())
+        payloads = sum(stats.payloads for stats in accounts.values())
+        return PoolStats(
+            uptime=uptime,
+            requests=requests,
+            payloads=payloads,
+            failed_payloads=sum(stats.failed_payloads for stats in accounts.values()),
+            errors=sum(stats.errors for stats in accounts.values()),
+            requests_per_second=requests / uptime if uptime else 0.0,
+            payloads_per_second=payloads / uptime if uptime else 0.0,
+            accounts=accounts,
+        )
+
+    def __enter__(self):
+        """Enter"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Close all clients on exit"""
+        self.close()
+
+    def close(self) -> None:
+        """Close every client"""
+        for client in self.clients.values():
+            client.close()
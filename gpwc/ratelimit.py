@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+from typing import Iterable, Optional
+
+from . import utils
+
+
+class TokenBucket:
+    """Thread safe token bucket allowing rate tokens per second with bursts of up to burst tokens.
+
+    Tokens are reserved in call order, a caller that has to wait is told how long instead of polling.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take tokens, returns the seconds to wait before they may be used"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= tokens
+            return max(0.0, -self.tokens / self.rate) + max(0.0, self.paused_until - now)
+
+    def set_rate(self, rate: float) -> None:
+        """Change the rate, tokens accumulated so far are kept"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for at least seconds from now"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def state(self) -> dict:
+        """Current rate, available tokens and remaining pause"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {"rate": self.rate, "tokens": self.tokens, "paused_for": max(0.0, self.paused_until - now)}
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Block until tokens are available, returns the time waited"""
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """Asyncio flavour of `acquire`"""
+        wait = self.reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class AdaptiveRateLimiter:
+    """Client side pacing that adapts to server feedback (AIMD).
+
+    Every request takes a token from the client wide bucket and from the bucket of each rpcid it
+    carries. Successful requests raise the rates of those buckets by `increase` requests per second,
+    429 and 5xx responses cut the client rate and the rpcid rates by `decrease` and honour `Retry-After`,
+    failed rpcs (`er` frames, resource exhausted and unavailable codes) only cut their rpcid rate.
+    Rates stay between min_rate and max_rate. `state()` shows where they settled.
+    """
+
+    # wrb.fr error codes meaning the server is shedding load (resource exhausted, unavailable)
+    THROTTLE_CODES = (8, 14)
+    # statuses retried after backing off, others are not known to be safe to send again
+    RETRY_STATUSES = (429, 503)
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        min_rate: float = 0.2,
+        max_rate: float = 50.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        burst: Optional[float] = None,
+    ) -> None:
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst
+        self.client_bucket = TokenBucket(rate, burst)
+        self.rpcid_buckets: dict[str, TokenBucket] = {}
+        self.counters = {"successes": 0, "throttled": 0, "rpc_errors": 0}
+        self._lock = threading.Lock()
+
+    def _buckets(self, rpcids: Iterable[str]) -> list[TokenBucket]:
+        with self._lock:
+            buckets = [self.client_bucket]
+            for rpcid in dict.fromkeys(rpcids):
+                bucket = self.rpcid_buckets.get(rpcid)
+                if bucket is None:
+                    bucket = self.rpcid_buckets[rpcid] = TokenBucket(self.initial_rate, self.burst)
+                buckets.append(bucket)
+            return buckets
+
+    def reserve(self, rpcids: Iterable[str]) -> float:
+        """Take a token from every bucket involved, returns the seconds to wait"""
+        return max(bucket.reserve() for bucket in self._buckets(rpcids))
+
+    def acquire(self, rpcids: Iterable[str]) -> float:
+        """Block until a request carrying rpcids may be sent, returns the time waited"""
+        wait = self.reserve(rpcids)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, rpcids: Iterable[str]) -> float:
+        """Asyncio flavour of `acquire`"""
+        wait = self.reserve(rpcids)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def _scale(self, buckets: list[TokenBucket], increase: bool) -> None:
+        for bucket in buckets:
+            rate = bucket.rate + self.increase if increase else bucket.rate * self.decrease
+            bucket.set_rate(min(self.max_rate, max(self.min_rate, rate)))
+
+    def on_success(self, rpcids: Iterable[str]) -> None:
+        """Additive increase of the rates a successful request went through"""
+        self._scale(self._buckets(rpcids), increase=True)
+        with self._lock:
+            self.counters["successes"] += 1
+
+    def on_throttle(self, rpcids: Iterable[str], retry_after: Optional[float] = None) -> None:
+        """Multiplicative decrease after a throttled request, pause everything for retry_after"""
+        self._scale(self._buckets(rpcids), increase=False)
+        if retry_after:
+            self.client_bucket.pause(retry_after)
+        with self._lock:
+            self.counters["throttled"] += 1
+
+    def on_rpc_error(self, rpcid: str) -> None:
+        """Multiplicative decrease of a single rpcid rate"""
+        self._scale(self._buckets([rpcid])[1:], increase=False)
+        with self._lock:
+            self.counters["rpc_errors"] += 1
+
+    def feedback(self, rpcids: Iterable[str], status_code: int, retry_after: Optional[str] = None) -> bool:
+        """Adapt to an http response, returns whether the request should be sent again"""
+        if status_code == 429 or status_code >= 500:
+            self.on_throttle(rpcids, utils.parse_retry_after(retry_after))
+            return status_code in self.RETRY_STATUSES
+        if status_code < 400:
+            self.on_success(rpcids)
+        return False
+
+    def state(self) -> dict:
+        """Rates, tokens and pauses of every bucket, with feedback counters"""
+        with self._lock:
+            rpcid_buckets = dict(self.rpcid_buckets)
+            counters = dict(self.counters)
+        return {
+            "client": self.client_bucket.state(),
+            "rpcids": {rpcid: bucket.state() for rpcid, bucket in rpcid_buckets.items()},
+            **counters,
+        }
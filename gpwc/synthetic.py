@@ -0,0 +1,259 @@
+import json
+import random
+import string
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+# rpcids `parser.parse_response_data` understands
+RPCIDS = ("lcxiM", "EzkLib", "swbisb", "VrseUb", "fDcn4b", "zy0IHe", "EWgK9e", "Z5xsfc", "snAcKc", "F2A0H", "EzwWhf", "dnv2s", "e9T5je", "SusGud")
+# rpcids whose response is a list of items, the others describe a single object
+LIST_RPCIDS = ("lcxiM", "EzkLib", "swbisb", "zy0IHe", "EWgK9e", "Z5xsfc", "snAcKc", "F2A0H", "e9T5je", "SusGud")
+PAGED_RPCIDS = ("lcxiM", "EzkLib", "zy0IHe", "Z5xsfc", "snAcKc", "F2A0H", "e9T5je")
+
+KEY_ALPHABET = string.ascii_letters + string.digits + "-_"
+CAMERAS = ("Pixel 7", "Pixel 8 Pro", "iPhone 14 Pro", "iPhone 15", "SM-G991B", "Canon EOS R6", "NIKON D750", None)
+PLACES = ("Berlin", "Lisbon", "Kyoto", "Reykjavik", "Cape Town", "Montreal", "Hanoi")
+RESOLUTIONS = ((4032, 3024), (3024, 4032), (4000, 3000), (1920, 1080), (1080, 1920), (6000, 4000))
+BASE_TIMESTAMP = 1_700_000_000_000
+
+
+@dataclass(slots=True)
+class Density:
+    """Share of items carrying each optional field"""
+
+    geo: float = 0.3
+    video: float = 0.15
+    live_photo: float = 0.1
+    favorite: float = 0.1
+    description: float = 0.1
+    archived: float = 0.05
+    partial_upload: float = 0.01
+    shared: float = 0.25
+
+
+class ResponseGenerator:
+    """Deterministic synthetic response data shaped like live batchexecute responses.
+
+    The same seed and the same sequence of calls always produce the same data, items get unique keys
+    and timestamps going back in time like a library timeline.
+    """
+
+    def __init__(self, seed: int = 0, density: Optional[Density] = None) -> None:
+        self.rng = random.Random(seed)
+        self.density = density or Density()
+        self.timestamp = BASE_TIMESTAMP
+        self._actors = [self.actor() for _ in range(8)]
+
+    def chance(self, probability: float) -> bool:
+        return self.rng.random() < probability
+
+    def key(self, prefix: str = "AF1Qip", length: int = 38) -> str:
+        return prefix + "".join(self.rng.choices(KEY_ALPHABET, k=length))
+
+    def next_timestamp(self) -> int:
+        self.timestamp -= self.rng.randint(1_000, 3_600_000)
+        return self.timestamp
+
+    def thumbnail_url(self) -> str:
+        return f"https://lh3.googleusercontent.com/pw/{self.key('A', 120)}"
+
+    def actor(self) -> list:
+        name = f"{self.rng.choice(('Alex', 'Sam', 'Kim', 'Noa', 'Ren', 'Jo'))} {self.rng.choice(string.ascii_uppercase)}."
+        gaia_id = str(self.rng.randint(10**20, 10**21))
+        return [self.key("", 22), gaia_id, *[None] * 9, [name, None, self.rng.choice(("female", "male", None))], [f"https://lh3.googleusercontent.com/a/{self.key('', 40)}"]]
+
+    def geo(self) -> list:
+        latitude, longitude = self.rng.randint(-900_000_000, 900_000_000), self.rng.randint(-1_800_000_000, 1_800_000_000)
+        return [None, [[latitude, longitude], None, None, None, [[None, [[self.rng.choice(PLACES)]]]]]]
+
+    def extras(self, library: bool = True) -> dict:
+        """Keyed optional fields at the end of an item"""
+        density = self.density
+        extras = {}
+        if library:
+            extras["163238866"] = [self.chance(density.favorite)]
+        if self.chance(density.video):
+            extras["76647426"] = [self.rng.randint(1_000, 600_000)]
+        elif self.chance(density.live_photo):
+            extras["146008172"] = [None, self.rng.randint(1_000, 3_000), None, f"https://video-downloads.googleusercontent.com/{self.key('', 60)}"]
+        if library and self.chance(density.description):
+            extras["396644657"] = [f"Description {self.rng.randint(0, 10**6)}"]
+        if library and self.chance(density.geo):
+            extras["129168200"] = self.geo()
+        return extras
+
+    def library_item(self) -> list:
+        timestamp = self.next_timestamp()
+        width, height = self.rng.choice(RESOLUTIONS)
+        shared = self.chance(self.density.shared)
+        return [
+            self.key(),
+            [self.thumbnail_url(), width, height],
+            timestamp,
+            self.key("", 27),
+            self.rng.choice((0, 3_600_000, 7_200_000, -18_000_000)),
+            timestamp + self.rng.randint(0, 86_400_000),
+            None,
+            [[27], [2]] if shared else [[1], [2]],
+            None,
+            None,
+            None,
+            None,
+            [20 if self.chance(self.density.partial_upload) else 1],
+            self.chance(self.density.archived),
+            None,
+            self.extras(),
+        ]
+
+    def media_item(self) -> list:
+        """Item layout of trash, album and partner shared pages"""
+        timestamp = self.next_timestamp()
+        width, height = self.rng.choice(RESOLUTIONS)
+        return [self.key(), [self.thumbnail_url(), width, height], timestamp, self.key("", 27), 0, timestamp, self.extras(library=False)]
+
+    def remote_match(self, file_hash: Optional[str] = None) -> list:
+        timestamp = self.next_timestamp()
+        width, height = self.rng.choice(RESOLUTIONS)
+        thumb = [self.thumbnail_url(), width, height, None, None, None, None, None, self.rng.choice(CAMERAS)]
+        return [file_hash or self.key("", 27), [self.key(), thumb, timestamp, self.key("", 27), 0, timestamp, self.extras(library=False)]]
+
+    def item_info_batch(self, media_key: Optional[str] = None) -> list:
+        timestamp = self.next_timestamp()
+        size = self.rng.randint(10**5, 10**8)
+        description = f"Description {self.rng.randint(0, 10**6)}" if self.chance(self.density.description) else ""
+        quota = [None, size if self.chance(0.5) else 0, self.rng.choice((1, 2))]
+        return [media_key or self.key(), [None, None, description, f"IMG_{self.rng.randint(0, 99999):05d}.jpg", None, None, timestamp, 0, timestamp, size, quota]]
+
+    def album(self) -> list:
+        created = self.next_timestamp()
+        info = [
+            None,
+            f"Album {self.rng.randint(0, 10**5)}",
+            [None, None, None, None, created, created - self.rng.randint(0, 10**10), created, None, None, created + self.rng.randint(0, 10**9)],
+            self.rng.randint(1, 5_000),
+            self.chance(self.density.shared),
+        ]
+        return [self.key(), [self.thumbnail_url()], None, None, None, None, [self.rng.choice(self._actors)[0]], {"72930366": info}]
+
+    def shared_link(self) -> list:
+        members = self.rng.sample(self._actors, self.rng.randint(1, 4))
+        return [None, None, [self.thumbnail_url()], self.rng.randint(1, 500), self.next_timestamp(), None, self.key(), self.key("", 32), None, members, [members[0]], *[None] * 6, self.key("", 20)]
+
+    def item_info(self) -> list:
+        item = self.library_item()
+        item[15]["318563170"] = [[None, self.rng.randint(10**5, 10**8), self.rng.choice((1, 2))]]
+        if self.chance(0.05):
+            item[15]["225032867"] = [self.next_timestamp()]
+        description = f"Description {self.rng.randint(0, 10**6)}" if self.chance(self.density.description) else None
+        download_url = f"https://video-downloads.googleusercontent.com/{self.key('', 60)}"
+        return [item, download_url, None, None, None, None, None, download_url + "=d", None, None, description, None, item[1][0]]
+
+    def item_info_ext(self) -> list:
+        item = self.library_item()
+        fields = [None] * 32
+        fields[0:8] = [item[0], f"Description {self.rng.randint(0, 10**6)}", f"IMG_{self.rng.randint(0, 99999):05d}.jpg", item[2], item[4], self.rng.randint(10**5, 10**8), *item[1][1:3]]
+        if self.chance(self.density.geo):
+            point = [self.rng.randint(-900_000_000, 900_000_000), self.rng.randint(-1_800_000_000, 1_800_000_000)]
+            fields[9] = [point]
+            fields[13] = [point, None, [[None, [[self.rng.choice(PLACES)]]]]]
+        fields[11] = item[3]
+        fields[12] = item[7]
+        fields[19] = [self.album() for _ in range(self.rng.randint(0, 3))]
+        fields[23] = self.rng.choice(CAMERAS)
+        owner = self.rng.choice(self._actors)
+        fields[27] = [self.rng.choice((1, 2, 3)), [None, None, self.rng.choice((1, 3))], None, [owner], None]
+        fields[28] = owner
+        fields[30] = [None, self.rng.randint(0, 10**8), self.rng.choice((1, 2))]
+        return [fields, [f"https://maps.googleapis.com/maps/api/staticmap?{self.key('', 30)}"]]
+
+    def page_id(self) -> str:
+        return self.key("", 40)
+
+    def data(self, rpcid: str, count: int = 500, next_page_id: Optional[str] = None, keys: Optional[list[str]] = None) -> list:
+        """Decoded response data of rpcid. count items for list responses, next_page_id for paged ones.
+        keys are the requested media keys or hashes of swbisb, EWgK9e and SusGud, instead of count random ones"""
+        if keys is not None:
+            count = len(keys)
+        keys = keys or [None] * count
+        match rpcid:
+            case "lcxiM":
+                items = [self.library_item() for _ in range(count)]
+                return [items, next_page_id, str(items[-1][2]) if items else None]
+            case "EzkLib":
+                return [[self.library_item() for _ in range(count)], next_page_id]
+            case "swbisb":
+                return [[self.remote_match(file_hash) for file_hash in keys]]
+            case "VrseUb":
+                return self.item_info()
+            case "fDcn4b":
+                return self.item_info_ext()
+            case "zy0IHe":
+                return [[self.media_item() for _ in range(count)], next_page_id]
+            case "EWgK9e":
+                return [[None, [self.item_info_batch(media_key) for media_key in keys]]]
+            case "Z5xsfc":
+                return [[self.album() for _ in range(count)], next_page_id]
+            case "snAcKc":
+                album = self.album()
+                info = album[7]["72930366"]
+                members = self.rng.sample(self._actors, 3)
+                details = [album[0], info[1], info[2], None, album[1], members[0], None, None, None, members, *[None] * 9, self.key("", 32), None, info[3]]
+                return [None, [self.media_item() for _ in range(count)], next_page_id, details]
+            case "F2A0H":
+                return [[self.shared_link() for _ in range(count)], next_page_id]
+            case "EzwWhf":
+                total = self.rng.choice((15, 100, 200, 2048)) * 2**30
+                used = self.rng.randint(0, total)
+                return [None, None, None, None, None, None, [used, total, None, self.rng.randint(0, used)]]
+            case "dnv2s":
+                size = self.rng.randint(10**6, 10**10)
+                return [[[[None, None, [[f"Photos-{self.rng.randint(1, 999):03d}.zip", f"https://video-downloads.googleusercontent.com/{self.key('', 80)}", size, size]]]]]]
+            case "e9T5je":
+                partner, account = self.rng.sample(self._actors, 2)
+                return [next_page_id, [self.media_item() for _ in range(count)], [partner, account], None, partner[0], account[1]]
+            case "SusGud":
+                return [[[drive_key or self.key("", 33), [self.key(), None, None, self.key("", 27)]] for drive_key in keys]]
+        raise ValueError(f"No synthetic data for {rpcid}")
+
+    def pages(self, rpcid: str, total: int, page_size: int = 500) -> Iterator[tuple[Optional[str], list]]:
+        """(page_id, data) of a pagination chain of total items, each page names the next one, the last one none"""
+        page_id = None
+        for start in range(0, max(total, 1), page_size):
+            next_page_id = self.page_id() if start + page_size < total else None
+            yield page_id, self.data(rpcid, min(page_size, total - start), next_page_id)
+            page_id = next_page_id
+
+
+def dumps(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"))
+
+
+def envelope(rpcid: str, data: Any, payload_id: Optional[str], error_code: Optional[int] = None) -> list:
+    """wrb.fr envelope, without data and with an error code if error_code"""
+    if error_code is not None:
+        return ["wrb.fr", rpcid, None, None, None, [error_code], payload_id]
+    return ["wrb.fr", rpcid, dumps(data), None, None, None, payload_id]
+
+
+def error_frame(code: int = 3) -> list:
+    """`er` frame failing the whole batch"""
+    return [["er", None, None, None, None, code, None]]
+
+
+def wire_body(frames: Iterable[list]) -> str:
+    """rt=c batchexecute body of frames (lists of envelopes), after the anti-XSSI prefix.
+    Length lines count UTF-16 code units, like the live api."""
+    body = [")]}'\n"]
+    for frame in frames:
+        text = dumps(frame)
+        body.append(f"\n{len(text.encode('utf-16-le')) // 2}\n{text}")
+    body.append("\n")
+    return "".join(body)
+
+
+def wire_response(responses: Iterable[tuple[str, Any, Optional[str]]], frame_size: int = 1) -> str:
+    """rt=c body answering (rpcid, data, payload_id) triples, frame_size envelopes per frame"""
+    envelopes = [envelope(rpcid, data, payload_id) for rpcid, data, payload_id in responses]
+    frames = [envelopes[i : i + frame_size] for i in range(0, len(envelopes), frame_size)]
+    frames.append([["di", 42], ["af.httprm", 41, "-1234567890", 1]])
+    return wire_body(frames)
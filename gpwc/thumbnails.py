@@ -0,0 +1,183 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Optional
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+def thumbnail_variant_url(url: str, width: int, height: Optional[int] = None, crop: bool = False) -> str:
+    """Size variant of a googleusercontent thumbnail url, size options already in the url are replaced"""
+    head, sep, last_segment = url.rpartition("/")
+    last_segment = last_segment.split("=", 1)[0]
+    options = f"w{width}-h{height if height is not None else width}" + ("-c" if crop else "")
+    return f"{head}{sep}{last_segment}={options}"
+
+
+class ThumbnailCache:
+    """Content addressed on-disk cache of thumbnails, bounded to max_bytes with LRU eviction.
+
+    Files are named after the sha256 of their content, so variants or urls resolving to the same image
+    share one file. An SQLite index maps every variant url to its file and last access time. Hits are
+    served from disk without any request, concurrent misses of the same variant share one download.
+    Downloads evict other files, `open` and `read` hold the file open so eviction cannot pull it away.
+    """
+
+    OPEN_ATTEMPTS = 3
+
+    def __init__(self, client: "Client", cache_dir: str | Path, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.client = client
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(self.cache_dir / "index.sqlite3", check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS entries (url TEXT PRIMARY KEY, digest TEXT, last_access REAL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_entries_digest ON entries (digest)")
+        self._db_lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the index"""
+        self.db.close()
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def cached(self, url: str) -> Optional[Path]:
+        """File of a cached variant url, marked as used, None on a miss.
+        The file can be evicted by a concurrent download once this returns, `open_cached` cannot."""
+        with self._db_lock:
+            row = self.db.execute("SELECT digest FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            path = self.object_path(row[0])
+            if not path.exists():
+                with self.db:
+                    self.db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                return None
+            with self.db:
+                self.db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+        return path
+
+    def open_cached(self, url: str) -> Optional[BinaryIO]:
+        """Open file of a cached variant url, marked as used, None on a miss.
+        Opened under the index lock eviction holds to unlink files, it stays readable once evicted."""
+        with self._db_lock:
+            row = self.db.execute("SELECT digest FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            try:
+                f = open(self.object_path(row[0]), "rb")
+            except FileNotFoundError:
+                with self.db:
+                    self.db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                return None
+            with self.db:
+                self.db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+        return f
+
+    def fetch(self, url: str, width: int, height: Optional[int] = None, crop: bool = False) -> Path:
+        """Path of the cached file of a thumbnail size variant, downloaded on a miss.
+        Concurrent downloads can evict it, use `open` or `read` to get the content safely."""
+        variant_url = thumbnail_variant_url(url, width, height, crop)
+        path = self.cached(variant_url)
+        if path is not None:
+            return path
+        return self._download_once(variant_url)
+
+    def open(self, url: str, width: int, height: Optional[int] = None, crop: bool = False) -> BinaryIO:
+        """Open file of a thumbnail size variant, downloaded on a miss"""
+        variant_url = thumbnail_variant_url(url, width, height, crop)
+        for _ in range(self.OPEN_ATTEMPTS):
+            f = self.open_cached(variant_url)
+            if f is not None:
+                return f
+            # evicted by concurrent downloads before it was opened when this comes around again
+            self._download_once(variant_url)
+        raise FileNotFoundError(f"{variant_url} evicted from the cache before it could be opened, max_bytes is too small")
+
+    def read(self, url: str, width: int, height: Optional[int] = None, crop: bool = False) -> bytes:
+        """Content of a thumbnail size variant"""
+        with self.open(url, width, height, crop) as f:
+            return f.read()
+
+    def _download_once(self, variant_url: str) -> Path:
+        """Download a variant url, concurrent callers for the same url wait for the first one"""
+        with self._inflight_lock:
+            future = self._inflight.get(variant_url)
+            leader = future is None
+            if leader:
+                future = self._inflight[variant_url] = Future()
+        if not leader:
+            return future.result()
+        try:
+            path = self._download(variant_url)
+            future.set_result(path)
+            return path
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[variant_url]
+
+    def _download(self, variant_url: str) -> Path:
+        """Stream a thumbnail into the object store and index it"""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                with self.client.session.get(variant_url, stream=True) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(64 * 1024):
+                        digest.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+            path = self.object_path(digest.hexdigest())
+            path.parent.mkdir(exist_ok=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        with self._db_lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO blobs (digest, size) VALUES (?, ?)", (digest.hexdigest(), size))
+            self.db.execute("INSERT OR REPLACE INTO entries (url, digest, last_access) VALUES (?, ?, ?)", (variant_url, digest.hexdigest(), time.time()))
+            self._evict(keep=digest.hexdigest())
+        return path
+
+    def total_bytes(self) -> int:
+        """Size of the stored files"""
+        with self._db_lock:
+            return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _evict(self, keep: str) -> None:
+        """Drop least recently used entries, and files nothing points to, until the cache fits max_bytes"""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        while total > self.max_bytes:
+            rows = self.db.execute("SELECT url, digest FROM entries WHERE digest != ? ORDER BY last_access LIMIT 64", (keep,)).fetchall()
+            if not rows:
+                break
+            for url, digest in rows:
+                self.db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                if self.db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                    continue
+                size = self.db.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                self.db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                self.object_path(digest).unlink(missing_ok=True)
+                total -= size[0] if size else 0
+                if total <= self.max_bytes:
+                    break
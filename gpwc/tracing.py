@@ -0,0 +1,157 @@
+import contextvars
+import itertools
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional, Protocol
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("gpwc_current_span", default=None)
+_span_ids = itertools.count(1)
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    span_id: int
+    trace_id: int
+    parent: Optional["Span"] = None
+    path: tuple[str, ...] = ()
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_time: float = 0.0
+    duration: float = 0.0
+    children_duration: float = 0.0
+    error: Optional[str] = None
+    _started: float = 0.0
+    _tracer: Optional["Tracer"] = None
+    _token: Any = None
+
+    @property
+    def parent_id(self) -> Optional[int]:
+        return self.parent.span_id if self.parent is not None else None
+
+    @property
+    def self_duration(self) -> float:
+        """Time not spent in child spans"""
+        return max(self.duration - self.children_duration, 0.0)
+
+    def set(self, **attributes: Any) -> None:
+        """Add attributes known only once the span started"""
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.duration = time.perf_counter() - self._started
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc_val}"
+        if self.parent is not None:
+            self.parent.children_duration += self.duration
+        self._tracer.export(self)
+
+
+class _NoopSpan:
+    """Stand-in used while tracing is off"""
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+
+class Tracer:
+    """Creates spans nested after the span active in the current context (thread or asyncio task)
+    and hands every finished span to the exporters."""
+
+    def __init__(self, exporters: Iterable[SpanExporter] = ()) -> None:
+        self.exporters = list(exporters)
+
+    def span(self, name: str, **attributes: Any) -> Span:
+        """Context manager timing a block as a child of the current span"""
+        parent = _current_span.get()
+        span_id = next(_span_ids)
+        if parent is None:
+            return Span(name, span_id, span_id, None, (name,), attributes, _tracer=self)
+        return Span(name, span_id, parent.trace_id, parent, (*parent.path, name), attributes, _tracer=self)
+
+    def export(self, span: Span) -> None:
+        for exporter in self.exporters:
+            exporter.export(span)
+
+
+class JsonLinesExporter:
+    """Append finished spans to a file, one json object per line"""
+
+    def __init__(self, path: str | Path) -> None:
+        self.file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        record = {
+            "name": span.name,
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "start_time": span.start_time,
+            "duration": span.duration,
+            "attributes": span.attributes,
+        }
+        if span.error is not None:
+            record["error"] = span.error
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self.file.close()
+
+
+class FlameGraphAggregator:
+    """Self time of finished spans summed per stack, in the folded format read by flamegraph.pl and speedscope"""
+
+    def __init__(self) -> None:
+        self.stacks: dict[tuple[str, ...], float] = {}
+        self.totals: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.stacks[span.path] = self.stacks.get(span.path, 0.0) + span.self_duration
+            total = self.totals.setdefault(span.name, [0, 0.0, 0.0])
+            total[0] += 1
+            total[1] += span.duration
+            total[2] += span.self_duration
+
+    def folded(self) -> str:
+        """`root;child;leaf microseconds` lines"""
+        with self._lock:
+            stacks = sorted(self.stacks.items())
+        return "".join(f"{';'.join(path)} {round(seconds * 1_000_000)}\n" for path, seconds in stacks)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """span name -> count, total and self seconds"""
+        with self._lock:
+            return {name: {"count": count, "total": total, "self": self_total} for name, (count, total, self_total) in self.totals.items()}
+
+    def write(self, path: str | Path) -> None:
+        Path(path).write_text(self.folded(), encoding="utf-8")
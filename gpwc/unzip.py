@@ -0,0 +1,268 @@
+import os
+import struct
+import zlib
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Callable, Iterable, Optional
+
+from .exceptions import ArchiveError
+
+LOCAL_HEADER = b"PK\x03\x04"
+DATA_DESCRIPTOR = b"PK\x07\x08"
+CENTRAL_DIRECTORY = b"PK\x01\x02"
+END_OF_ENTRIES = (CENTRAL_DIRECTORY, b"PK\x05\x06", b"PK\x06\x06")
+LOCAL_HEADER_STRUCT = struct.Struct("<4sHHHHHIIIHH")
+ZIP64_EXTRA_ID = 0x0001
+STORED, DEFLATED = 0, 8
+FLAG_ENCRYPTED, FLAG_DATA_DESCRIPTOR, FLAG_UTF8 = 0x1, 0x8, 0x800
+
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+
+def safe_entry_path(dest_dir: Path, name: str) -> Path:
+    """Destination of an entry, names escaping dest_dir are rejected"""
+    parts = [part for part in PurePosixPath(name.replace("\\", "/")).parts if part not in ("", ".")]
+    if not parts or parts[0] == "/" or ".." in parts or ":" in parts[0]:
+        raise ArchiveError(f"Unsafe entry name {name!r}")
+    return dest_dir.joinpath(*parts)
+
+
+class StreamingUnzipper:
+    """Extract a zip archive while it is being received, without seeking or keeping it whole.
+
+    Bytes are pushed with `write`, so it can stand in for the file a download is streamed to. Entries
+    are read from their local headers, stored and deflated ones are supported, with data descriptors
+    and zip64 sizes. Each entry is written to a `.part` file renamed once its CRC is verified. Memory
+    stays bounded by the size of the pushed chunks. progress is called with the unzipped bytes written
+    so far and total_size.
+    """
+
+    def __init__(
+        self,
+        dest_dir: str | Path,
+        total_size: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+        max_output: int = 1024 * 1024,
+    ) -> None:
+        self.dest_dir = Path(dest_dir)
+        self.total_size = total_size
+        self.progress = progress
+        self.max_output = max_output
+        self.extracted: list[Path] = []
+        self.unzipped_bytes = 0
+        self._buffer = bytearray()
+        self._state = self._read_header
+        self._entry: Optional[dict] = None
+        self._file: Optional[BinaryIO] = None
+        self._done = False
+
+    def write(self, data: bytes) -> int:
+        """Push the next bytes of the archive"""
+        if self._done:
+            return len(data)
+        self._buffer += data
+        while self._state():
+            pass
+        return len(data)
+
+    def close(self) -> None:
+        """End of archive, fails if it stopped in the middle of an entry"""
+        if self._file is not None:
+            self._file.close()
+            os.unlink(self._entry["part_path"])
+            self._file = None
+        if not self._done and (self._entry is not None or self._buffer):
+            raise ArchiveError("Archive ended in the middle of an entry")
+
+    def __enter__(self):
+        """Enter"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Close, without masking an error already raised"""
+        if exc_type is None:
+            self.close()
+        elif self._file is not None:
+            self._file.close()
+            os.unlink(self._entry["part_path"])
+            self._file = None
+
+    def _read_header(self) -> bool:
+        if len(self._buffer) < 4:
+            return False
+        signature = bytes(self._buffer[:4])
+        if signature in END_OF_ENTRIES:
+            self._done = True
+            self._buffer.clear()
+            return False
+        if signature != LOCAL_HEADER:
+            raise ArchiveError(f"Unexpected signature {signature!r}")
+        if len(self._buffer) < LOCAL_HEADER_STRUCT.size:
+            return False
+        _, _, flags, method, _, _, crc, compressed_size, size, name_length, extra_length = LOCAL_HEADER_STRUCT.unpack_from(self._buffer)
+        header_size = LOCAL_HEADER_STRUCT.size + name_length + extra_length
+        if len(self._buffer) < header_size:
+            return False
+        raw_name = bytes(self._buffer[LOCAL_HEADER_STRUCT.size : LOCAL_HEADER_STRUCT.size + name_length])
+        extra = bytes(self._buffer[LOCAL_HEADER_STRUCT.size + name_length : header_size])
+        del self._buffer[:header_size]
+
+        if flags & FLAG_ENCRYPTED:
+            raise ArchiveError("Encrypted entries are not supported")
+        if method not in (STORED, DEFLATED):
+            raise ArchiveError(f"Compression method {method} is not supported")
+        zip64 = False
+        offset = 0
+        while offset + 4 <= len(extra):
+            extra_id, extra_size = struct.unpack_from("<HH", extra, offset)
+            if extra_id == ZIP64_EXTRA_ID:
+                zip64 = True
+                values = iter(struct.unpack_from(f"<{extra_size // 8}Q", extra, offset + 4))
+                if size == 0xFFFFFFFF:
+                    size = next(values, size)
+                if compressed_size == 0xFFFFFFFF:
+                    compressed_size = next(values, compressed_size)
+            offset += 4 + extra_size
+
+        name = raw_name.decode("utf-8" if flags & FLAG_UTF8 else "cp437")
+        path = safe_entry_path(self.dest_dir, name)
+        descriptor = bool(flags & FLAG_DATA_DESCRIPTOR)
+        self._entry = {
+            "name": name,
+            "path": path,
+            "part_path": path.with_name(path.name + ".part"),
+            "method": method,
+            "crc": None if descriptor else crc,
+            "compressed_size": None if descriptor else compressed_size,
+            "descriptor": descriptor,
+            "zip64": zip64,
+            "consumed": 0,
+            "running_crc": 0,
+            "decompressor": zlib.decompressobj(-15) if method == DEFLATED else None,
+        }
+        if name.endswith("/"):
+            path.mkdir(parents=True, exist_ok=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self._entry["part_path"], "wb")
+        self._state = self._read_data
+        return True
+
+    def _emit(self, data: bytes) -> None:
+        if not data:
+            return
+        entry = self._entry
+        entry["running_crc"] = zlib.crc32(data, entry["running_crc"])
+        if self._file is not None:
+            self._file.write(data)
+        self.unzipped_bytes += len(data)
+        if self.progress is not None:
+            self.progress(self.unzipped_bytes, self.total_size)
+
+    def _read_data(self) -> bool:
+        entry = self._entry
+        if entry["method"] == DEFLATED:
+            return self._read_deflated()
+        if entry["compressed_size"] is not None:
+            take = min(entry["compressed_size"] - entry["consumed"], len(self._buffer))
+            self._emit(bytes(self._buffer[:take]))
+            del self._buffer[:take]
+            entry["consumed"] += take
+            if entry["consumed"] < entry["compressed_size"]:
+                return False
+            return self._end_data()
+        return self._read_stored_until_descriptor()
+
+    def _read_deflated(self) -> bool:
+        entry = self._entry
+        decompressor = entry["decompressor"]
+        data = bytes(self._buffer)
+        if entry["compressed_size"] is not None:
+            data = data[: entry["compressed_size"] - entry["consumed"]]
+        self._buffer = self._buffer[len(data) :]
+        entry["consumed"] += len(data)
+        self._emit(decompressor.decompress(data, self.max_output))
+        # past the end of the stream the bytes after it stay in unconsumed_tail, and are in unused_data too
+        while decompressor.unconsumed_tail and not decompressor.eof:
+            self._emit(decompressor.decompress(decompressor.unconsumed_tail, self.max_output))
+        if not decompressor.eof:
+            if entry["compressed_size"] is not None and entry["consumed"] >= entry["compressed_size"]:
+                raise ArchiveError(f"{entry['name']}: deflate stream is truncated")
+            return False
+        unused = decompressor.unused_data
+        entry["consumed"] -= len(unused)
+        self._buffer[:0] = unused
+        return self._end_data()
+
+    def _read_stored_until_descriptor(self) -> bool:
+        """Stored data of unknown size ends at a descriptor matching its crc and size"""
+        entry = self._entry
+        size_length = 8 if entry["zip64"] else 4
+        descriptor_length = 8 + 2 * size_length
+        search_from = 0
+        while True:
+            index = self._buffer.find(DATA_DESCRIPTOR, search_from)
+            if index == -1:
+                break
+            if len(self._buffer) < index + descriptor_length:
+                # wait for the whole candidate descriptor before deciding
+                self._emit(bytes(self._buffer[:index]))
+                del self._buffer[:index]
+                entry["consumed"] += index
+                return False
+            crc, compressed_size = struct.unpack_from(f"<I{'Q' if entry['zip64'] else 'I'}", self._buffer, index + 4)
+            if compressed_size == entry["consumed"] + index and zlib.crc32(self._buffer[:index], entry["running_crc"]) == crc:
+                self._emit(bytes(self._buffer[:index]))
+                del self._buffer[:index]
+                entry["consumed"] += index
+                entry["descriptor"] = True
+                return self._end_data()
+            search_from = index + 1
+        keep = 3  # a signature may be split across writes
+        take = max(0, len(self._buffer) - keep)
+        self._emit(bytes(self._buffer[:take]))
+        del self._buffer[:take]
+        entry["consumed"] += take
+        return False
+
+    def _end_data(self) -> bool:
+        self._state = self._finish_entry
+        return True
+
+    def _finish_entry(self) -> bool:
+        entry = self._entry
+        if entry["descriptor"]:
+            size_length = 8 if entry["zip64"] else 4
+            if len(self._buffer) < 4:
+                return False
+            # the descriptor signature is optional
+            signature_length = 4 if self._buffer[:4] == DATA_DESCRIPTOR else 0
+            if len(self._buffer) < signature_length + 4 + 2 * size_length:
+                return False
+            crc = struct.unpack_from("<I", self._buffer, signature_length)[0]
+            del self._buffer[: signature_length + 4 + 2 * size_length]
+            entry["crc"] = crc
+            entry["descriptor"] = False
+        if entry["running_crc"] != entry["crc"]:
+            raise ArchiveError(f"{entry['name']}: CRC mismatch")
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.replace(entry["part_path"], entry["path"])
+        if not entry["name"].endswith("/"):
+            self.extracted.append(entry["path"])
+        self._entry = None
+        self._state = self._read_header
+        return True
+
+
+def unzip_stream(
+    chunks: Iterable[bytes],
+    dest_dir: str | Path,
+    total_size: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> list[Path]:
+    """Extract a zip archive from an iterable of byte chunks, returns the extracted files"""
+    with StreamingUnzipper(dest_dir, total_size, progress) as unzipper:
+        for chunk in chunks:
+            unzipper.write(chunk)
+    return unzipper.extracted
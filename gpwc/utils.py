@@ -1,7 +1,11 @@
+import asyncio
+import email.utils
 import logging
-from typing import Any
+import time
+from typing import Any, Optional
 import uuid
 
+import httpx
 import requests
 from requests.adapters import HTTPAdapter, Retry
 
@@ -27,6 +31,22 @@ def safe_get(data: dict | list, *keys: Any, default: Any = None) -> Any:
     return current
 
 
+def scan_global_data_script(page_body: str) -> Optional[str]:
+    """Text of the `_gd` script found with plain string search, without building a DOM.
+    None if the page does not have it in the expected shape."""
+    marker = page_body.find('data-id="_gd"')
+    if marker == -1:
+        return None
+    tag_start = page_body.rfind("<", 0, marker)
+    if not page_body.startswith("<script", tag_start):
+        return None
+    start = page_body.find(">", marker) + 1
+    end = page_body.find("</script>", start)
+    if start == 0 or end == -1:
+        return None
+    return page_body[start:end]
+
+
 def generate_id() -> str:
     return uuid.uuid4().hex
 
@@ -55,13 +75,58 @@ def new_session_with_retries() -> requests.Session:
     }
     s = requests.Session()
     s.headers.update(headers)
-    retries = Retry(total=5, backoff_factor=1, status_forcelist=[502, 503, 504])
+    retries = Retry(total=5, backoff_factor=1, status_forcelist=[429, 502, 503, 504])
     adapter = HTTPAdapter(max_retries=retries)
     s.mount("http://", adapter)
     s.mount("https://", adapter)
     return s
 
 
+def new_async_session_with_retries(max_connections: int = 100) -> httpx.AsyncClient:
+    """Create a new async http session, connection errors are retried by the transport"""
+    headers = {
+        "content-type": "application/x-www-form-urlencoded;charset=UTF-8",
+    }
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    transport = httpx.AsyncHTTPTransport(retries=5, limits=limits)
+    return httpx.AsyncClient(headers=headers, transport=transport, follow_redirects=True, timeout=None)
+
+
+async def async_get_with_retries(
+    session: httpx.AsyncClient,
+    url: str,
+    total: int = 5,
+    backoff_factor: float = 1,
+    status_forcelist: tuple[int, ...] = (429, 502, 503, 504),
+) -> httpx.Response:
+    """GET with the same status retry policy as `new_session_with_retries`, Retry-After included"""
+    for attempt in range(total + 1):
+        response = await session.get(url)
+        if response.status_code not in status_forcelist or attempt == total:
+            return response
+        delay = backoff_factor * 2**attempt if attempt else 0
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if delay:
+            await asyncio.sleep(delay)
+    return response
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given as seconds or as an http date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
 def create_logger(log_level: str) -> logging.Logger:
     """Create main logger"""
     logging.basicConfig(
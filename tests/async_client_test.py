@@ -0,0 +1,77 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from gpwc import payloads
+from gpwc.async_client import AsyncClient
+from gpwc.exceptions import RpcError
+from gpwc.fake_server import FakeServer
+
+
+class TestAsyncClient(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cookies_path = Path(self.tmp_dir.name) / "cookies.txt"
+        self.cookies_path.write_text("# Netscape HTTP Cookie File\n")
+        self.payloads = [payloads.GetItemInfo(f"AF1Qip{i:038d}") for i in range(10)]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_client(self, server: FakeServer, main):
+        async def run():
+            client = AsyncClient(self.cookies_path, log_level="ERROR", base_url=server.url)
+            try:
+                return await main(client)
+            finally:
+                await client.aclose()
+
+        return asyncio.run(run())
+
+    def test_concurrent_requests_bootstrap_once(self):
+        async def main(client: AsyncClient):
+            get_global_data = client.get_global_data
+            calls = []
+
+            async def counting_get_global_data():
+                calls.append(1)
+                return await get_global_data()
+
+            client.get_global_data = counting_get_global_data
+            results = await asyncio.gather(*(client.send_api_request([payload]) for payload in self.payloads))
+            return results, calls, client.global_data
+
+        with FakeServer(latency=0.01) as server:
+            results, calls, global_data = self.run_client(server, main)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(global_data, server.global_data)
+        self.assertEqual([response.response_id for (response,) in results], [payload.payload_id for payload in self.payloads])
+        self.assertTrue(all(response.success for (response,) in results))
+
+    def test_stream_api_request_answers_every_payload(self):
+        async def main(client: AsyncClient):
+            return [response async for response in client.stream_api_request(self.payloads)]
+
+        with FakeServer(rpc_error_rate=0.5, frame_size=3, seed=2) as server:
+            responses = self.run_client(server, main)
+        self.assertEqual(sorted(response.response_id for response in responses), sorted(payload.payload_id for payload in self.payloads))
+        failed = [response for response in responses if not response.success]
+        self.assertEqual(len(failed), server.stats["rpc_errors"])
+        self.assertTrue(failed)
+        self.assertTrue(all(isinstance(response.error, RpcError) and response.error.code == 8 for response in failed))
+
+    def test_submitted_futures_resolve(self):
+        async def main(client: AsyncClient):
+            await client.bootstrap()
+            futures = client.submit_api_request(self.payloads)
+            return [await future for future in asyncio.as_completed(futures)]
+
+        with FakeServer(frame_size=1) as server:
+            responses = self.run_client(server, main)
+        self.assertEqual(sorted(response.response_id for response in responses), sorted(payload.payload_id for payload in self.payloads))
+        self.assertEqual(server.stats["requests"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+
+from gpwc import payloads
+from gpwc.bulk import BulkMutator
+from gpwc.client import BaseClient
+from gpwc.exceptions import BatchError, RpcError
+from gpwc.synthetic import envelope, error_frame
+
+
+class FlakyClient(BaseClient):
+    """Fails the chunks holding a key of `failures` as many times as given there, the first by raising,
+    the others with an error envelope. Successful chunks are answered without data, like mutations."""
+
+    def __init__(self, failures: dict[str, int]) -> None:
+        super().__init__("cookies.txt", log_level="ERROR")
+        self.failures = dict(failures)
+        self.sent: list[list[str]] = []
+
+    def send_api_request(self, payload):
+        keys = [key for _, key in payload.data[0]]
+        self.sent.append(keys)
+        failing = [key for key in keys if self.failures.get(key)]
+        if not failing:
+            return self.answer(payload, ["wrb.fr", payload.rpcid, None, None, None, None, payload.payload_id])
+        for key in failing:
+            self.failures[key] -= 1
+        if len(self.sent) == 1:
+            raise ConnectionError("connection dropped")
+        return self.answer(payload, envelope(payload.rpcid, None, payload.payload_id, error_code=13))
+
+    def answer(self, payload, frame: list):
+        (response,) = self.parse_frames([[frame]], [payload])
+        return response
+
+
+class AsyncFlakyClient(FlakyClient):
+    is_async = True
+
+    async def send_api_request(self, payload):
+        await asyncio.sleep(0)
+        return FlakyClient.send_api_request(self, payload)
+
+
+class TestBulkMutator(unittest.TestCase):
+    keys = [f"dedup_{i}" for i in range(10)]
+
+    def mutator(self, client: FlakyClient) -> BulkMutator:
+        return BulkMutator(client, chunk_size=4, max_concurrency=1, max_attempts=3, backoff_factor=0)
+
+    def test_only_failed_chunks_are_sent_again(self):
+        client = FlakyClient({"dedup_0": 1, "dedup_5": 2})
+        report = self.mutator(client).set_favorite(self.keys + self.keys[:3])
+        self.assertEqual(report.succeeded, self.keys)
+        self.assertEqual(client.sent, [self.keys[:4], self.keys[4:8], self.keys[8:], self.keys[:4], self.keys[4:8], self.keys[4:8]])
+        self.assertEqual({key: outcome.attempts for key, outcome in report.outcomes.items()}, {**dict.fromkeys(self.keys[:4], 2), **dict.fromkeys(self.keys[4:8], 3), **dict.fromkeys(self.keys[8:], 1)})
+        self.assertTrue(all(outcome.error is None for outcome in report.outcomes.values()))
+
+    def test_keys_failing_every_attempt_are_reported(self):
+        client = FlakyClient({"dedup_0": 1, "dedup_9": 3})
+        report = self.mutator(client).unfavorite(self.keys)
+        self.assertEqual(report.failed, self.keys[8:])
+        self.assertEqual(len(client.sent), 3 + 1 + 2)
+        for key in report.failed:
+            self.assertEqual(report.outcomes[key].attempts, 3)
+            self.assertIsInstance(report.outcomes[key].error, RpcError)
+        self.assertEqual(report.succeeded, self.keys[:8])
+
+    def test_async_retries(self):
+        client = AsyncFlakyClient({"dedup_0": 1, "dedup_9": 3})
+        report = asyncio.run(self.mutator(client).set_favorite(self.keys))
+        self.assertEqual(report.failed, self.keys[8:])
+        self.assertEqual(report.outcomes["dedup_0"].attempts, 2)
+        self.assertTrue(report.outcomes["dedup_0"].success)
+        self.assertIsInstance(report.outcomes["dedup_9"].error, RpcError)
+
+    def test_er_frames_fail_the_chunk(self):
+        client = FlakyClient({})
+        client.send_api_request = lambda payload: client.answer(payload, error_frame()[0])
+        report = self.mutator(client).set_favorite(self.keys[:4])
+        self.assertEqual(report.failed, self.keys[:4])
+        self.assertIsInstance(report.outcomes["dedup_0"].error, BatchError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,11 @@
+import asyncio
 import unittest
 
-from gpwc import Client, payloads
+from gpwc import AsyncClient, BatchDispatcher, Client, payloads
+from gpwc.bulk import BulkMutator
+from gpwc.mirror import LibraryMirror
 from gpwc.models import DriveMedia
+from gpwc.pagination import iter_items
 
 
 class TestClient(unittest.TestCase):
@@ -331,6 +335,75 @@ class TestClient(unittest.TestCase):
             print(r.data)
         print(response)
 
+    def test_AsyncClient(self):
+        """Async client test."""
+
+        async def run():
+            async with AsyncClient(self.cookies_txt) as client:
+                quota, page = await asyncio.gather(
+                    payloads.GetStorageQuota().execute(client),
+                    client.send_api_request(payloads.GetLibraryPageByTakenDate()),
+                )
+            await client.aclose()
+            return quota, page
+
+        quota, page = asyncio.run(run())
+        print(quota.data)
+        print(page.data)
+
+    def test_BatchDispatcher(self):
+        """Dispatcher test."""
+        batch = [payloads.GetStorageQuota() for _ in range(10)]
+        with Client(self.cookies_txt) as client:
+            responses = BatchDispatcher(client, max_payloads=3, max_workers=2).send(batch)
+        self.assertEqual([r.response_id for r in responses], [p.payload_id for p in batch])
+        print(responses)
+
+    def test_iter_items(self):
+        """Pagination test."""
+        with Client(self.cookies_txt) as client:
+            for item in iter_items(client, payloads.GetAlbumsPage(page_size=10), prefetch=2):
+                print(item)
+
+    def test_LibraryMirror(self):
+        """Mirror test."""
+        with Client(self.cookies_txt) as client, LibraryMirror("library.db") as mirror:
+            print(mirror.sync(client))
+            print(mirror.sync(client))
+            print(mirror.sync_albums(client))
+
+    def test_lazy_page(self):
+        """Lazy parsing test."""
+        payload = payloads.GetLibraryPageByTakenDate(parse_response="lazy")
+        with Client(self.cookies_txt) as client:
+            response = client.send_api_request(payload)
+        for item in response.data.items:
+            self.assertEqual(item.media_key, item.to_model().media_key)
+
+    def test_submit_api_request(self):
+        """Per payload futures test."""
+        batch = [payloads.GetStorageQuota(), payloads.GetItemInfo("invalid_media_key")]
+        with Client(self.cookies_txt) as client:
+            futures = client.submit_api_request(batch)
+            responses = [future.result() for future in futures]
+        self.assertTrue(responses[0].success)
+        self.assertIsNotNone(responses[1].error)
+
+    def test_cookie_store(self):
+        """Unchanged cookies are not written back."""
+        with Client(self.cookies_txt) as client:
+            client.save_cookies_to_file()
+            self.assertFalse(client.cookie_store.is_dirty(client.session.cookies))
+            self.assertFalse(client.cookie_store.flush(client.session.cookies))
+
+    def test_BulkMutator(self):
+        """Bulk mutation test."""
+        dedup_keys = ["0J7Wh1iXHA4BalGgYaK9sDyxkW4", "0J7Wh1iXHA4BalGgYaK9sDyxkW4"]
+        with Client(self.cookies_txt) as client:
+            report = BulkMutator(client, chunk_size=1).set_favorite(dedup_keys)
+        self.assertEqual(list(report.outcomes), ["0J7Wh1iXHA4BalGgYaK9sDyxkW4"])
+        print(report)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+from http.cookiejar import Cookie, MozillaCookieJar
+from pathlib import Path
+
+from gpwc.cookies import CookieStore
+
+
+def make_cookie(name: str, value: str) -> Cookie:
+    return Cookie(0, name, value, None, False, ".google.com", True, True, "/", True, True, 2000000000, False, None, None, {})
+
+
+def values(jar) -> dict[str, str]:
+    return {cookie.name: cookie.value for cookie in jar}
+
+
+class TestCookieStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "cookies.txt"
+        jar = MozillaCookieJar(self.path)
+        jar.set_cookie(make_cookie("X", "1"))
+        jar.set_cookie(make_cookie("Y", "1"))
+        jar.save(ignore_discard=True, ignore_expires=True)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_file(self) -> dict[str, str]:
+        return values(CookieStore(self.path).load())
+
+    def test_merge_keeps_other_writers_changes(self):
+        store_a, store_b = CookieStore(self.path, flush_interval=0), CookieStore(self.path, flush_interval=0)
+        jar_a, jar_b = store_a.load(), store_b.load()
+
+        jar_b.set_cookie(make_cookie("X", "2"))
+        self.assertTrue(store_b.flush(jar_b))
+        jar_a.set_cookie(make_cookie("Y", "2"))
+        self.assertTrue(store_a.flush(jar_a))
+
+        self.assertEqual(self.read_file(), {"X": "2", "Y": "2"})
+        self.assertEqual(values(jar_a), {"X": "2", "Y": "2"})
+        self.assertFalse(store_a.is_dirty(jar_a))
+        self.assertFalse(store_a.flush(jar_a))
+        self.assertEqual(self.read_file(), {"X": "2", "Y": "2"})
+
+    def test_merge_keeps_other_writers_removals(self):
+        store_a, store_b = CookieStore(self.path, flush_interval=0), CookieStore(self.path, flush_interval=0)
+        jar_a, jar_b = store_a.load(), store_b.load()
+
+        jar_b.clear(".google.com", "/", "X")
+        self.assertTrue(store_b.flush(jar_b))
+        jar_a.set_cookie(make_cookie("Y", "2"))
+        self.assertTrue(store_a.flush(jar_a))
+
+        self.assertEqual(self.read_file(), {"Y": "2"})
+        self.assertEqual(values(jar_a), {"Y": "2"})
+        self.assertFalse(store_a.is_dirty(jar_a))
+
+    def test_own_changes_override_disk(self):
+        store_a, store_b = CookieStore(self.path, flush_interval=0), CookieStore(self.path, flush_interval=0)
+        jar_a, jar_b = store_a.load(), store_b.load()
+
+        jar_b.set_cookie(make_cookie("X", "2"))
+        store_b.flush(jar_b)
+        jar_a.set_cookie(make_cookie("X", "3"))
+        store_a.flush(jar_a)
+
+        self.assertEqual(self.read_file(), {"X": "3", "Y": "1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import tempfile
+import unittest
+from concurrent.futures import Future
+from pathlib import Path
+from unittest import mock
+
+from gpwc import payloads
+from gpwc.client import BaseClient, Client
+from gpwc.demux import ResponseDemultiplexer
+from gpwc.exceptions import BatchError, MissingResponseError, ResponseParseError, RpcError
+from gpwc.fake_server import FakeServer
+from gpwc.synthetic import ResponseGenerator, envelope, error_frame, wire_body
+
+
+class TestResponseDemultiplexer(unittest.TestCase):
+    def setUp(self):
+        self.client = BaseClient("cookies.txt", log_level="ERROR")
+        self.generator = ResponseGenerator(0)
+        self.payloads = [payloads.GetItemInfo(f"AF1Qip{i:038d}") for i in range(4)]
+
+    def answer(self, payload, error_code=None) -> list:
+        return envelope(payload.rpcid, self.generator.data(payload.rpcid), payload.payload_id, error_code)
+
+    def test_frames_are_routed_by_payload_id(self):
+        demux = ResponseDemultiplexer(self.client, self.payloads, future_factory=Future)
+        first, second, third, fourth = self.payloads
+        resolved = demux.feed([self.answer(third), self.answer(first)])
+        self.assertEqual([response.response_id for response in resolved], [third.payload_id, first.payload_id])
+        self.assertTrue(demux.futures[third.payload_id].done())
+        self.assertFalse(demux.futures[second.payload_id].done())
+
+        # answered twice, or for a payload of another batch
+        self.assertEqual(demux.feed([self.answer(first), envelope("VrseUb", [], "unknown")]), [])
+        resolved += demux.feed([self.answer(fourth), self.answer(second)])
+        self.assertEqual(demux.close(), [])
+        self.assertTrue(all(response.success for response in resolved))
+        self.assertEqual(sorted(response.response_id for response in resolved), sorted(payload.payload_id for payload in self.payloads))
+
+    def test_rpc_error_fails_its_payload_only(self):
+        self.client.rate_limiter = mock.Mock(THROTTLE_CODES=(8, 14))
+        first, second, *_ = self.payloads
+        demux = ResponseDemultiplexer(self.client, self.payloads[:2])
+        failed, answered = demux.feed([self.answer(first, error_code=8), self.answer(second)])
+        self.assertIsInstance(failed.error, RpcError)
+        self.assertEqual((failed.success, failed.error.code), (False, 8))
+        self.assertTrue(answered.success)
+        self.client.rate_limiter.on_rpc_error.assert_called_once_with(first.rpcid)
+
+    def test_er_frame_fails_pending_payloads(self):
+        first, *rest = self.payloads
+        demux = ResponseDemultiplexer(self.client, self.payloads, future_factory=Future)
+        (answered,) = demux.feed([self.answer(first)])
+        failed = demux.feed(error_frame(code=5))
+        self.assertTrue(answered.success)
+        self.assertEqual([response.response_id for response in failed], [payload.payload_id for payload in rest])
+        for response in failed:
+            self.assertIsInstance(response.error, BatchError)
+            self.assertEqual(response.error.code, 5)
+            self.assertIs(demux.futures[response.response_id].result(), response)
+
+    def test_unanswered_and_unparsable_payloads(self):
+        first, second, *_ = self.payloads
+        demux = ResponseDemultiplexer(self.client, self.payloads[:2])
+        (broken,) = demux.feed([["wrb.fr", first.rpcid, "{not json", None, None, None, first.payload_id]])
+        self.assertIsInstance(broken.error, ResponseParseError)
+        self.assertEqual(broken.data, "{not json")
+        (missing,) = demux.close()
+        self.assertEqual(missing.response_id, second.payload_id)
+        self.assertIsInstance(missing.error, MissingResponseError)
+
+    def test_failed_request_fails_pending_futures(self):
+        first, *_ = self.payloads
+        demux = ResponseDemultiplexer(self.client, self.payloads, future_factory=Future)
+        demux.feed([self.answer(first)])
+        demux.fail(ConnectionError("connection dropped"))
+        self.assertTrue(demux.futures[first.payload_id].result().success)
+        for payload in self.payloads[1:]:
+            self.assertIsInstance(demux.futures[payload.payload_id].exception(), ConnectionError)
+
+    def test_parse_api_response_answers_every_payload(self):
+        first, second, third, _ = self.payloads
+        body = wire_body([[self.answer(second)], [self.answer(first, error_code=3)], error_frame()])
+        responses = {response.response_id: response for response in self.client.parse_api_response(body, self.payloads)}
+        self.assertEqual(len(responses), 4)
+        self.assertTrue(responses[second.payload_id].success)
+        self.assertIsInstance(responses[first.payload_id].error, RpcError)
+        self.assertIsInstance(responses[third.payload_id].error, BatchError)
+
+
+class TestFakeServerFaults(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cookies_path = Path(self.tmp_dir.name) / "cookies.txt"
+        self.cookies_path.write_text("# Netscape HTTP Cookie File\n")
+        self.payloads = [payloads.GetItemInfo(f"AF1Qip{i:038d}") for i in range(20)]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def send(self, server: FakeServer) -> dict:
+        client = Client(self.cookies_path, log_level="ERROR", base_url=server.url)
+        self.addCleanup(client.close)
+        futures = client.submit_api_request(self.payloads)
+        streamed = list(client.stream_api_request(self.payloads))
+        self.assertEqual([future.result(timeout=10).response_id for future in futures], [payload.payload_id for payload in self.payloads])
+        self.assertEqual(len(streamed), len(self.payloads))
+        return {response.response_id: response for response in streamed}
+
+    def test_rpc_errors(self):
+        with FakeServer(rpc_error_rate=0.5, frame_size=3, seed=1) as server:
+            responses = self.send(server)
+        errors = [response.error for response in responses.values() if not response.success]
+        self.assertTrue(errors)
+        self.assertTrue(all(isinstance(error, RpcError) and error.code == 8 for error in errors))
+        # submitted and streamed
+        self.assertEqual(server.stats["rpcs"], 2 * len(self.payloads))
+
+    def test_er_frames(self):
+        with FakeServer(er_frame_rate=1) as server:
+            responses = self.send(server)
+        self.assertTrue(all(isinstance(response.error, BatchError) for response in responses.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import unittest
+import urllib.parse
+from unittest import mock
+
+from gpwc import json_backend, payloads
+from gpwc.client import BaseClient
+from gpwc.dispatcher import BatchDispatcher, chunk_payloads, quoted_size
+from gpwc.models import ApiResponse
+
+GLOBAL_DATA = {"FdrFJe": "-1234567890", "cfb2h": "boq_photosuiserver_fake", "SNlM0e": "fake_at", "Im6cmf": "/_/PhotosUi"}
+
+
+def f_req(body: str) -> str:
+    return urllib.parse.parse_qs(body)["f.req"][0]
+
+
+class EncodingClient(BaseClient):
+    """Builds the request of every batch sent and answers each payload successfully"""
+
+    def __init__(self) -> None:
+        super().__init__("cookies.txt", log_level="ERROR")
+        self.global_data = GLOBAL_DATA
+        self.bodies: list[str] = []
+
+    def send_api_request(self, payloads, encoded=None):
+        self.bodies.append(self.build_api_request(payloads, encoded)[2])
+        return [ApiResponse(payload.rpcid, [], True, payload.payload_id) for payload in payloads]
+
+
+class TestChunkPayloads(unittest.TestCase):
+    def setUp(self):
+        self.client = BaseClient("cookies.txt", log_level="ERROR")
+        self.client.global_data = GLOBAL_DATA
+
+    def test_quoted_size(self):
+        for value in [b"", b"abc_.-~", b'[["a","b",null]]', json.dumps(["é 日"]).encode()]:
+            self.assertEqual(quoted_size(value), len(urllib.parse.quote(value, safe="")))
+
+    def test_chunks_fit_max_bytes_on_the_wire(self):
+        # json heavy payloads, most characters of f.req get url-encoded
+        batch = [payloads.GetBatchMediaInfo([f"AF1Qip{i:038d}" for i in range(j, j + 20)]) for j in range(0, 2000, 20)]
+        max_bytes = 16 * 1024
+        chunks = list(chunk_payloads(self.client, batch, max_payloads=50, max_bytes=max_bytes))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual([payload for chunk in chunks for payload in chunk], batch)
+        for chunk, next_chunk in zip(chunks, chunks[1:] + [[]]):
+            self.assertLessEqual(self.wire_size(chunk), max_bytes)
+            # closed only when the next payload does not fit
+            if next_chunk:
+                self.assertGreater(self.wire_size(chunk + next_chunk[:1]), max_bytes)
+
+    def test_chunks_are_filled_up_to_max_bytes(self):
+        batch = [payloads.GetItemInfo(f"AF1Qip{i:038d}") for i in range(4)]
+        max_bytes = self.wire_size(batch)
+        self.assertEqual(list(chunk_payloads(self.client, batch, max_bytes=max_bytes)), [batch])
+        self.assertEqual(list(chunk_payloads(self.client, batch, max_bytes=max_bytes - 1)), [batch[:3], batch[3:]])
+
+    def wire_size(self, chunk: list) -> int:
+        _, _, body = self.client.build_api_request(chunk)
+        return len(urllib.parse.quote(f_req(body), safe=""))
+
+    def test_chunked_payloads_are_encoded_once(self):
+        batch = [payloads.GetItemInfo(f"AF1Qip{i:038d}") for i in range(10)]
+        encoded = {}
+        with mock.patch.object(json_backend, "dumps", wraps=json_backend.dumps) as dumps:
+            (chunk,) = chunk_payloads(self.client, batch, encoded=encoded)
+            _, _, body = self.client.build_api_request(chunk, encoded)
+        # the payload data, then the prepared payload, once each
+        self.assertEqual(dumps.call_count, 2 * len(batch))
+        self.assertEqual(encoded, {})
+        prepared = [[payload.rpcid, json.dumps(payload.data, separators=(",", ":")), None, payload.payload_id] for payload in batch]
+        self.assertEqual(f_req(body), json.dumps([prepared], separators=(",", ":")))
+
+    def test_payload_changed_after_sizing_is_sent_as_it_is(self):
+        payload = payloads.GetItemInfo("AF1Qip_old")
+        list(chunk_payloads(self.client, [payload]))
+        payload.data[0] = "AF1Qip_new"
+        _, _, body = self.client.build_api_request([payload])
+        self.assertIn("AF1Qip_new", f_req(body))
+
+    def test_dispatcher_encodes_payloads_once(self):
+        client = EncodingClient()
+        batch = [payloads.GetItemInfo(f"AF1Qip{i:038d}") for i in range(10)]
+        with mock.patch.object(json_backend, "dumps", wraps=json_backend.dumps) as dumps:
+            responses = BatchDispatcher(client, max_payloads=3, max_workers=2).send(batch)
+        self.assertEqual([response.response_id for response in responses], [payload.payload_id for payload in batch])
+        self.assertEqual(dumps.call_count, 2 * len(batch))
+        self.assertEqual(len(client.bodies), 4)
+        self.assertEqual(sorted(f_req(body) for body in client.bodies), sorted(f_req(self.client.build_api_request(batch[i : i + 3])[2]) for i in range(0, 10, 3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+import requests
+
+from gpwc.download import DownloadManager
+from gpwc.parser import Download
+
+FILES = {"/a": b"first file " * 1000, "/b": b"second file " * 1000}
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = FILES[self.path]
+        self.server.requests.append((self.path, self.headers.get("Range")))
+        range_header = self.headers.get("Range")
+        if range_header:
+            start, _, end = range_header.removeprefix("bytes=").partition("-")
+            start, end = int(start), int(end) if end else len(body) - 1
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+            body = body[start : end + 1]
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestDownloadManager(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dest_dir = Path(self.tmp_dir.name)
+        self.manager = DownloadManager(SimpleNamespace(session=requests.Session()), chunk_size=1024)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp_dir.cleanup()
+
+    def download(self, path: str, file_name: str) -> Download:
+        return Download(file_name=file_name, download_url=self.base_url + path, download_size=len(FILES[path]), unzipped_size=0)
+
+    def test_same_file_names_get_distinct_files(self):
+        downloads = [self.download("/a", "IMG_0001.JPG"), self.download("/b", "IMG_0001.JPG")]
+        results = self.manager._download_all(["key_a", "key_b"], downloads, self.dest_dir)
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual([result.path.name for result in results], ["IMG_0001.JPG", "IMG_0001-key_b.JPG"])
+        self.assertEqual(results[0].path.read_bytes(), FILES["/a"])
+        self.assertEqual(results[1].path.read_bytes(), FILES["/b"])
+
+    def test_file_name_cannot_leave_dest_dir(self):
+        (result,) = self.manager._download_all(["key_a"], [self.download("/a", "../../escaped.jpg")], self.dest_dir)
+        self.assertTrue(result.success)
+        self.assertEqual(result.path, self.dest_dir / "escaped.jpg")
+        self.assertEqual(result.path.read_bytes(), FILES["/a"])
+
+    def test_resume_partial_part_file(self):
+        path = self.dest_dir / "a.jpg"
+        path.with_name("a.jpg.part").write_bytes(FILES["/a"][:100])
+        size, resumed = self.manager.download_url(self.base_url + "/a", path, len(FILES["/a"]))
+        self.assertTrue(resumed)
+        self.assertEqual(size, len(FILES["/a"]))
+        self.assertEqual(path.read_bytes(), FILES["/a"])
+        self.assertEqual(self.server.requests, [("/a", "bytes=100-")])
+
+    def test_complete_part_file_is_renamed(self):
+        path = self.dest_dir / "a.jpg"
+        path.with_name("a.jpg.part").write_bytes(FILES["/a"])
+        size, resumed = self.manager.download_url(self.base_url + "/a", path, len(FILES["/a"]))
+        self.assertEqual(size, len(FILES["/a"]))
+        self.assertEqual(path.read_bytes(), FILES["/a"])
+        self.assertFalse(path.with_name("a.jpg.part").exists())
+
+    def test_range_not_satisfiable_on_complete_part_file(self):
+        part_path = self.dest_dir / "a.jpg.part"
+        part_path.write_bytes(FILES["/a"])
+        self.assertTrue(self.manager._download_stream(self.base_url + "/a", part_path, ranges=True))
+        self.assertEqual(part_path.read_bytes(), FILES["/a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import json
+import re
+import tempfile
+import unittest
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+from gpwc import payloads
+from gpwc.client import Client
+from gpwc.fake_server import FakeServer
+from gpwc.framing import iter_frames
+
+
+def batch_form(server: FakeServer, *requests: tuple[str, list]) -> dict[str, str]:
+    f_req = [[[rpcid, json.dumps(data), None, str(i)] for i, (rpcid, data) in enumerate(requests, 1)]]
+    return {"f.req": json.dumps(f_req), "at": server.global_data["SNlM0e"]}
+
+
+def envelopes(body: str) -> list:
+    return [envelope for frame in iter_frames([body.encode()]) for envelope in frame if envelope[0] in ("wrb.fr", "er")]
+
+
+class TestHandleBatch(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeServer(total_items=120, page_size=50)
+        self.addCleanup(self.server.stop)
+
+    def test_pagination_chain(self):
+        page_id, sizes = None, []
+        while True:
+            status, _, body = self.server.handle_batch(batch_form(self.server, ("EzkLib", [None, None, page_id])))
+            self.assertEqual(status, 200)
+            (envelope,) = envelopes(body)
+            items, page_id = json.loads(envelope[2])[:2]
+            sizes.append(len(items))
+            if page_id is None:
+                break
+        self.assertEqual(sizes, [50, 50, 20])
+
+    def test_requested_page_size_and_cached_pages(self):
+        form = batch_form(self.server, ("lcxiM", [None, None, 30]))
+        _, _, first = self.server.handle_batch(form)
+        _, _, second = self.server.handle_batch(form)
+        self.assertEqual(first, second)
+        (envelope,) = envelopes(first)
+        self.assertEqual(len(json.loads(envelope[2])[0]), 30)
+        self.assertEqual(json.loads(envelope[2])[1], "page:30")
+
+    def test_handlers_and_unknown_rpcids(self):
+        server = FakeServer(handlers={"abcde": lambda data: ["echo", data]})
+        self.addCleanup(server.stop)
+        _, _, body = server.handle_batch(batch_form(server, ("abcde", [1, 2]), ("zzzzz", [1]), ("yCLA7", ["a"]), ("yCLA7", ["a"])))
+        answers = [(envelope[1], json.loads(envelope[2]), envelope[6]) for envelope in envelopes(body)]
+        self.assertEqual(answers[:2], [("abcde", ["echo", [1, 2]], "1"), ("zzzzz", [], "2")])
+        self.assertEqual(answers[2][1], answers[3][1])
+        self.assertTrue(answers[2][1][0].startswith("token-"))
+
+    def test_frame_size(self):
+        self.server.frame_size = 2
+        _, _, body = self.server.handle_batch(batch_form(self.server, *[("VrseUb", ["AF1Qip_a", 1])] * 5))
+        self.assertEqual([len(frame) for frame in iter_frames([body.encode()])][:3], [2, 2, 1])
+
+    def test_fault_injection(self):
+        form = batch_form(self.server, ("VrseUb", ["AF1Qip_a", 1]), ("EzwWhf", []))
+        self.server.rpc_error_rate = 1
+        self.server.rpc_error_code = 7
+        _, _, body = self.server.handle_batch(form)
+        self.assertEqual([(envelope[2], envelope[5]) for envelope in envelopes(body)], [(None, [7]), (None, [7])])
+
+        self.server.er_frame_rate = 1
+        status, _, body = self.server.handle_batch(form)
+        self.assertEqual((status, [envelope[0] for envelope in envelopes(body)]), (200, ["er"]))
+
+        self.server.error_rate = 1
+        self.server.retry_after = 2.5
+        status, headers, _ = self.server.handle_batch(form)
+        self.assertIn(status, (429, 503))
+        self.assertEqual(headers, {"Retry-After": "2.5"})
+
+        form["at"] = "stale"
+        self.assertEqual(self.server.handle_batch(form)[0], 400)
+        self.assertEqual(self.server.stats, {"requests": 4, "rpcs": 4, "http_errors": 1, "er_frames": 1, "rpc_errors": 2, "rejected": 1})
+
+    def test_same_seed_same_responses(self):
+        def answers(seed: int) -> list:
+            server = FakeServer(seed=seed, rpc_error_rate=0.5, total_items=120, page_size=50)
+            self.addCleanup(server.stop)
+            form = batch_form(server, *[("VrseUb", [f"AF1Qip_{i}", 1]) for i in range(10)], ("EzkLib", []))
+            return [envelopes(server.handle_batch(form)[2]) for _ in range(3)]
+
+        self.assertEqual(answers(1), answers(1))
+        self.assertNotEqual(answers(1), answers(2))
+
+
+class TestHttp(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def post(self, path: str, form: dict[str, str]) -> tuple[int, dict, str]:
+        request = urllib.request.Request(self.server.url + path, urllib.parse.urlencode(form).encode())
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, dict(response.headers), response.read().decode()
+        except urllib.error.HTTPError as e:
+            return e.code, dict(e.headers), e.read().decode()
+
+    def test_main_page_global_data(self):
+        with urllib.request.urlopen(self.server.url) as response:
+            page = response.read().decode()
+        global_data = json.loads(re.search(r"WIZ_global_data = (.*?);</script>", page)[1])
+        self.assertEqual(global_data, self.server.global_data)
+        self.assertEqual(global_data["oPEP7c"], "fake@example.com")
+
+    def test_batchexecute(self):
+        form = batch_form(self.server, ("EzwWhf", []))
+        self.assertEqual(self.post("/data/batchexecute", form)[0], 404)
+        status, _, body = self.post("/_/PhotosUi/data/batchexecute?rpcids=EzwWhf", form)
+        self.assertEqual(status, 200)
+        self.assertEqual([envelope[1] for envelope in envelopes(body)], ["EzwWhf"])
+
+        self.server.error_rate = 1
+        self.server.retry_after = 1
+        status, headers, _ = self.post("/_/PhotosUi/data/batchexecute", form)
+        self.assertIn(status, (429, 503))
+        self.assertEqual(headers["Retry-After"], "1")
+
+    def test_client_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cookies_path = Path(tmp_dir) / "cookies.txt"
+            cookies_path.write_text("# Netscape HTTP Cookie File\n")
+            client = Client(cookies_path, log_level="ERROR", base_url=self.server.url)
+            self.addCleanup(client.close)
+            quota, page = client.send_api_request([payloads.GetStorageQuota(), payloads.GetLibraryPageByTakenDate()])
+        self.assertTrue(quota.success and page.success)
+        self.assertEqual(len(page.data.items), 500)
+        self.assertEqual(page.data.next_page_id, "page:500")
+        self.assertEqual(self.server.stats["rpcs"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
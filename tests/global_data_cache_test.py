@@ -0,0 +1,110 @@
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+from gpwc import global_data_cache, payloads
+from gpwc.async_client import AsyncClient
+from gpwc.client import Client
+from gpwc.fake_server import FakeServer
+from gpwc.global_data_cache import GlobalDataCache
+
+GLOBAL_DATA = {"FdrFJe": "-1234567890", "cfb2h": "boq_photosuiserver_fake", "SNlM0e": "fake_at", "Im6cmf": "/_/PhotosUi", "oPEP7c": "fake@example.com"}
+
+
+class TestGlobalDataCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = GlobalDataCache(Path(self.tmp_dir.name) / "cache", ttl=60)
+        self.cookies_path = Path(self.tmp_dir.name) / "cookies.txt"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_entries_expire_after_ttl(self):
+        now = time.time()
+        with mock.patch.object(global_data_cache.time, "time", return_value=now):
+            self.cache.save(self.cookies_path, {**GLOBAL_DATA, "unused": 1})
+        for elapsed, expected in ((0, GLOBAL_DATA), (60, GLOBAL_DATA), (61, None)):
+            with mock.patch.object(global_data_cache.time, "time", return_value=now + elapsed):
+                self.assertEqual(self.cache.load(self.cookies_path), expected)
+
+    def test_unusable_entries_are_ignored(self):
+        self.assertIsNone(self.cache.load(self.cookies_path))
+        self.cache.save(self.cookies_path, GLOBAL_DATA)
+        self.assertIsNone(self.cache.load(Path(self.tmp_dir.name) / "other_cookies.txt"))
+        path = self.cache.path_for(self.cookies_path)
+        path.write_text("{not json")
+        self.assertIsNone(self.cache.load(self.cookies_path))
+        partial = {key: value for key, value in GLOBAL_DATA.items() if key != "SNlM0e"}
+        path.write_text(json.dumps({"saved_at": time.time(), "global_data": partial}))
+        self.assertIsNone(self.cache.load(self.cookies_path))
+        self.cache.invalidate(self.cookies_path)
+        self.assertFalse(path.exists())
+        # already gone
+        self.cache.invalidate(self.cookies_path)
+
+
+class TestStaleGlobalData(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cookies_path = Path(self.tmp_dir.name) / "cookies.txt"
+        self.cookies_path.write_text("# Netscape HTTP Cookie File\n")
+        self.cache = GlobalDataCache(Path(self.tmp_dir.name) / "cache")
+        self.server = FakeServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def client(self, **kwargs) -> Client:
+        client = Client(self.cookies_path, log_level="ERROR", base_url=self.server.url, **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_cached_token_rejected_once_is_fetched_again(self):
+        with mock.patch.object(Client, "get_global_data", autospec=True, side_effect=Client.get_global_data) as get_global_data:
+            self.client(global_data_cache=self.cache)
+            client = self.client(global_data_cache=self.cache)
+            self.assertTrue(client.global_data_from_cache)
+            self.assertEqual(get_global_data.call_count, 1)
+
+            self.server.rotate_token()
+            (response,) = client.send_api_request([payloads.GetStorageQuota()])
+            self.assertEqual(get_global_data.call_count, 2)
+        self.assertTrue(response.success)
+        self.assertEqual(self.server.stats["rejected"], 1)
+        self.assertFalse(client.global_data_from_cache)
+        self.assertEqual(self.cache.load(self.cookies_path)["SNlM0e"], self.server.global_data["SNlM0e"])
+
+    def test_fresh_token_rejected_is_an_error(self):
+        client = self.client()
+        self.server.rotate_token()
+        with self.assertRaises(requests.HTTPError):
+            client.send_api_request([payloads.GetStorageQuota()])
+        self.assertEqual(self.server.stats["rejected"], 1)
+
+    def test_async_client_fetches_a_rejected_cached_token_again(self):
+        self.client(global_data_cache=self.cache)
+        self.server.rotate_token()
+
+        async def run():
+            client = AsyncClient(self.cookies_path, log_level="ERROR", global_data_cache=self.cache, base_url=self.server.url)
+            try:
+                return await client.send_api_request([payloads.GetStorageQuota()])
+            finally:
+                await client.aclose()
+
+        (response,) = asyncio.run(run())
+        self.assertTrue(response.success)
+        self.assertEqual(self.server.stats["rejected"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
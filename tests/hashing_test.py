@@ -0,0 +1,48 @@
+import unittest
+
+from gpwc.client import BaseClient
+from gpwc.exceptions import RemoteMatchError, RpcError
+from gpwc.hashing import find_remote_matches
+from gpwc.models import ApiResponse
+from gpwc.parser import parse_response_data
+from gpwc.synthetic import ResponseGenerator
+
+
+class MatchClient(BaseClient):
+    """Answers GetRemoteMatchesByHash with a match for every hash, failing payloads holding failing hashes"""
+
+    def __init__(self, failing: set[str]) -> None:
+        super().__init__("cookies.txt", log_level="ERROR")
+        self.generator = ResponseGenerator(0)
+        self.failing = failing
+
+    def send_api_request(self, payloads, encoded=None):
+        responses = []
+        for payload in payloads:
+            hashes = list(payload.data[0])
+            if self.failing & set(hashes):
+                error = RpcError(payload.rpcid, payload.payload_id, code=8)
+                responses.append(ApiResponse(payload.rpcid, None, False, payload.payload_id, error))
+                continue
+            data = parse_response_data(payload.rpcid, self.generator.data(payload.rpcid, keys=hashes))
+            responses.append(ApiResponse(payload.rpcid, data, True, payload.payload_id))
+        return responses
+
+
+class TestFindRemoteMatches(unittest.TestCase):
+    hashes = [f"hash{i:023d}" for i in range(10)]
+
+    def test_all_found(self):
+        matches = find_remote_matches(MatchClient(set()), self.hashes, hashes_per_payload=3)
+        self.assertEqual(set(matches), set(self.hashes))
+
+    def test_failed_chunk_raises_with_unresolved_hashes(self):
+        with self.assertRaises(RemoteMatchError) as raised:
+            find_remote_matches(MatchClient({self.hashes[4]}), self.hashes, hashes_per_payload=3)
+        self.assertEqual(raised.exception.hashes, self.hashes[3:6])
+        self.assertEqual(set(raised.exception.matches), set(self.hashes) - set(self.hashes[3:6]))
+        self.assertIsInstance(raised.exception.errors[0], RpcError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from gpwc import payloads
+from gpwc.client import BaseClient
+from gpwc.exceptions import RpcError
+from gpwc.journal import COMMITTED, FAILED, PENDING, SUPERSEDED, MutationJournal
+from gpwc.models import ApiResponse
+
+
+class EditClient(BaseClient):
+    """Applies edits in order, payloads whose description is "poison" fail"""
+
+    def __init__(self) -> None:
+        super().__init__("cookies.txt", log_level="ERROR")
+        self.sent: list[list] = []
+
+    def send_api_request(self, payloads, encoded=None):
+        self.sent.append([payload.data for payload in payloads])
+        responses = []
+        for payload in payloads:
+            if "poison" in payload.data:
+                error = RpcError(payload.rpcid, payload.payload_id, code=3)
+                responses.append(ApiResponse(payload.rpcid, None, False, payload.payload_id, error))
+            else:
+                responses.append(ApiResponse(payload.rpcid, [], True, payload.payload_id))
+        return responses
+
+
+class TestMutationJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp_dir.name) / "edits.sqlite3"
+        self.client = EditClient()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def journal(self, **kwargs) -> MutationJournal:
+        journal = MutationJournal(self.client, self.db_path, batch_size=2, **kwargs)
+        self.addCleanup(journal.close)
+        return journal
+
+    def entry(self, journal: MutationJournal, mutation_id: int) -> tuple:
+        return journal.db.execute("SELECT status, attempts FROM mutations WHERE id = ?", (mutation_id,)).fetchone()
+
+    def test_failed_entry_waits_for_retry_delay(self):
+        journal = self.journal(retry_delay=0.2, max_attempts=3)
+        poison = journal.enqueue(payloads.SetItemDescription("dedup_0", "poison"))
+        for i in range(1, 5):
+            journal.enqueue(payloads.SetItemDescription(f"dedup_{i}", "fine"))
+
+        self.assertEqual(journal.flush(), 4)
+        # one attempt in this flush, not all of max_attempts
+        self.assertEqual(self.entry(journal, poison), (PENDING, 1))
+        self.assertEqual(journal.flush(), 0)
+        self.assertEqual(self.entry(journal, poison), (PENDING, 1))
+
+        time.sleep(0.25)
+        journal.flush()
+        self.assertEqual(self.entry(journal, poison), (PENDING, 2))
+        time.sleep(0.45)
+        journal.flush()
+        self.assertEqual(self.entry(journal, poison), (FAILED, 3))
+
+    def test_recovery_supersedes_in_flight_entry_with_newer_edit(self):
+        journal = self.journal()
+        older = journal.enqueue(payloads.SetItemDescription("dedup_0", "old"))
+        journal._claim(time.time())  # sent when the process died
+        newer = journal.enqueue(payloads.SetItemDescription("dedup_0", "new"))
+        journal.close()
+
+        journal = self.journal()
+        self.assertEqual(self.entry(journal, older)[0], SUPERSEDED)
+        self.assertEqual(journal.flush(), 1)
+        self.assertEqual(self.entry(journal, newer)[0], COMMITTED)
+        self.assertEqual(self.client.sent, [[payloads.SetItemDescription("dedup_0", "new").data]])
+
+    def test_failed_entry_with_newer_edit_is_superseded(self):
+        journal = self.journal(retry_delay=0)
+        older = journal.enqueue(payloads.SetItemDescription("dedup_0", "poison"))
+        journal._send(journal._claim(time.time()))
+        self.assertEqual(self.entry(journal, older)[0], PENDING)
+        journal.enqueue(payloads.SetItemDescription("dedup_0", "new"))
+        self.assertEqual(self.entry(journal, older)[0], SUPERSEDED)
+
+        in_flight = journal.enqueue(payloads.SetItemDescription("dedup_1", "poison"))
+        batch = journal._claim(time.time())
+        journal.enqueue(payloads.SetItemDescription("dedup_1", "new"))
+        journal._send(batch)
+        self.assertEqual(self.entry(journal, in_flight)[0], SUPERSEDED)
+
+
+if __name__ == "__main__":
+    unittest.main()
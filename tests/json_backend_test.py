@@ -0,0 +1,108 @@
+import importlib.util
+import json
+import math
+import random
+import unittest
+
+from gpwc import json_backend
+
+BACKENDS = [backend for backend in ("orjson", "msgspec") if importlib.util.find_spec(backend)]
+DOCUMENTS = [
+    b"[83459698470601878503]",
+    b"[-83459698470601878503,18446744073709551615,18446744073709551616]",
+    b"[-9223372036854775808,-9223372036854775809,9223372036854775807]",
+    b'{"a":[1,2.5,123456789012345678901234567890]}',
+    b"[NaN,Infinity,-Infinity]",
+    b'["\\ud800","\\udfff x","\\ud83d\\ude00"]',
+    b'["\\u00e9t\\u00e9","\xc3\xa9t\xc3\xa9"]',
+    b"[1e400,-1e400,1e-400,0.1,1E5,-0.0,0]",
+    b'"12345678901234567890 is a string"',
+]
+OBJECTS = [
+    [83459698470601878503, -(2**64), 2**63 - 1, 2**64],
+    [float("nan"), float("inf"), float("-inf"), None],
+    ["\ud800", "a\udfffb", "\U0001f600", "\x7f", "été", " "],
+    [0.1, 1e16, 1e-5, 1e22, -0.0, 5e-324, 1.7976931348623157e308],
+    {"k": [None, True, False, {"n": 1}], "é": "\x00"},
+]
+
+
+def random_value(rng: random.Random, depth: int = 0):
+    kind = rng.randrange(9 if depth < 3 else 6)
+    if kind == 0:
+        return rng.choice([0, -1, 2**63 - 1, -(2**63), 2**64 - 1]) + rng.randint(-3, 3)
+    if kind == 1:
+        return rng.randint(-(10 ** rng.randint(1, 30)), 10 ** rng.randint(1, 30))
+    if kind == 2:
+        return rng.choice([rng.random() * 10 ** rng.randint(-30, 30), float("nan"), float("inf"), -float("inf"), 0.0, -0.0])
+    if kind == 3:
+        return "".join(chr(rng.choice([rng.randint(32, 126), rng.randint(0, 31), rng.randint(0xA0, 0x2FFF), rng.randint(0xD800, 0xDFFF), rng.randint(0x10000, 0x10FFFF)])) for _ in range(rng.randint(0, 8)))
+    if kind == 4:
+        return "".join(rng.choice("0123456789") for _ in range(rng.randint(15, 25)))
+    if kind == 5:
+        return rng.choice([None, True, False])
+    if kind in (6, 7):
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 5))]
+    return {str(random_value(rng, 3)): random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+
+
+def holds_float(obj) -> bool:
+    if isinstance(obj, float):
+        return True
+    values = obj.values() if isinstance(obj, dict) else obj if isinstance(obj, list) else []
+    return any(holds_float(value) for value in values)
+
+
+class TestJsonBackend(unittest.TestCase):
+    def tearDown(self):
+        json_backend.use_backend()
+
+    def assert_same_loads(self, document: bytes) -> None:
+        expected = json.loads(document)
+        # repr tells ints from floats, and NaN from NaN
+        self.assertEqual(repr(json_backend.loads(document)), repr(expected), document)
+        self.assertEqual(repr(json_backend.loads(document.decode("utf-8", "surrogatepass"))), repr(expected), document)
+
+    def assert_same_dumps(self, obj) -> None:
+        expected = json.dumps(obj, separators=(",", ":")).encode()
+        self.assertEqual(json_backend.dumps(obj), expected, repr(obj))
+        if not holds_float(obj):
+            # the promise callers make with floats=False
+            self.assertEqual(json_backend.dumps(obj, floats=False), expected, repr(obj))
+
+    def test_edge_cases(self):
+        for backend in BACKENDS + ["stdlib"]:
+            with self.subTest(backend=backend):
+                json_backend.use_backend(backend)
+                for document in DOCUMENTS:
+                    self.assert_same_loads(document)
+                for obj in OBJECTS:
+                    self.assert_same_dumps(obj)
+
+    def test_big_ints_are_not_read_as_floats(self):
+        for backend in BACKENDS:
+            json_backend.use_backend(backend)
+            self.assertEqual(json_backend.loads(b"[83459698470601878503]"), [83459698470601878503])
+            self.assertIsInstance(json_backend.loads("[1, 2, -83459698470601878503]")[2], int)
+
+    def test_random_documents(self):
+        rng = random.Random(0)
+        values = [random_value(rng) for _ in range(3000)]
+        for backend in BACKENDS + ["stdlib"]:
+            with self.subTest(backend=backend):
+                json_backend.use_backend(backend)
+                for value in values:
+                    self.assert_same_dumps(value)
+                    self.assert_same_loads(json.dumps(value).encode("utf-8", "surrogatepass"))
+                    self.assert_same_loads(json.dumps(value, ensure_ascii=False).encode("utf-8", "surrogatepass"))
+
+    def test_non_finite_floats_are_written_like_the_standard_library(self):
+        for backend in BACKENDS:
+            json_backend.use_backend(backend)
+            self.assertEqual(json_backend.dumps([None, math.nan]), b"[null,NaN]")
+            self.assertEqual(json_backend.dumps({"a": [math.inf, None]}), b'{"a":[Infinity,null]}')
+            self.assertEqual(json_backend.dumps([None, 1.5]), b"[null,1.5]")
+
+
+if __name__ == "__main__":
+    unittest.main()
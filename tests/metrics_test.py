@@ -0,0 +1,68 @@
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from gpwc import payloads
+from gpwc.client import Client
+from gpwc.fake_server import FakeServer
+from gpwc.metrics import Histogram, HistogramCollector, prometheus_text
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantile_is_the_upper_bound_of_its_bucket(self):
+        histogram = Histogram((1, 2, 5))
+        self.assertIsNone(histogram.quantile(0.5))
+        for value in (0.5, 1, 1.5, 3, 10):
+            histogram.observe(value)
+        # values on a bound are counted in its bucket, like prometheus `le`
+        self.assertEqual(histogram.counts, [2, 1, 1, 1])
+        self.assertEqual((histogram.count, histogram.sum), (5, 16.0))
+        self.assertEqual([histogram.quantile(q) for q in (0, 0.4, 0.5, 0.6, 0.8, 0.99, 1)], [1, 1, 2, 2, 5, float("inf"), float("inf")])
+
+
+class TestPrometheusText(unittest.TestCase):
+    def test_exposition(self):
+        collector = HistogramCollector()
+        collector.observe_batch("batch_size", ["VrseUb", "lcxiM", "VrseUb"], 3)
+        collector.observe("batch_size", "VrseUb", 700)
+        collector.increment("rpc_errors", "lcxiM")
+        collector.increment_batch("requests", ["lcxiM", "VrseUb"], 2)
+        buckets = ["1", "2", "5", "10", "20", "50", "100", "200", "500", "1000", "+Inf"]
+        expected = ["# TYPE gpwc_batch_size histogram"]
+        for rpcid, cumulative, total in (("VrseUb", [0, 0, 1, 1, 1, 1, 1, 1, 1, 2, 2], "703.0"), ("lcxiM", [0, 0] + [1] * 9, "3.0")):
+            expected += [f'gpwc_batch_size_bucket{{rpcid="{rpcid}",le="{le}"}} {count}' for le, count in zip(buckets, cumulative)]
+            expected += [f'gpwc_batch_size_sum{{rpcid="{rpcid}"}} {total}', f'gpwc_batch_size_count{{rpcid="{rpcid}"}} {cumulative[-1]}']
+        expected += [
+            "# TYPE gpwc_requests_total counter",
+            'gpwc_requests_total{rpcid="VrseUb"} 2',
+            'gpwc_requests_total{rpcid="lcxiM"} 2',
+            "# TYPE gpwc_rpc_errors_total counter",
+            'gpwc_rpc_errors_total{rpcid="lcxiM"} 1',
+        ]
+        self.assertEqual(prometheus_text(collector), "\n".join(expected) + "\n")
+
+    def test_client_measurements(self):
+        collector = HistogramCollector()
+        with tempfile.TemporaryDirectory() as tmp_dir, FakeServer(rpc_error_rate=1) as server:
+            cookies_path = Path(tmp_dir) / "cookies.txt"
+            cookies_path.write_text("# Netscape HTTP Cookie File\n")
+            client = Client(cookies_path, log_level="ERROR", metrics=collector, base_url=server.url)
+            client.send_api_request([payloads.GetItemInfo("AF1Qip_a"), payloads.GetItemInfo("AF1Qip_b")])
+            client.close()
+        summary = collector.summary()["VrseUb"]
+        self.assertEqual(summary["batch_size"]["count"], 1)
+        self.assertEqual(summary["batch_size"]["p50"], 2)
+        self.assertEqual(summary["rpc_errors"], 2)
+        for name in ("encode_seconds", "network_seconds", "request_bytes"):
+            self.assertEqual(summary[name]["count"], 1 if name != "request_bytes" else 2, name)
+
+        text = prometheus_text(collector, prefix="test")
+        for metric in ("test_network_seconds", "test_request_bytes"):
+            counts = [int(count) for count in re.findall(rf'^{metric}_bucket{{rpcid="VrseUb",le="[^"]+"}} (\d+)$', text, re.M)]
+            self.assertEqual(counts, sorted(counts))
+            self.assertIn(f'{metric}_count{{rpcid="VrseUb"}} {counts[-1]}', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
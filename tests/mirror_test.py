@@ -0,0 +1,117 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from gpwc.client import BaseClient
+from gpwc.mirror import FULL_CRAWL_DONE, LibraryMirror
+from gpwc.models import ApiResponse
+from gpwc.parser import parse_response_data
+from gpwc.synthetic import ResponseGenerator
+
+
+class FeedClient(BaseClient):
+    """Serves an uploaded date feed of items and item info, failing requests on demand"""
+
+    def __init__(self, feed: list[list], page_size: int = 2) -> None:
+        super().__init__("cookies.txt", log_level="ERROR")
+        self.feed = feed
+        self.page_size = page_size
+        self.generator = ResponseGenerator(1)
+        self.requests: list = []
+        self.fail_at: set[int] = set()
+
+    def send_api_request(self, payloads, encoded=None):
+        self.requests.append(payloads)
+        if len(self.requests) in self.fail_at:
+            raise ConnectionError("connection dropped")
+        if isinstance(payloads, list):
+            return [self.item_info_ext(payload) for payload in payloads]
+        page_id = payloads.data[payloads.page_id_index]
+        offset = int(page_id.split(":")[1]) if page_id else 0
+        end = offset + self.page_size
+        data = [self.feed[offset:end], f"page:{end}" if end < len(self.feed) else None]
+        return ApiResponse(payloads.rpcid, parse_response_data(payloads.rpcid, data), True, payloads.payload_id)
+
+    def item_info_ext(self, payload) -> ApiResponse:
+        data = self.generator.data(payload.rpcid)
+        data[0][0] = payload.data[0]
+        return ApiResponse(payload.rpcid, parse_response_data(payload.rpcid, data), True, payload.payload_id)
+
+
+class TestLibraryMirror(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mirror = LibraryMirror(Path(self.tmp_dir.name) / "library.db")
+        self.generator = ResponseGenerator(0)
+        # a crawled library uploaded at 100..1000
+        self.old_items = self.items(range(1000, 0, -100))
+        with self.mirror.db:
+            self.mirror.upsert("library_items", parse_response_data("EzkLib", [self.old_items, None]).items)
+            self.mirror.set_state(FULL_CRAWL_DONE, 1)
+
+    def tearDown(self):
+        self.mirror.close()
+        self.tmp_dir.cleanup()
+
+    def items(self, creation_timestamps) -> list[list]:
+        items = []
+        for creation_timestamp in creation_timestamps:
+            item = self.generator.library_item()
+            item[5] = creation_timestamp
+            items.append(item)
+        return items
+
+    def stored_keys(self) -> set[str]:
+        return {row[0] for row in self.mirror.db.execute("SELECT media_key FROM library_items")}
+
+    def test_incremental_sync_stops_at_high_water(self):
+        new_items = self.items(range(2000, 1400, -100))
+        client = FeedClient(new_items + self.old_items)
+        self.mirror.sync(client, prefetch=0)
+        self.assertTrue({item[0] for item in new_items} <= self.stored_keys())
+        # 6 new items on 3 pages, the 4th page holds items older than the mark
+        self.assertEqual(len(client.requests), 4)
+
+        client.requests.clear()
+        self.mirror.sync(client, prefetch=0)
+        self.assertEqual(len(client.requests), 1)
+
+    def test_interrupted_incremental_sync_resumes(self):
+        new_items = self.items(range(2000, 1400, -100))
+        client = FeedClient(new_items + self.old_items)
+        client.fail_at = {2}
+        with self.assertRaises(ConnectionError):
+            self.mirror.sync(client, prefetch=0)
+        self.assertIn(new_items[0][0], self.stored_keys())
+        self.assertNotIn(new_items[2][0], self.stored_keys())
+
+        client.fail_at = set()
+        self.mirror.sync(client, prefetch=0)
+        self.assertTrue({item[0] for item in new_items} <= self.stored_keys())
+
+    def test_edits_are_only_seen_by_a_new_full_crawl(self):
+        client = FeedClient(self.old_items)
+        edited = self.old_items[-1]
+        edited[5] = 50
+        self.mirror.sync(client, prefetch=0)
+        query = "SELECT creation_timestamp FROM library_items WHERE media_key = ?"
+        self.assertEqual(self.mirror.db.execute(query, (edited[0],)).fetchone()[0], 100)
+
+        self.assertEqual(self.mirror.full_crawl(client, prefetch=0), len(self.old_items))
+        self.assertEqual(self.mirror.db.execute(query, (edited[0],)).fetchone()[0], 50)
+
+    def test_sync_item_info_ext_commits_chunks(self):
+        client = FeedClient([])
+        client.fail_at = {3}
+        with self.assertRaises(ConnectionError):
+            self.mirror.sync_item_info_ext(client, max_workers=1, chunk_size=4)
+        # the 2 chunks sent before the failure are kept
+        self.assertEqual(self.mirror.db.execute("SELECT COUNT(*) FROM item_info_ext").fetchone()[0], 8)
+
+        client.fail_at = set()
+        self.assertEqual(self.mirror.sync_item_info_ext(client, max_workers=1, chunk_size=4), 2)
+        self.assertEqual(self.mirror.db.execute("SELECT COUNT(*) FROM item_info_ext").fetchone()[0], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
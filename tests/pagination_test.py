@@ -0,0 +1,67 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from gpwc import payloads
+from gpwc.async_client import AsyncClient
+from gpwc.client import Client
+from gpwc.exceptions import RpcError
+from gpwc.fake_server import FakeServer
+from gpwc.pagination import aiter_items, iter_items, iter_pages
+
+
+class TestPagination(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cookies_path = Path(self.tmp_dir.name) / "cookies.txt"
+        self.cookies_path.write_text("# Netscape HTTP Cookie File\n")
+        # 12 full pages and a last one of 34 items
+        self.server = FakeServer(total_items=1234)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.client = Client(self.cookies_path, log_level="ERROR", base_url=self.server.url)
+        self.addCleanup(self.client.close)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_every_item_of_the_chain_once(self):
+        for prefetch in (0, 1, 3):
+            with self.subTest(prefetch=prefetch):
+                requests = self.server.stats["requests"]
+                items = list(iter_items(self.client, payloads.GetLibraryPageByTakenDate(page_size=100), prefetch))
+                self.assertEqual(len(items), 1234)
+                self.assertEqual(len({item.media_key for item in items}), 1234)
+                self.assertEqual(self.server.stats["requests"] - requests, 13)
+
+    def test_page_sizes_and_last_page(self):
+        pages = list(iter_pages(self.client, payloads.GetLibraryPageByTakenDate(page_size=100)))
+        self.assertEqual([len(page.items) for page in pages], [100] * 12 + [34])
+        self.assertEqual([page.next_page_id for page in pages], [f"page:{offset}" for offset in range(100, 1300, 100)] + [None])
+
+    def test_async_items(self):
+        async def run() -> list:
+            client = AsyncClient(self.cookies_path, log_level="ERROR", base_url=self.server.url)
+            try:
+                return [item async for item in aiter_items(client, payloads.GetLibraryPageByTakenDate(page_size=100), prefetch=2)]
+            finally:
+                await client.aclose()
+
+        items = asyncio.run(run())
+        self.assertEqual(len({item.media_key for item in items}), 1234)
+
+    def test_failed_page_ends_pagination_with_an_error(self):
+        pages = iter_pages(self.client, payloads.GetLibraryPageByTakenDate(page_size=100))
+        self.assertEqual(len(next(pages).items), 100)
+        self.server.rpc_error_rate = 1
+        with self.assertRaises(RpcError):
+            list(pages)
+
+    def test_unparsed_payload_is_rejected(self):
+        with self.assertRaises(ValueError):
+            next(iter_pages(self.client, payloads.GetLibraryPageByTakenDate(parse_response=False)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from gpwc import payloads
+from gpwc.client import Client
+from gpwc.exceptions import RequestError
+from gpwc.fake_server import FakeServer
+from gpwc.pool import ClientPool
+
+
+class TestClientPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.servers = {}
+        for account in ("alice@example.com", "bob@example.com"):
+            self.servers[account] = FakeServer(account=account, error_statuses=(404,))
+            self.servers[account].start()
+            self.addCleanup(self.servers[account].stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def cookies_path(self, name: str) -> Path:
+        path = Path(self.tmp_dir.name) / name
+        path.write_text("# Netscape HTTP Cookie File\n")
+        return path
+
+    def pool(self, **kwargs) -> ClientPool:
+        pool = ClientPool([], log_level="ERROR", **kwargs)
+        self.addCleanup(pool.close)
+        for account, server in self.servers.items():
+            pool.add_client(Client(self.cookies_path(f"{account}.txt"), log_level="ERROR", base_url=server.url))
+        return pool
+
+    def test_duplicate_account_is_not_loaded(self):
+        server = self.servers["alice@example.com"]
+        paths = [self.cookies_path("first.txt"), self.cookies_path("second.txt")]
+        with ClientPool(paths, log_level="ERROR", base_url=server.url) as pool:
+            self.assertEqual(pool.accounts, ["alice@example.com"])
+            (duplicate,) = pool.load_errors
+            self.assertIsInstance(pool.load_errors[duplicate], ValueError)
+            loaded = str(paths[0]) if duplicate == str(paths[1]) else str(paths[1])
+            self.assertEqual(pool.account(loaded), "alice@example.com")
+            self.assertRaises(KeyError, pool.account, duplicate)
+
+    def test_map_answers_every_payload_when_an_account_fails(self):
+        pool = self.pool()
+        self.servers["bob@example.com"].error_rate = 1
+        routed = [(account, payloads.GetItemInfo(f"AF1Qip{i:038d}")) for i in range(6) for account in self.servers]
+        responses = pool.map(routed, max_payloads=2)
+        self.assertEqual([response.response_id for response in responses], [payload.payload_id for _, payload in routed])
+        for (account, _), response in zip(routed, responses):
+            if account == "alice@example.com":
+                self.assertTrue(response.success)
+            else:
+                self.assertFalse(response.success)
+                self.assertIsInstance(response.error, RequestError)
+        stats = pool.stats().accounts
+        self.assertEqual((stats["alice@example.com"].errors, stats["bob@example.com"].errors), (0, 3))
+
+    def test_send_waits_for_a_worker(self):
+        pool = self.pool(max_concurrency=2)
+        client = pool.client("alice@example.com")
+        send = client.send_api_request
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def counting_send(*args, **kwargs):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            try:
+                return send(*args, **kwargs)
+            finally:
+                with lock:
+                    running[0] -= 1
+
+        client.send_api_request = counting_send
+        futures = [pool.submit("alice@example.com", [payloads.GetStorageQuota()]) for _ in range(4)]
+        threads = [threading.Thread(target=pool.send, args=("alice@example.com", [payloads.GetStorageQuota()])) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(future.result(timeout=10)[0].success for future in futures))
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(pool.stats().requests, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import asyncio
+import email.utils
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+from gpwc import payloads, ratelimit, utils
+from gpwc.client import BaseClient, Client
+from gpwc.fake_server import FakeServer
+from gpwc.ratelimit import AdaptiveRateLimiter, TokenBucket
+from gpwc.synthetic import envelope
+
+
+asyncio_sleep = asyncio.sleep
+
+
+class FakeClock:
+    """monotonic clock that only moves when slept on, concurrent async sleepers overlap"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.slept: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        until = self.now + seconds
+        await asyncio_sleep(0)
+        self.now = max(self.now, until)
+
+
+class FakeClockTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        for target, attribute, replacement in (
+            (ratelimit.time, "monotonic", self.clock.monotonic),
+            (ratelimit.time, "sleep", self.clock.sleep),
+            (ratelimit.asyncio, "sleep", self.clock.async_sleep),
+        ):
+            patcher = mock.patch.object(target, attribute, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class TestTokenBucket(FakeClockTestCase):
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=2, burst=3)
+        self.assertEqual([bucket.reserve() for _ in range(5)], [0.0, 0.0, 0.0, 0.5, 1.0])
+        self.clock.sleep(1.0)
+        self.assertEqual(bucket.state(), {"rate": 2, "tokens": 0.0, "paused_for": 0.0})
+        self.clock.sleep(10.0)
+        self.assertEqual(bucket.state()["tokens"], 3)
+
+    def test_acquire_sleeps_for_its_reservation(self):
+        bucket = TokenBucket(rate=4, burst=1)
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0.0, 0.25, 0.25])
+        self.assertEqual(self.clock.slept, [0.25, 0.25])
+
+    def test_pause_and_set_rate(self):
+        bucket = TokenBucket(rate=1, burst=2)
+        bucket.pause(5)
+        bucket.pause(1)
+        self.assertEqual(bucket.reserve(), 5.0)
+        bucket.set_rate(0.5)
+        self.clock.sleep(2.0)
+        self.assertEqual(bucket.state(), {"rate": 0.5, "tokens": 2.0, "paused_for": 3.0})
+
+    def test_acquire_async(self):
+        bucket = TokenBucket(rate=1, burst=1)
+
+        async def run() -> list[float]:
+            return await asyncio.gather(*(bucket.acquire_async() for _ in range(3)))
+
+        self.assertEqual(asyncio.run(run()), [0.0, 1.0, 2.0])
+        self.assertEqual(self.clock.slept, [1.0, 2.0])
+        self.assertEqual(self.clock.now, 1002.0)
+
+    def test_rate_must_be_positive(self):
+        self.assertRaises(ValueError, TokenBucket, 0)
+
+
+class TestAdaptiveRateLimiter(FakeClockTestCase):
+    def setUp(self):
+        super().setUp()
+        self.limiter = AdaptiveRateLimiter(rate=4, min_rate=0.5, max_rate=5, increase=0.5, decrease=0.5)
+
+    def rates(self) -> dict[str, float]:
+        state = self.limiter.state()
+        return {"client": state["client"]["rate"], **{rpcid: bucket["rate"] for rpcid, bucket in state["rpcids"].items()}}
+
+    def test_additive_increase_up_to_max_rate(self):
+        self.assertFalse(self.limiter.feedback(["A"], 200))
+        self.assertEqual(self.rates(), {"client": 4.5, "A": 4.5})
+        for _ in range(3):
+            self.limiter.feedback(["A", "B"], 200)
+        self.assertEqual(self.rates(), {"client": 5, "A": 5, "B": 5})
+        self.assertEqual(self.limiter.counters["successes"], 4)
+
+    def test_multiplicative_decrease_down_to_min_rate(self):
+        self.limiter.feedback(["A"], 200)
+        self.assertTrue(self.limiter.feedback(["A", "B"], 429))
+        self.assertEqual(self.rates(), {"client": 2.25, "A": 2.25, "B": 2.0})
+        self.assertFalse(self.limiter.feedback(["B"], 500))
+        self.assertTrue(self.limiter.feedback(["B"], 503))
+        for _ in range(5):
+            self.limiter.feedback(["B"], 503)
+        self.assertEqual(self.rates(), {"client": 0.5, "A": 2.25, "B": 0.5})
+        self.assertEqual(self.limiter.counters, {"successes": 1, "throttled": 8, "rpc_errors": 0})
+
+    def test_client_errors_leave_rates_alone(self):
+        self.assertFalse(self.limiter.feedback(["A"], 404))
+        self.assertEqual(self.rates(), {"client": 4})
+        self.assertEqual(self.limiter.counters, {"successes": 0, "throttled": 0, "rpc_errors": 0})
+
+    def test_retry_after_pauses_every_request(self):
+        self.limiter.feedback(["A"], 429, "3")
+        self.assertEqual(self.limiter.state()["client"]["paused_for"], 3)
+        self.assertEqual(self.limiter.acquire(["B"]), 3)
+        self.clock.sleep(1)
+        self.assertEqual(asyncio.run(self.limiter.acquire_async(["A", "B"])), 0)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(utils.parse_retry_after("3"), 3.0)
+        self.assertEqual(utils.parse_retry_after("1.5"), 1.5)
+        self.assertEqual(utils.parse_retry_after("-1"), 0.0)
+        self.assertAlmostEqual(utils.parse_retry_after(email.utils.formatdate(time.time() + 30, usegmt=True)), 30, delta=2)
+        self.assertEqual(utils.parse_retry_after(email.utils.formatdate(time.time() - 30, usegmt=True)), 0.0)
+        for value in (None, "", "soon"):
+            self.assertIsNone(utils.parse_retry_after(value))
+
+    def test_throttle_codes_cut_their_rpcid_rate(self):
+        client = BaseClient("cookies.txt", log_level="ERROR", rate_limiter=self.limiter)
+        batch = [payloads.GetItemInfo(f"AF1Qip{i:038d}") for i in range(3)] + [payloads.GetStorageQuota()]
+        codes = dict(zip((payload.payload_id for payload in batch), (8, 14, 3)))
+        frames = [[envelope(payload.rpcid, [], payload.payload_id, codes.get(payload.payload_id))] for payload in batch]
+        responses = list(client.parse_frames(frames, batch))
+        self.assertEqual([response.error.code for response in responses[:3]], [8, 14, 3])
+        self.assertEqual(self.rates(), {"client": 4, batch[0].rpcid: 1.0})
+        self.assertEqual(self.limiter.counters["rpc_errors"], 2)
+
+
+class TestThrottledRequests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cookies_path = Path(self.tmp_dir.name) / "cookies.txt"
+        self.cookies_path.write_text("# Netscape HTTP Cookie File\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_throttled_requests_back_off_and_retry(self):
+        limiter = AdaptiveRateLimiter(rate=50, burst=50)
+        with FakeServer(error_rate=1, retry_after=0.05) as server:
+            client = Client(self.cookies_path, log_level="ERROR", rate_limiter=limiter, base_url=server.url)
+            self.addCleanup(client.close)
+            start = time.monotonic()
+            with self.assertRaises(requests.HTTPError):
+                client.send_api_request([payloads.GetStorageQuota()])
+            self.assertGreaterEqual(time.monotonic() - start, Client.THROTTLE_RETRIES * 0.05)
+            self.assertEqual(server.stats["http_errors"], Client.THROTTLE_RETRIES + 1)
+            self.assertEqual(limiter.counters["throttled"], Client.THROTTLE_RETRIES + 1)
+            self.assertLess(limiter.state()["client"]["rate"], 50)
+
+            server.error_rate = 0
+            (response,) = client.send_api_request([payloads.GetStorageQuota()])
+            self.assertTrue(response.success)
+            self.assertEqual(limiter.counters["successes"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+import httpx
+import requests
+
+from gpwc import payloads
+from gpwc.async_client import AsyncClient
+from gpwc.client import Client
+from gpwc.fake_server import FakeServer
+
+
+class TestStreamedResponses(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cookies_path = Path(self.tmp_dir.name) / "cookies.txt"
+        self.cookies_path.write_text("# Netscape HTTP Cookie File\n")
+        self.server = FakeServer(error_statuses=(500,), frame_size=1, total_items=10, page_size=5)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp_dir.cleanup()
+
+    def test_error_status_closes_streamed_response(self):
+        client = Client(self.cookies_path, log_level="ERROR", base_url=self.server.url)
+        self.addCleanup(client.session.close)
+        responses = []
+        post = client.session.post
+
+        def recording_post(*args, **kwargs):
+            responses.append(post(*args, **kwargs))
+            return responses[-1]
+
+        client.session.post = recording_post
+        self.server.error_rate = 1
+        with self.assertRaises(requests.HTTPError):
+            list(client.stream_frames([payloads.GetLibraryPageByTakenDate()]))
+        self.assertEqual(len(responses), 1)
+        self.assertTrue(responses[0].raw.closed)
+
+    def test_async_streams_are_closed(self):
+        async def run() -> list[httpx.Response]:
+            client = AsyncClient(self.cookies_path, log_level="ERROR", base_url=self.server.url)
+            await client.bootstrap()
+            responses = []
+            send = client.session.send
+
+            async def recording_send(*args, **kwargs):
+                responses.append(await send(*args, **kwargs))
+                return responses[-1]
+
+            client.session.send = recording_send
+            # stopped after the first of several frames, the response is closed with the generator
+            stream = client.stream_api_request([payloads.GetLibraryPageByTakenDate(), payloads.GetAlbumsPage()])
+            await anext(stream)
+            await stream.aclose()
+            self.assertTrue(responses[0].is_closed)
+            self.server.error_rate = 1
+            with self.assertRaises(httpx.HTTPStatusError):
+                async for _ in client.stream_frames([payloads.GetLibraryPageByTakenDate()]):
+                    pass
+            await client.session.aclose()
+            return responses
+
+        responses = asyncio.run(run())
+        self.assertEqual(len(responses), 2)
+        self.assertTrue(all(response.is_closed for response in responses))
+
+
+if __name__ == "__main__":
+    unittest.main()
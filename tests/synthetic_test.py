@@ -0,0 +1,64 @@
+import json
+import unittest
+
+from gpwc.framing import iter_frames
+from gpwc.parser import parse_response_data
+from gpwc.synthetic import LIST_RPCIDS, PAGED_RPCIDS, RPCIDS, Density, ResponseGenerator, wire_response
+
+
+class TestResponseGenerator(unittest.TestCase):
+    def test_same_seed_same_data(self):
+        for rpcid in RPCIDS:
+            with self.subTest(rpcid=rpcid):
+                first, second = ResponseGenerator(7), ResponseGenerator(7)
+                self.assertEqual([first.data(rpcid, 20, "next") for _ in range(3)], [second.data(rpcid, 20, "next") for _ in range(3)])
+                self.assertNotEqual(ResponseGenerator(7).data(rpcid, 20), ResponseGenerator(8).data(rpcid, 20))
+
+    def test_data_parses(self):
+        generator = ResponseGenerator(0)
+        for rpcid in RPCIDS:
+            with self.subTest(rpcid=rpcid):
+                parsed = parse_response_data(rpcid, generator.data(rpcid, 50, "next" if rpcid in PAGED_RPCIDS else None))
+                if rpcid in LIST_RPCIDS:
+                    self.assertEqual(len(parsed if isinstance(parsed, list) else parsed.items), 50)
+                if rpcid in PAGED_RPCIDS:
+                    self.assertEqual(parsed.next_page_id, "next")
+
+    def test_library_items_are_unique_and_go_back_in_time(self):
+        items = parse_response_data("EzkLib", ResponseGenerator(3).data("EzkLib", 2000)).items
+        self.assertEqual(len({item.media_key for item in items}), 2000)
+        timestamps = [item.timestamp for item in items]
+        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+
+    def test_requested_keys_are_answered(self):
+        keys = [f"AF1Qip{i:038d}" for i in range(5)]
+        matches = parse_response_data("EWgK9e", ResponseGenerator(0).data("EWgK9e", keys=keys))
+        self.assertEqual([match.media_key for match in matches], keys)
+
+    def test_density(self):
+        sparse = Density(geo=0, video=0, live_photo=0, favorite=0, description=0, archived=0, partial_upload=0, shared=0)
+        items = parse_response_data("lcxiM", ResponseGenerator(0, sparse).data("lcxiM", 200)).items
+        self.assertFalse(any(item.is_favorite or item.is_archived or item.video_duration for item in items))
+        dense = Density(favorite=1, archived=1)
+        items = parse_response_data("lcxiM", ResponseGenerator(0, dense).data("lcxiM", 200)).items
+        self.assertTrue(all(item.is_favorite and item.is_archived for item in items))
+
+    def test_pages_chain(self):
+        pages = list(ResponseGenerator(0).pages("zy0IHe", 1234, 500))
+        self.assertEqual([len(data[0]) for _, data in pages], [500, 500, 234])
+        self.assertIsNone(pages[0][0])
+        self.assertEqual([page_id for page_id, _ in pages[1:]], [data[1] for _, data in pages[:-1]])
+        self.assertIsNone(pages[-1][1][1])
+        self.assertEqual(pages, list(ResponseGenerator(0).pages("zy0IHe", 1234, 500)))
+
+    def test_wire_response_frames(self):
+        generator = ResponseGenerator(0)
+        responses = [("VrseUb", generator.data("VrseUb"), f"id{i}") for i in range(5)]
+        frames = list(iter_frames([wire_response(responses, frame_size=2).encode()]))
+        envelopes = [envelope for frame in frames[:3] for envelope in frame]
+        self.assertEqual([len(frame) for frame in frames[:3]], [2, 2, 1])
+        self.assertEqual([(envelope[1], json.loads(envelope[2]), envelope[6]) for envelope in envelopes], responses)
+
+
+if __name__ == "__main__":
+    unittest.main()
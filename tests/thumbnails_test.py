@@ -0,0 +1,66 @@
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import requests
+
+from gpwc.thumbnails import ThumbnailCache, thumbnail_variant_url
+
+IMAGES = {"/a": b"first image " * 100, "/b": b"second image " * 100, "/c": b"third image " * 100}
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("=", 1)[0]
+        self.server.requests.append(path)
+        body = IMAGES[path]
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestThumbnailCache(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        # room for a single image, every download evicts the previous one
+        self.cache = ThumbnailCache(SimpleNamespace(session=requests.Session()), self.tmp_dir.name, max_bytes=1500)
+
+    def tearDown(self):
+        self.cache.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp_dir.cleanup()
+
+    def test_open_file_survives_eviction(self):
+        with self.cache.open(self.base_url + "/a", 256) as f:
+            self.assertEqual(self.cache.read(self.base_url + "/b", 256), IMAGES["/b"])
+            self.assertIsNone(self.cache.cached(thumbnail_variant_url(self.base_url + "/a", 256)))
+            self.assertEqual(f.read(), IMAGES["/a"])
+
+    def test_download_evicted_before_open_is_fetched_again(self):
+        download = self.cache._download
+
+        def racing_download(variant_url):
+            path = download(variant_url)
+            if variant_url.startswith(self.base_url + "/a") and self.server.requests.count("/a") == 1:
+                # another thread fills the cache before this one opens its file
+                download(thumbnail_variant_url(self.base_url + "/c", 256))
+            return path
+
+        self.cache._download = racing_download
+        self.assertEqual(self.cache.read(self.base_url + "/a", 256), IMAGES["/a"])
+        self.assertEqual(self.server.requests, ["/a", "/c", "/a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import itertools
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from gpwc import payloads, tracing
+from gpwc.client import Client
+from gpwc.fake_server import FakeServer
+from gpwc.tracing import FlameGraphAggregator, JsonLinesExporter, Tracer
+
+
+class ListExporter:
+    def __init__(self) -> None:
+        self.spans = []
+
+    def export(self, span) -> None:
+        self.spans.append(span)
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self):
+        self.exporter = ListExporter()
+        self.flame_graph = FlameGraphAggregator()
+        self.tracer = Tracer([self.exporter, self.flame_graph])
+
+    def test_nested_spans_and_folded_stacks(self):
+        # every enter and exit reads the clock once, one second apart
+        with mock.patch.object(tracing.time, "perf_counter", side_effect=itertools.count()):
+            with self.tracer.span("request", rpcid="lcxiM") as request:
+                with self.tracer.span("encode"):
+                    with self.tracer.span("json"):
+                        pass
+                with self.tracer.span("post") as post:
+                    post.set(status=200)
+            with self.assertRaises(ValueError):
+                with self.tracer.span("parse"):
+                    raise ValueError("broken")
+
+        spans = {span.name: span for span in self.exporter.spans}
+        self.assertEqual([span.name for span in self.exporter.spans], ["json", "encode", "post", "request", "parse"])
+        self.assertEqual(spans["json"].path, ("request", "encode", "json"))
+        self.assertEqual(spans["json"].parent_id, spans["encode"].span_id)
+        self.assertEqual({span.trace_id for name, span in spans.items() if name != "parse"}, {request.span_id})
+        self.assertIsNone(spans["parse"].parent_id)
+        self.assertEqual(spans["parse"].error, "ValueError: broken")
+        self.assertEqual(request.attributes, {"rpcid": "lcxiM"})
+        self.assertEqual(spans["post"].attributes, {"status": 200})
+        self.assertEqual({name: (span.duration, span.self_duration) for name, span in spans.items()}, {"json": (1, 1), "encode": (3, 2), "post": (1, 1), "request": (7, 3), "parse": (1, 1)})
+
+        self.assertEqual(self.flame_graph.folded(), "parse 1000000\nrequest 3000000\nrequest;encode 2000000\nrequest;encode;json 1000000\nrequest;post 1000000\n")
+        self.assertEqual(self.flame_graph.summary()["request"], {"count": 1, "total": 7, "self": 3})
+
+    def test_context_is_per_thread_and_inherited_by_tasks(self):
+        async def child():
+            with self.tracer.span("task"):
+                await asyncio.sleep(0)
+
+        async def run():
+            with self.tracer.span("loop"):
+                await asyncio.gather(child(), child())
+
+        with self.tracer.span("main"):
+            thread = threading.Thread(target=asyncio.run, args=(run(),))
+            thread.start()
+            thread.join()
+        paths = sorted(span.path for span in self.exporter.spans)
+        self.assertEqual(paths, [("loop",), ("loop", "task"), ("loop", "task"), ("main",)])
+
+    def test_json_lines_export(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "spans.jsonl"
+            exporter = JsonLinesExporter(path)
+            tracer = Tracer([exporter])
+            with tracer.span("outer", path=Path("a")):
+                with tracer.span("inner"):
+                    pass
+            exporter.close()
+            inner, outer = [json.loads(line) for line in path.read_text().splitlines()]
+        self.assertEqual((inner["name"], inner["parent_id"], inner["trace_id"]), ("inner", outer["span_id"], outer["span_id"]))
+        self.assertEqual(outer["attributes"], {"path": "a"})
+        self.assertNotIn("error", outer)
+
+    def test_client_spans(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, FakeServer() as server:
+            cookies_path = Path(tmp_dir) / "cookies.txt"
+            cookies_path.write_text("# Netscape HTTP Cookie File\n")
+            client = Client(cookies_path, log_level="ERROR", tracer=self.tracer, base_url=server.url)
+            client.send_api_request([payloads.GetStorageQuota()])
+            client.close()
+        paths = {span.path for span in self.exporter.spans}
+        self.assertIn(("send_api_request", "encode"), paths)
+        self.assertIn(("send_api_request", "post"), paths)
+        stacks = [line.rsplit(" ", 1)[0] for line in self.flame_graph.folded().splitlines()]
+        self.assertIn("send_api_request;post", stacks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import io
+import random
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from gpwc.exceptions import ArchiveError
+from gpwc.unzip import StreamingUnzipper, unzip_stream
+
+FILES = {
+    "photos/a.jpg": random.Random(0).randbytes(50_000),
+    "photos/b.txt": b"hello world\n" * 4000,
+    "empty.txt": b"",
+}
+
+
+class Unseekable:
+    """Write only stream, zipfile then writes data descriptors after entries"""
+
+    def __init__(self) -> None:
+        self.buffer = io.BytesIO()
+
+    def write(self, data: bytes) -> int:
+        return self.buffer.write(data)
+
+    def flush(self) -> None:
+        pass
+
+
+def build_archive(files: dict[str, bytes], compression: int, streamed: bool = False, zip64: bool = False) -> bytes:
+    """zipfile archive of files, streamed ones have data descriptors"""
+    out = Unseekable() if streamed else io.BytesIO()
+    with zipfile.ZipFile(out, "w", compression) as archive:
+        for name, content in files.items():
+            with archive.open(name, "w", force_zip64=zip64) as f:
+                f.write(content)
+    return (out.buffer if streamed else out).getvalue()
+
+
+class TestStreamingUnzipper(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dest_dir = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def extract(self, archive: bytes, write_size: int, **kwargs) -> list[Path]:
+        with StreamingUnzipper(self.dest_dir, **kwargs) as unzipper:
+            for i in range(0, len(archive), write_size):
+                unzipper.write(archive[i : i + write_size])
+        return unzipper.extracted
+
+    def assert_extracted(self, files: dict[str, bytes], extracted: list[Path]) -> None:
+        self.assertEqual(extracted, [self.dest_dir / name for name in files])
+        for name, content in files.items():
+            self.assertEqual((self.dest_dir / name).read_bytes(), content, name)
+        self.assertEqual(list(self.dest_dir.rglob("*.part")), [])
+
+    def test_round_trips(self):
+        for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            for streamed in (False, True):
+                for zip64 in (False, True):
+                    archive = build_archive(FILES, compression, streamed, zip64)
+                    for write_size, max_output in ((7, 1), (1000, 1024), (64 * 1024, 1024 * 1024)):
+                        with self.subTest(compression=compression, streamed=streamed, zip64=zip64, write_size=write_size, max_output=max_output):
+                            extracted = self.extract(archive, write_size, max_output=max_output)
+                            self.assert_extracted(FILES, extracted)
+
+    def test_compressible_streamed_export(self):
+        # deflate streams ending inside a write, followed by descriptors and the next header
+        files = {"a.txt": b"hello world\n" * 400_000, "b.txt": b"hello world\n" * 400_000}
+        archive = build_archive(files, zipfile.ZIP_DEFLATED, streamed=True)
+        progress = []
+        extracted = unzip_stream((archive[i : i + 64 * 1024] for i in range(0, len(archive), 64 * 1024)), self.dest_dir, progress=lambda done, total: progress.append(done))
+        self.assert_extracted(files, extracted)
+        self.assertEqual(progress[-1], 2 * len(files["a.txt"]))
+
+    def test_corrupted_entry_fails(self):
+        archive = bytearray(build_archive({"a.txt": b"hello world\n" * 100}, zipfile.ZIP_STORED))
+        archive[archive.index(b"hello") + 3] ^= 1
+        with self.assertRaises(ArchiveError):
+            self.extract(bytes(archive), 1000)
+        self.assertEqual(list(self.dest_dir.rglob("*")), [])
+
+    def test_truncated_archive_fails(self):
+        archive = build_archive(FILES, zipfile.ZIP_DEFLATED, streamed=True)
+        with self.assertRaises(ArchiveError):
+            self.extract(archive[: len(archive) // 2], 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()